@@ -0,0 +1,258 @@
+"""Time the api functions end to end, against a local stand-in for the api.
+
+Run from the repository root:
+
+    python -m benchmarks.api_functions [--items 5000] [--latency-ms 0]
+        [--error-rate 0] [--error-reason backendError] [--repeat 3]
+        [--json results.json] [--baseline old.json] [--tolerance .2]
+
+Serves the endpoints from a `FakeYouTubeServer` on localhost, with items
+copied from the fixtures in `tests/responses.py`, and integer page tokens.
+Each request can be delayed (`--latency-ms`), and a share of them fail with
+an error reason (`--error-rate`), which the api retries quickly. So neither
+network nor keys are needed.
+
+Each case calls a function of the raw or mapped api for `--items` items,
+going through googleapiclient and httplib2 as in production, and reports
+pages/sec and items/sec (best of `--repeat`), items mapped/sec in the `map`
+spans of the mapped api, and peak memory. Memory is traced with tracemalloc
+in a run of its own, as tracing slows everything down; it includes the
+server's, which holds one page at a time.
+
+`--json` writes the results, and with a previous one as `--baseline`, exits
+1 if any case's items/sec dropped by more than `--tolerance`, to catch
+regressions before a release.
+"""
+import argparse
+import copy
+import json
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from tests import responses
+from tests.fake_resource import http_error, items_by_id, \
+    make_comment_thread, make_playlist_item, make_video, playlist_pages
+from tests.fake_server import FakeYouTubeServer
+from youtube_api.google import google_api, raw_google_api
+from youtube_api.google.api_key_management import ApiKeyManager, \
+    ResourceManager
+from youtube_api.google.metrics import MetricsCollector
+from youtube_api.google.resource_factory import ResourceFactory
+from youtube_api.google.retry import RetryPolicy
+from youtube_api.google.stream_id_cache import StreamIdCache
+from youtube_api.google.tracing import SpanCollector
+
+
+CHANNEL_ID = 'UCbenchmark'
+STREAM_ID = 'UUbenchmark'
+VIDEO_ID = 'benchmark'
+
+# the status the api sends each reason with
+ERROR_STATUS = {
+    'SERVICE_UNAVAILABLE': 503,
+    'backendError': 500,
+    'internalError': 500,
+    'rateLimitExceeded': 403,
+}
+
+
+def make_channel() -> Dict:
+    channel = copy.deepcopy(responses.list_channels_dw['items'][0])
+    channel['id'] = CHANNEL_ID
+    channel['contentDetails']['relatedPlaylists']['uploads'] = STREAM_ID
+    return channel
+
+
+def make_search_result(video_id: str) -> Dict:
+    result = copy.deepcopy(responses.search_video_response['items'][0])
+    result['id']['videoId'] = video_id
+    return result
+
+
+def pages(items: List[Dict], page_size: int) -> Callable:
+    """Handler paginating `items` for any params, as `playlist_pages`."""
+    def handler(pageToken: str = '0', **kwargs) -> Dict:
+        offset = int(pageToken)
+        response = {'items': items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            response['nextPageToken'] = str(offset + page_size)
+        return response
+    return handler
+
+
+def make_handlers(num_items: int) -> Dict[str, Callable]:
+    video_ids = [str(i) for i in range(num_items)]
+    return {
+        'channels': items_by_id({CHANNEL_ID: make_channel()}),
+        'playlistItems': playlist_pages({STREAM_ID: [
+            make_playlist_item(x, '2021-10-15T08:00:24Z')
+            for x in video_ids]}, 50),
+        'videos': items_by_id({x: make_video(x) for x in video_ids}),
+        'commentThreads': pages(
+            [make_comment_thread(x, 1) for x in video_ids], 100),
+        'search': pages([make_search_result(x) for x in video_ids], 50),
+    }
+
+
+def with_faults(
+        handler: Callable,
+        latency: float,
+        error_rate: float,
+        error_reason: str,
+        rng: random.Random
+) -> Callable:
+    def faulty_handler(**kwargs) -> Dict:
+        if latency:
+            time.sleep(latency)
+        if rng.random() < error_rate:
+            raise http_error(error_reason, ERROR_STATUS[error_reason])
+        return handler(**kwargs)
+    return faulty_handler
+
+
+def make_cases(num_items: int) -> Dict[str, Callable]:
+    """Calls of each function, by name, given a resource manager."""
+    video_ids = [str(i) for i in range(num_items)]
+    return {
+        'raw.get_channel_videos':
+            lambda x: raw_google_api.GetChannelVideos(x)(STREAM_ID),
+        'raw.get_videos':
+            lambda x: raw_google_api.GetVideos(x)(video_ids),
+        'raw.get_video_comments':
+            lambda x: raw_google_api.GetVideoComments(x)(VIDEO_ID),
+        'raw.search':
+            lambda x: raw_google_api.Search(x)('benchmark', limit=num_items),
+        'mapped.get_channel_videos':
+            lambda x: google_api.GetChannelVideos(
+                x, StreamIdCache(':memory:'))(CHANNEL_ID),
+        'mapped.get_videos':
+            lambda x: google_api.GetVideos(x)(video_ids),
+        'mapped.get_video_comments':
+            lambda x: google_api.GetVideoComments(x)(VIDEO_ID),
+        'mapped.search':
+            lambda x: google_api.Search(x)('benchmark', limit=num_items),
+    }
+
+
+def make_resource_manager(factory: ResourceFactory) -> ResourceManager:
+    return ResourceManager(
+        # search costs 100 units a page, so no key should run out
+        ApiKeyManager(['benchmark'], daily_quota=10 ** 12),
+        resource_factory=factory,
+        retry_policy=RetryPolicy(base_delay=.01, max_delay=.1),
+        metrics=MetricsCollector(),
+        tracer=SpanCollector())
+
+
+def run_case(call: Callable, factory: ResourceFactory, repeat: int) -> Dict:
+    best = None
+    for _ in range(repeat):
+        resource_manager = make_resource_manager(factory)
+        started = time.perf_counter()
+        call(resource_manager)
+        secs = time.perf_counter() - started
+        if best is None or secs < best[0]:
+            best = secs, resource_manager
+    secs, resource_manager = best
+    metrics = resource_manager.metrics
+    num_pages = metrics.count('youtube_api_pages_total')
+    num_items = metrics.count('youtube_api_items_total')
+    map_secs = sum(total for path, (_, total, _)
+                   in resource_manager.tracer.totals().items()
+                   if path[-1] == 'map')
+
+    resource_manager = make_resource_manager(factory)
+    tracemalloc.start()
+    try:
+        call(resource_manager)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'pages': int(num_pages),
+        'items': int(num_items),
+        'retries': int(metrics.count('youtube_api_retries_total')),
+        'secs': secs,
+        'pages_per_sec': num_pages / secs,
+        'items_per_sec': num_items / secs,
+        'mapped_items_per_sec': num_items / map_secs if map_secs else None,
+        'peak_mib': peak_bytes / 2 ** 20,
+    }
+
+
+def regressions(
+        results: Dict[str, Dict],
+        baseline: Dict[str, Dict],
+        tolerance: float
+) -> List[str]:
+    slower = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['items_per_sec']
+        if result['items_per_sec'] < before * (1 - tolerance):
+            slower.append(f'{name}: {before:.0f} -> '
+                          f'{result["items_per_sec"]:.0f} items/sec')
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--latency-ms', type=float, default=0.)
+    parser.add_argument('--error-rate', type=float, default=0.)
+    parser.add_argument('--error-reason', default='backendError',
+                        choices=sorted(ERROR_STATUS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cases', nargs='+')
+    parser.add_argument('--json')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=.2)
+    args = parser.parse_args()
+    # retries are counted in the table instead
+    logging.basicConfig(level=logging.ERROR)
+
+    rng = random.Random(0)
+    handlers = {
+        name: with_faults(handler, args.latency_ms / 1000, args.error_rate,
+                          args.error_reason, rng)
+        for name, handler in make_handlers(args.items).items()}
+    cases = make_cases(args.items)
+    if args.cases:
+        cases = {name: cases[name] for name in args.cases}
+
+    print(f'{"case":<26} {"pages":>6} {"items":>7} {"retries":>7} '
+          f'{"pages/s":>8} {"items/s":>9} {"mapped/s":>9} {"peak MiB":>9}')
+    results = {}
+    with FakeYouTubeServer(handlers) as server:
+        factory = ResourceFactory(server.base_url[:-len('youtube/v3')])
+        for name, call in cases.items():
+            result = run_case(call, factory, args.repeat)
+            results[name] = result
+            mapped = result['mapped_items_per_sec']
+            mapped = f'{mapped:>9.0f}' if mapped else f'{"-":>9}'
+            print(f'{name:<26} {result["pages"]:>6} {result["items"]:>7} '
+                  f'{result["retries"]:>7} {result["pages_per_sec"]:>8.1f} '
+                  f'{result["items_per_sec"]:>9.0f} {mapped} '
+                  f'{result["peak_mib"]:>9.1f}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = regressions(results, baseline, args.tolerance)
+        for line in slower:
+            print(f'Slower than baseline: {line}')
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
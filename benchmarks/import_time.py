@@ -0,0 +1,72 @@
+"""Time importing the package and its modules, each in a fresh interpreter.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py [--repeats 5]
+
+Imports run without `YOUTUBE_API_KEYS_DIR` or `API_KEY` set, to check that
+importing reads no configuration. For each module, prints the median time to
+import it, and which heavy dependencies the import pulled in (these should
+only be loaded once the API is used).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = [
+    'youtube_api',
+    'youtube_api.interface',
+    'youtube_api.google.local_store',
+    'youtube_api.google.stream_id_cache',
+    'youtube_api.google.api_key_management',
+    'youtube_api.google.raw_google_api',
+]
+HEAVY_MODULES = [
+    'googleapiclient.discovery',
+    'httplib2',
+    'data_structures',
+]
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'secs': elapsed,
+    'loaded': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def time_import(module: str) -> dict:
+    env = {k: v for k, v in os.environ.items()
+           if k not in ('YOUTUBE_API_KEYS_DIR', 'API_KEY')}
+    result = subprocess.run(
+        [sys.executable, '-c',
+         SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"module":<45} {"median ms":>10}  heavy imports')
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(args.repeats)]
+        median_ms = statistics.median(r['secs'] for r in runs) * 1000
+        loaded = ', '.join(runs[0]['loaded']) or '-'
+        print(f'{module:<45} {median_ms:>10.1f}  {loaded}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Time paginating long playlists, to show it scales linearly.
+
+Run from the repository root:
+
+    python -m benchmarks.pagination [--sizes 12500 25000 50000 100000]
+
+Pages through an in-memory `playlistItems` endpoint with `GetChannelVideos`,
+50 items a page, with `start` before the oldest item so every page is checked
+against it (the worst case). For comparison, also times stopping by scanning
+all data so far after each page, as pagination used to. Time per item should
+stay flat for the paginator, and grow with size for the rescan.
+"""
+import argparse
+from datetime import datetime, timedelta
+import time
+from typing import Dict, List
+
+from youtube_api.google.metrics import Metrics
+from youtube_api.google.raw_google_api import GetChannelVideos
+from youtube_api.google.retry import RetryPolicy
+from youtube_api.google.tracing import Tracer
+
+
+PAGE_SIZE = 50
+
+
+class PlaylistRequest:
+
+    def __init__(self, response: Dict):
+        self.response = response
+
+    def execute(self) -> Dict:
+        return self.response
+
+
+class PlaylistResource:
+    """Just enough of a resource and resource manager to page a playlist."""
+
+    response_cache = None
+    checkpoint_store = None
+    retry_policy = RetryPolicy()
+    metrics = Metrics()
+    tracer = Tracer()
+    current_api_key = 'benchmark'
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+
+    def get_resource(self, cost: int = 1) -> 'PlaylistResource':
+        return self
+
+    def record_usage(self, cost: int = 1) -> None:
+        pass
+
+    def playlistItems(self) -> 'PlaylistResource':
+        return self
+
+    def list(self, pageToken: str = '0', **kwargs) -> PlaylistRequest:
+        offset = int(pageToken)
+        response = {'items': self.items[offset:offset + PAGE_SIZE]}
+        if offset + PAGE_SIZE < len(self.items):
+            response['nextPageToken'] = str(offset + PAGE_SIZE)
+        return PlaylistRequest(response)
+
+
+def make_items(size: int) -> List[Dict]:
+    newest = datetime(2021, 10, 1)
+    return [{'snippet': {
+                'publishedAt': (newest - timedelta(minutes=i))
+                .strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'resourceId': {'videoId': str(i)}}}
+            for i in range(size)]
+
+
+def rescan_paginate(items: List[Dict], start: str) -> List[Dict]:
+    data = []
+    for offset in range(0, len(items), PAGE_SIZE):
+        data += items[offset:offset + PAGE_SIZE]
+        if start >= min(x['snippet']['publishedAt'] for x in data):
+            break
+    return data
+
+
+def time_it(fn) -> float:
+    began = time.perf_counter()
+    fn()
+    return time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[12500, 25000, 50000, 100000])
+    args = parser.parse_args()
+
+    start = datetime(2000, 1, 1)
+    start_str = start.strftime('%Y-%m-%dT%H:%M:%SZ')
+    print(f'{"items":>8} {"paginator s":>12} {"us/item":>8} '
+          f'{"rescan s":>10} {"us/item":>8}')
+    for size in args.sizes:
+        items = make_items(size)
+        get_channel_videos = GetChannelVideos(PlaylistResource(items))
+        paginator_secs = time_it(
+            lambda: get_channel_videos('UUbenchmark', start=start))
+        rescan_secs = time_it(lambda: rescan_paginate(items, start_str))
+        print(f'{size:>8} {paginator_secs:>12.3f} '
+              f'{paginator_secs / size * 1e6:>8.2f} '
+              f'{rescan_secs:>10.3f} {rescan_secs / size * 1e6:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
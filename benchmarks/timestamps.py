@@ -0,0 +1,55 @@
+"""Time parsing api timestamps, against trying `strptime` formats in turn.
+
+Run from the repository root:
+
+    python -m benchmarks.timestamps [--number 20000]
+
+Parses the `*At` strings of the response fixtures in `tests/responses.py`, in
+each of the formats the api uses. The memoized parser is timed both on
+repeats of those strings (as when mapping replies to the same threads), and
+with its cache bypassed (as for a stream of distinct timestamps).
+"""
+import argparse
+from datetime import datetime, timedelta
+import timeit
+
+from tests.test_google.test_timestamps import fixture_timestamps
+from youtube_api.google.timestamps import api_string_to_datetime, \
+    strptime_api_string
+
+
+def distinct_timestamps(number: int):
+    start = datetime(2021, 1, 1)
+    formats = ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%fZ',
+               '%Y-%m-%d %H:%M:%S']
+    return [(start + timedelta(seconds=i * 7, microseconds=i))
+            .strftime(formats[i % 3]) for i in range(number)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    fixtures = fixture_timestamps()
+    fixtures += [x.replace('T', ' ').rstrip('Z') for x in fixtures]
+    fixtures += [x[:-1] + '.123Z' for x in fixtures if x.endswith('Z')]
+    repeated = (fixtures * (args.number // len(fixtures) + 1))[:args.number]
+    distinct = distinct_timestamps(args.number)
+    uncached = api_string_to_datetime.__wrapped__
+
+    print(f'{"parser":<30} {"repeated us":>12} {"distinct us":>12}')
+    for name, fn in [('strptime formats in turn', strptime_api_string),
+                     ('by shape, uncached', uncached),
+                     ('by shape, memoized', api_string_to_datetime)]:
+        api_string_to_datetime.cache_clear()
+        times = []
+        for timestamps in [repeated, distinct]:
+            secs = min(timeit.repeat(
+                lambda: [fn(x) for x in timestamps], number=1, repeat=3))
+            times.append(secs / len(timestamps) * 1e6)
+        print(f'{name:<30} {times[0]:>12.2f} {times[1]:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,13 @@ with open('version') as f:
 with open('requirements.txt') as f:
     required = f.read().splitlines()
     required = [fix_requirement(x) for x in required]
+# for the opt-in modules, e.g. `pip install youtube_api[columnar]`
+extras = {
+    'async': ['aiohttp>=3.8.0'],
+    'columnar': ['numpy>=1.21.0'],
+    'parquet': ['numpy>=1.21.0', 'pyarrow>=8.0.0'],
+    'zstd': ['zstandard>=0.18.0'],
+}
 
 
 setuptools.setup(
@@ -25,4 +32,5 @@ setuptools.setup(
     url=f'https://github.com/doublethinklab/youtube-api.git#{version}',
     packages=setuptools.find_packages(),
     python_requires='>=3.9.5',
-    install_requires=required)
+    install_requires=required,
+    extras_require=extras)
@@ -0,0 +1,167 @@
+"""Offline stand-in for a `googleapiclient` YouTube resource."""
+import copy
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from youtube_api.google.api_key_management import ApiKeyManager, ResourceManager
+from youtube_api.google.checkpoint_store import CheckpointStore
+from tests import responses
+from youtube_api.google.response_cache import ResponseCache
+
+
+class FakeRequest:
+
+    def __init__(self, resource: 'FakeResource', name: str, kwargs: Dict):
+        self.resource = resource
+        self.methodId = f'youtube.{name}.list'
+        self.handler = resource.handlers[name]
+        self.kwargs = kwargs
+        self.headers = {}
+
+    def execute(self) -> Dict:
+        # like a real server, hand out a fresh body each time
+        response = copy.deepcopy(self.handler(**self.kwargs))
+        if self.resource.etags:
+            etag = hashlib.md5(json.dumps(response, sort_keys=True).encode())
+            response['etag'] = etag.hexdigest()
+            if self.headers.get('If-None-Match') == response['etag']:
+                self.resource.not_modified += 1
+                raise HttpError(httplib2.Response({'status': 304}), b'')
+        return response
+
+
+class FakeEndpoint:
+
+    def __init__(self, resource: 'FakeResource', name: str):
+        self.resource = resource
+        self.name = name
+
+    def list(self, **kwargs) -> FakeRequest:
+        self.resource.calls.append((self.name, kwargs))
+        return FakeRequest(self.resource, self.name, kwargs)
+
+
+class FakeResource:
+    """Answers `resource.<endpoint>().list(**kwargs).execute()` calls.
+
+    `handlers` maps an endpoint name, e.g. `videos`, to a function taking the
+    list kwargs and returning a response dict (or raising an `HttpError`).
+    Every list call is recorded in `calls` as `(endpoint, kwargs)`. With
+    `etags`, responses carry an etag of their content, and requests sending a
+    matching `If-None-Match` get a 304, counted in `not_modified`.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable], etags: bool = False):
+        self.handlers = handlers
+        self.etags = etags
+        self.calls = []
+        self.not_modified = 0
+
+    def __getattr__(self, name: str) -> Callable:
+        if name not in self.handlers:
+            raise AttributeError(name)
+        return lambda: FakeEndpoint(self, name)
+
+
+class FakeResourceManager(ResourceManager):
+
+    def __init__(self,
+                 resource: FakeResource,
+                 api_keys: List[str] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 checkpoint_store: Optional[CheckpointStore] = None):
+        super().__init__(
+            ApiKeyManager(api_keys or ['a']),
+            response_cache,
+            checkpoint_store=checkpoint_store)
+        self.fake_resource = resource
+
+    def _get_resource(self, api_key: str) -> FakeResource:
+        return self.fake_resource
+
+
+def items_by_id(id_to_item: Dict[str, Dict]) -> Callable:
+    """Handler for list calls by comma separated `id`, skipping unknown ids."""
+    def handler(id: str, **kwargs) -> Dict:
+        items = [id_to_item[x] for x in id.split(',') if x in id_to_item]
+        return {'kind': 'youtube#listResponse', 'items': items}
+    return handler
+
+
+def http_error(reason: str, status: int = 403) -> HttpError:
+    content = {'error': {
+        'code': status,
+        'message': reason,
+        'errors': [{'message': reason, 'domain': 'youtube', 'reason': reason}]}}
+    return HttpError(httplib2.Response({'status': status}),
+                     json.dumps(content).encode())
+
+
+def make_video(video_id: str) -> Dict:
+    video = copy.deepcopy(responses.dw_video)
+    video['id'] = video_id
+    return video
+
+
+def make_playlist_item(video_id: str, published_at: str) -> Dict:
+    playlist_item = copy.deepcopy(responses.dw_playlist_item)
+    playlist_item['snippet']['resourceId']['videoId'] = video_id
+    playlist_item['snippet']['publishedAt'] = published_at
+    return playlist_item
+
+
+def playlist_pages(stream_to_items: Dict[str, List[Dict]], page_size: int):
+    """Handler paginating `playlistItems` with integer page tokens."""
+    def handler(playlistId: str, pageToken: str = '0', **kwargs) -> Dict:
+        items = stream_to_items[playlistId]
+        offset = int(pageToken)
+        response = {'items': items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            response['nextPageToken'] = str(offset + page_size)
+        return response
+    return handler
+
+
+def make_reply(parent_id: str, n: int) -> Dict:
+    reply = copy.deepcopy(
+        responses.dw_comment_thread_with_reply['replies']['comments'][0])
+    reply['id'] = f'{parent_id}.{n}'
+    reply['snippet']['parentId'] = parent_id
+    return reply
+
+
+def make_comment_thread(
+        thread_id: str,
+        num_replies: int,
+        num_inline: int = 5
+) -> Dict:
+    """A thread with `num_replies`, of which up to `num_inline` are inlined."""
+    comment_thread = copy.deepcopy(responses.dw_comment_thread_with_reply)
+    comment_thread['id'] = thread_id
+    comment_thread['snippet']['topLevelComment']['id'] = thread_id
+    comment_thread['snippet']['totalReplyCount'] = num_replies
+    num_inline = min(num_inline, num_replies)
+    if num_inline:
+        comment_thread['replies']['comments'] = [
+            make_reply(thread_id, i) for i in range(num_inline)]
+    else:
+        del comment_thread['replies']
+    return comment_thread
+
+
+def reply_pages(parent_to_num_replies: Dict[str, int], page_size: int):
+    """Handler paginating `comments` by `parentId`, as `playlist_pages`."""
+    def handler(parentId: str, pageToken: str = '0', **kwargs) -> Dict:
+        num_replies = parent_to_num_replies[parentId]
+        offset = int(pageToken)
+        response = {'items': [
+            make_reply(parentId, i)
+            for i in range(offset, min(offset + page_size, num_replies))]}
+        if offset + page_size < num_replies:
+            response['nextPageToken'] = str(offset + page_size)
+        return response
+    return handler
@@ -0,0 +1,74 @@
+"""Local HTTP stand-in for the YouTube v3 endpoints."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from typing import Callable, Dict
+from urllib.parse import parse_qsl, urlparse
+
+from googleapiclient.errors import HttpError
+
+
+class FakeYouTubeServer:
+    """Serves `GET /youtube/v3/<endpoint>` from handlers, on a local port.
+
+    `handlers` are the same as for `FakeResource`: given the query parameters
+    (all strings, minus `key`) they return a response dict, or raise an
+    `HttpError` which is sent back with its status and content. Every request
+    is recorded in `calls` as `(endpoint, params, key)`.
+
+    Usage:
+        with FakeYouTubeServer(handlers) as server:
+            api = AsyncGoogleYouTubeApi(base_url=server.base_url, ...)
+    """
+
+    def __init__(self, handlers: Dict[str, Callable]):
+        self.handlers = handlers
+        self.calls = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/youtube/v3'
+
+    def _make_request_handler(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = url.path.rstrip('/').split('/')[-1]
+                params = dict(parse_qsl(url.query))
+                key = params.pop('key', None)
+                server.calls.append((endpoint, params, key))
+                try:
+                    body = server.handlers[endpoint](**params)
+                    self._send(200, json.dumps(body).encode())
+                except HttpError as e:
+                    self._send(e.resp.status, e.content)
+
+            def _send(self, status: int, content: bytes):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return RequestHandler
+
+    def __enter__(self) -> 'FakeYouTubeServer':
+        self._server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), self._make_request_handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+import threading
+import unittest
+
+from freezegun import freeze_time
+
+from youtube_api.google.api_key_management import *
+from youtube_api.google.quota import *
+
+
+class TestNextQuotaReset(unittest.TestCase):
+
+    def test_is_next_pacific_midnight(self):
+        after = datetime(2021, 12, 11, 17, 9).astimezone()
+        reset = next_quota_reset(after.replace(tzinfo=None))
+        reset = reset.astimezone(QUOTA_TIMEZONE)
+        self.assertEqual(datetime(2021, 12, 12, 0, 0), reset.replace(
+            tzinfo=None))
+
+    def test_search_costs_more(self):
+        self.assertEqual(100, quota_cost('search'))
+        self.assertEqual(1, quota_cost('videos'))
+
+
+class TestApiKeyManagerQuota(unittest.TestCase):
+
+    @freeze_time('2021-12-11 17:09:00')
+    def test_rotates_before_daily_quota_is_spent(self):
+        api_key_manager = ApiKeyManager(['a', 'b'], daily_quota=150)
+        first = api_key_manager.get_key(cost=100)
+        api_key_manager.record_usage(first, 100)
+        self.assertTrue(api_key_manager.has_quota(first, 1))
+        self.assertFalse(api_key_manager.has_quota(first, 100))
+        second = api_key_manager.get_key(cost=100)
+        self.assertNotEqual(first, second)
+        api_key_manager.record_usage(second, 100)
+        self.assertIsNone(api_key_manager.try_get_key(cost=100))
+        self.assertIsNotNone(api_key_manager.try_get_key(cost=1))
+
+    def test_exceeded_key_returns_at_reset(self):
+        with freeze_time('2021-12-11 17:09:00'):
+            api_key_manager = ApiKeyManager(['a'])
+            api_key_manager.record_usage('a', 10)
+            api_key_manager.report_quota_exceeded('a')
+            reset = next_quota_reset(datetime.now())
+            self.assertIsNone(api_key_manager.try_get_key())
+        with freeze_time(reset - timedelta(seconds=1)):
+            self.assertIsNone(api_key_manager.try_get_key())
+        with freeze_time(reset):
+            self.assertEqual('a', api_key_manager.try_get_key())
+            self.assertEqual(0, api_key_manager.api_key_to_units['a'])
+
+    @freeze_time('2021-12-11 17:09:00')
+    def test_waits_only_until_the_next_reset(self):
+        api_key_manager = ApiKeyManager(['a', 'b'], wait_mins=24 * 60)
+        self.assertIsNotNone(api_key_manager.try_get_key())
+        api_key_manager.report_quota_exceeded('a')
+        api_key_manager.report_quota_exceeded('b')
+        self.assertIsNone(api_key_manager.try_get_key())
+        now = datetime.now()
+        expected = (next_quota_reset(now) - now).total_seconds()
+        self.assertAlmostEqual(
+            expected, api_key_manager.secs_until_available(), places=3)
+
+    @freeze_time('2021-12-11 17:09:00')
+    def test_reporting_twice_benches_once(self):
+        api_key_manager = ApiKeyManager(['a', 'b'])
+        api_key_manager.report_quota_exceeded('a')
+        api_key_manager.report_quota_exceeded('a')
+        self.assertEqual(1, len(api_key_manager._benched))
+        self.assertEqual('b', api_key_manager.try_get_key())
+
+
+class TestResourceManager(unittest.TestCase):
+
+    def test_each_thread_gets_its_own_resource(self):
+        resource_manager = ResourceManager(ApiKeyManager(['a']))
+        resource_manager._get_resource = lambda api_key: object()
+        resources = []
+
+        def get():
+            resources.append(resource_manager.get_resource())
+
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(3, len({id(x) for x in resources}))
+        self.assertIsNone(resource_manager.current_resource)
+
+    def test_rotates_key_without_quota_for_call(self):
+        api_key_manager = ApiKeyManager(['a', 'b'], daily_quota=100)
+        resource_manager = ResourceManager(api_key_manager)
+        resource_manager._get_resource = lambda api_key: object()
+        resource_manager.get_resource(cost=100)
+        first = resource_manager.current_api_key
+        resource_manager.record_usage(cost=100)
+        resource_manager.get_resource(cost=1)
+        self.assertNotEqual(first, resource_manager.current_api_key)
@@ -0,0 +1,81 @@
+import unittest
+
+from tests import responses
+from tests.fake_resource import *
+from tests.fake_server import FakeYouTubeServer
+from youtube_api.google.async_raw_google_api import *
+
+
+def make_api(server: FakeYouTubeServer, api_keys: List[str] = None) \
+        -> AsyncGoogleYouTubeApi:
+    return AsyncGoogleYouTubeApi(
+        api_key_manager=ApiKeyManager(api_keys or ['a']),
+        stream_id_cache=StreamIdCache(':memory:'),
+        base_url=server.base_url)
+
+
+class TestAsyncGoogleYouTubeApi(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_channel_videos_paginates(self):
+        items = [make_playlist_item(str(x), '2021-10-15T08:00:24Z')
+                 for x in range(7)]
+        handlers = {'playlistItems': playlist_pages({'UUa': items}, 3)}
+        with FakeYouTubeServer(handlers) as server:
+            async with make_api(server) as api:
+                videos = await api.get_channel_videos('UUa')
+        self.assertEqual(
+            [str(x) for x in range(7)],
+            [x['snippet']['resourceId']['videoId'] for x in videos])
+        self.assertEqual(3, len(server.calls))
+
+    async def test_get_channel_videos_many(self):
+        stream_to_items = {
+            f'UU{x}': [make_playlist_item(f'{x}-{y}', '2021-10-15T08:00:24Z')
+                       for y in range(x * 2)]
+            for x in range(6)}
+        handlers = {'playlistItems': playlist_pages(stream_to_items, 2)}
+        with FakeYouTubeServer(handlers) as server:
+            async with make_api(server) as api:
+                results = {
+                    stream_id: videos
+                    async for stream_id, videos
+                    in api.get_channel_videos_many(stream_to_items.keys(),
+                                                   max_workers=3)}
+        self.assertEqual(set(stream_to_items.keys()), set(results.keys()))
+        for stream_id, items in stream_to_items.items():
+            self.assertEqual(len(items), len(results[stream_id]))
+
+    async def test_quota_exceeded_rotates_key(self):
+        video = make_video('v')
+
+        def handler(**kwargs):
+            # whichever key is tried first is out of quota
+            if server.calls[-1][2] == server.calls[0][2]:
+                raise http_error('quotaExceeded')
+            return items_by_id({'v': video})(**kwargs)
+
+        with FakeYouTubeServer({'videos': handler}) as server:
+            async with make_api(server, api_keys=['a', 'b']) as api:
+                data = await api.get_video('v')
+        self.assertEqual('v', data[0]['id'])
+        self.assertEqual({'a', 'b'}, {x[2] for x in server.calls})
+        self.assertEqual(2, len(server.calls))
+
+    async def test_comments_disabled_returns_empty(self):
+        def handler(**kwargs):
+            raise http_error('commentsDisabled')
+        with FakeYouTubeServer({'commentThreads': handler}) as server:
+            async with make_api(server) as api:
+                comments = await api.get_video_comments('v')
+        self.assertEqual([], comments)
+
+    async def test_get_channel_stream_ids_cached(self):
+        dw = responses.list_channels_dw['items'][0]
+        handlers = {'channels': items_by_id({dw['id']: dw})}
+        with FakeYouTubeServer(handlers) as server:
+            async with make_api(server) as api:
+                first = await api.get_channel_stream_id(dw['id'])
+                second = await api.get_channel_stream_ids([dw['id'], 'UCx'])
+        self.assertEqual('UUknLrEdhRCp1aegoMqRaCZg', first)
+        self.assertEqual({dw['id']: first, 'UCx': None}, second)
+        self.assertEqual(2, len(server.calls))
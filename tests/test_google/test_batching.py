@@ -0,0 +1,19 @@
+import unittest
+
+from youtube_api.google.batching import *
+
+
+class TestBatchIds(unittest.TestCase):
+
+    def test_splits_into_batches_of_max_size(self):
+        ids = [str(x) for x in range(120)]
+        batches = list(batch_ids(ids))
+        self.assertEqual([50, 50, 20], [len(x) for x in batches])
+        self.assertEqual(ids, [x for batch in batches for x in batch])
+
+    def test_drops_duplicates_keeping_first_seen_order(self):
+        batches = list(batch_ids(['b', 'a', 'b', 'c', 'a'], batch_size=2))
+        self.assertEqual([['b', 'a'], ['c']], batches)
+
+    def test_empty(self):
+        self.assertEqual([], list(batch_ids([])))
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from youtube_api.google.checkpoint_store import *
+
+
+class TestCheckpointStore(unittest.TestCase):
+
+    def test_key_ignores_page_token(self):
+        self.assertEqual(
+            CheckpointStore.key('playlistItems', {'playlistId': 'UUa'}),
+            CheckpointStore.key(
+                'playlistItems', {'playlistId': 'UUa', 'pageToken': 'x'}))
+
+    def test_pages_in_order(self):
+        store = CheckpointStore(':memory:')
+        store.add_page('k', [{'id': 1}], 'p1')
+        store.add_page('k', [{'id': 2}, {'id': 3}], 'p2')
+        store.add_page('other', [{'id': 4}], None)
+        self.assertEqual(
+            ([[{'id': 1}], [{'id': 2}, {'id': 3}]], 'p2'), store.load('k'))
+        self.assertEqual(([[{'id': 4}]], None), store.load('other'))
+
+    def test_delete(self):
+        store = CheckpointStore(':memory:')
+        store.add_page('k', [{'id': 1}], 'p1')
+        store.delete('k')
+        self.assertIsNone(store.load('k'))
+        store.add_page('k', [{'id': 2}], 'p2')
+        self.assertEqual(([[{'id': 2}]], 'p2'), store.load('k'))
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'checkpoints.sqlite')
+            store = CheckpointStore(db_path)
+            store.add_page('k', [{'id': 1}], 'p1')
+            store.close()
+            store = CheckpointStore(db_path)
+            self.assertEqual(([[{'id': 1}]], 'p1'), store.load('k'))
+            store.close()
@@ -0,0 +1,80 @@
+import copy
+from datetime import datetime
+import unittest
+
+import numpy as np
+
+from tests import responses
+from youtube_api.google.columnar import *
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_playlist_items(self):
+        array = playlist_items_to_array([responses.dw_playlist_item] * 3)
+        self.assertEqual(PLAYLIST_ITEM_DTYPE, array.dtype)
+        self.assertEqual(3, len(array))
+        self.assertEqual('5x5UxqKM7-Y', array['video_id'][0])
+        self.assertEqual('UCknLrEdhRCp1aegoMqRaCZg', array['channel_id'][0])
+        self.assertEqual(np.datetime64('2021-10-15T08:00:24'),
+                         array['published_at'][0])
+
+    def test_videos(self):
+        hidden = copy.deepcopy(responses.dw_video)
+        del hidden['statistics']['likeCount']
+        del hidden['statistics']['dislikeCount']
+        array = videos_to_array([responses.dw_video, hidden])
+        self.assertEqual(VIDEO_DTYPE, array.dtype)
+        self.assertEqual(['5x5UxqKM7-Y'] * 2, list(array['id']))
+        self.assertEqual('PT40S', array['duration'][0])
+        self.assertEqual([2502, 2502], list(array['num_views']))
+        self.assertEqual([97, MISSING], list(array['num_likes']))
+        self.assertEqual([2, MISSING], list(array['num_dislikes']))
+        self.assertEqual([17, 17], list(array['num_comments']))
+        self.assertEqual(np.int64, array['num_views'].dtype)
+
+    def test_comment_threads(self):
+        thread = responses.dw_comment_thread_with_reply
+        no_author = copy.deepcopy(thread)
+        del no_author['replies']
+        del no_author['snippet']['topLevelComment']['snippet'][
+            'authorChannelId']
+        array = comment_threads_to_array([thread, no_author])
+        self.assertEqual(COMMENT_DTYPE, array.dtype)
+        self.assertEqual(
+            ['UgxqGWcF4_j3P970oQp4AaABAg',
+             'UgxqGWcF4_j3P970oQp4AaABAg.95qRmatwk-z95sC9EDIvTC',
+             'UgxqGWcF4_j3P970oQp4AaABAg'],
+            list(array['id']))
+        self.assertEqual([thread['id']] * 3, list(array['comment_thread_id']))
+        self.assertEqual([None, 'UgxqGWcF4_j3P970oQp4AaABAg', None],
+                         list(array['replied_to_comment_id']))
+        self.assertEqual(
+            ['UCicrxSWGfa8A54N8viAPFTA', 'UC03Wk-Gp9gNg_STwgleQsFA', None],
+            list(array['author_channel_id']))
+        self.assertEqual([1, 0, 1], list(array['num_replies']))
+        self.assertEqual(
+            np.datetime64('2020-03-06T17:59:16'), array['published_at'][1])
+
+    def test_empty(self):
+        self.assertEqual(0, len(comment_threads_to_array([])))
+        self.assertEqual(0, len(videos_to_array([])))
+
+    def test_pages_concatenate(self):
+        pages = [[responses.dw_video], [responses.dw_video] * 2]
+        array = np.concatenate([videos_to_array(x) for x in pages])
+        self.assertEqual(3, len(array))
+        self.assertEqual(3 * 97, array['num_likes'].sum())
+
+    def test_datetime64_same_as_api_string_to_datetime(self):
+        date_times = ['2021-10-15T08:00:24Z',
+                      '2021-10-15T08:00:24.123Z',
+                      '2021-10-15 08:00:24']
+        expected = [datetime(2021, 10, 15, 8, 0, 24),
+                    datetime(2021, 10, 15, 8, 0, 24, 123000),
+                    datetime(2021, 10, 15, 8, 0, 24)]
+        self.assertEqual(expected, to_datetime64(date_times).tolist())
+        # not iso 8601, which strptime still takes
+        self.assertEqual([datetime(2021, 1, 5, 8, 0, 24), expected[0]],
+                         to_datetime64(['2021-1-5T08:00:24Z',
+                                        date_times[0]]).tolist())
@@ -0,0 +1,77 @@
+import gc
+import threading
+import unittest
+import weakref
+
+from youtube_api.google.concurrency import *
+
+
+class Result:
+    pass
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_yields_all_results(self):
+        pairs = list(fan_out(lambda x: x * 2, range(50), max_workers=4))
+        self.assertEqual({(x, x * 2) for x in range(50)}, set(pairs))
+
+    def test_results_released_once_consumed(self):
+        refs = []
+
+        def fn(arg):
+            result = Result()
+            refs.append(weakref.ref(result))
+            return result
+
+        results = fan_out(fn, range(100), max_workers=4)
+        for _ in range(50):
+            next(results)
+        gc.collect()
+        # the calls submitted ahead, and the result last yielded
+        self.assertLessEqual(
+            sum(ref() is not None for ref in refs), 2 * 4 + 1)
+        results.close()
+
+    def test_errors_propagate(self):
+        def fn(arg):
+            if arg == 3:
+                raise ValueError(arg)
+            return arg
+
+        with self.assertRaises(ValueError):
+            list(fan_out(fn, range(10), max_workers=2))
+
+
+class TestFanOutIter(unittest.TestCase):
+
+    def test_yields_all_items(self):
+        pairs = list(fan_out_iter(range, [0, 3, 5], max_workers=2))
+        self.assertEqual(
+            [(3, 0), (3, 1), (3, 2)], [x for x in pairs if x[0] == 3])
+        self.assertEqual(8, len(pairs))
+
+    def test_workers_wait_for_consumer(self):
+        produced = []
+        lock = threading.Lock()
+
+        def produce(n):
+            for x in range(n):
+                with lock:
+                    produced.append(x)
+                yield x
+
+        items = fan_out_iter(produce, [1000], max_workers=1, max_pending=4)
+        next(items)
+        threading.Event().wait(.2)
+        # one consumed, max_pending queued, one blocked on the full queue
+        self.assertLessEqual(len(produced), 6)
+        items.close()
+
+    def test_errors_propagate(self):
+        def produce(n):
+            yield n
+            raise ValueError(n)
+
+        with self.assertRaises(ValueError):
+            list(fan_out_iter(produce, [1, 2]))
@@ -16,38 +16,35 @@ def get_resource_manager():
 
 class TestApiKeyManager(unittest.TestCase):
 
-    @freeze_time('2021-12-11 17:09:00')
-    def test_get_mins_diff(self):
-        exceeded_time = datetime(2021, 12, 11, 16, 59, 0)
-        mins_diff = ApiKeyManager._get_mins_diff(exceeded_time)
-        self.assertEqual(10, mins_diff)
-
-    @freeze_time('2021-12-11 17:09:00')
-    def test_get_next_available_key_returns_max_diff_when_available(self):
-        api_key_manager = ApiKeyManager(api_keys=['a', 'b'], wait_mins=60)
-        api_key_manager.api_key_to_exceeded_time = {
-            'a': datetime(2021, 12, 11, 15, 55, 0),
-            'b': datetime(2021, 12, 11, 15, 59, 0)}
-        api_key = api_key_manager._get_next_available_key()
+    def test_get_next_available_key_returns_longest_ready_key(self):
+        # both exceeded before the last quota reset, `a` a day earlier
+        with freeze_time('2021-12-08 15:55:00'):
+            api_key_manager = ApiKeyManager(api_keys=['a', 'b'], wait_mins=60)
+            api_key_manager.report_quota_exceeded('a')
+        with freeze_time('2021-12-09 15:59:00'):
+            api_key_manager.report_quota_exceeded('b')
+        with freeze_time('2021-12-11 17:09:00'):
+            api_key = api_key_manager._get_next_available_key()
         self.assertEqual('a', api_key)
 
-    @freeze_time('2021-12-11 17:09:00')
     def test_get_next_available_key_returns_none_when_none_available(self):
-        api_key_manager = ApiKeyManager(api_keys=['a', 'b'], wait_mins=60)
-        api_key_manager.api_key_to_exceeded_time = {
-            'a': datetime(2021, 12, 11, 16, 55, 0),
-            'b': datetime(2021, 12, 11, 16, 59, 0)}
-        api_key = api_key_manager._get_next_available_key()
+        with freeze_time('2021-12-11 16:55:00'):
+            api_key_manager = ApiKeyManager(api_keys=['a', 'b'], wait_mins=60)
+            api_key_manager.report_quota_exceeded('a')
+        with freeze_time('2021-12-11 16:59:00'):
+            api_key_manager.report_quota_exceeded('b')
+        with freeze_time('2021-12-11 17:09:00'):
+            api_key = api_key_manager._get_next_available_key()
         self.assertIsNone(api_key)
 
-    @freeze_time('2021-12-11 17:09:00')
     def test_key_returns_key_when_available(self):
-        api_key_manager = ApiKeyManager(api_keys=['a', 'b'], wait_mins=60)
-        api_key_manager.api_key_to_exceeded_time = {
-            'a': datetime(2021, 12, 11, 15, 55, 0),
-            'b': datetime(2021, 12, 11, 15, 59, 0)}
-        api_key = api_key_manager.get_key()
-        self.assertEqual('a', api_key)
+        with freeze_time('2021-12-09 15:55:00'):
+            api_key_manager = ApiKeyManager(api_keys=['a', 'b'], wait_mins=60)
+            api_key_manager.report_quota_exceeded('a')
+            api_key_manager.report_quota_exceeded('b')
+        with freeze_time('2021-12-11 17:09:00'):
+            api_key = api_key_manager.get_key()
+        self.assertIn(api_key, ['a', 'b'])
 
     @freeze_time('2021-12-11 17:09:00')
     def test_report_quota_exceeded(self):
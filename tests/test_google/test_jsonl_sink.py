@@ -0,0 +1,81 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from tests import responses
+from youtube_api.google.jsonl_sink import *
+
+
+def pages(num_pages, page_size):
+    items = []
+    for i in range(num_pages * page_size):
+        item = copy.deepcopy(responses.dw_video)
+        item['id'] = f'video{i}'
+        items.append(item)
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)]
+
+
+class TestJsonlSink(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_all(self, sink):
+        return [x for path in sink.shard_paths for x in iter_shard_items(path)]
+
+    def test_round_trip(self):
+        for compression in EXTENSIONS:
+            data = pages(3, 5)
+            with JsonlSink(self.directory, prefix=compression,
+                           compression=compression) as sink:
+                self.assertEqual(15, sink.write_pages(data))
+            self.assertEqual(1, len(sink.shard_paths))
+            self.assertTrue(
+                sink.shard_paths[0].endswith(EXTENSIONS[compression]))
+            self.assertEqual([x for page in data for x in page],
+                             self.read_all(sink))
+
+    def test_compresses(self):
+        data = pages(20, 50)
+        with JsonlSink(self.directory) as sink:
+            sink.write_pages(data)
+        raw_size = sum(len(json.dumps(x)) + 1 for page in data for x in page)
+        self.assertLess(os.path.getsize(sink.shard_paths[0]) * 5, raw_size)
+
+    def test_rotates_shards(self):
+        data = pages(10, 20)
+        with JsonlSink(self.directory, max_shard_bytes=2000,
+                       max_buffer_bytes=1) as sink:
+            sink.write_pages(data)
+        self.assertGreater(len(sink.shard_paths), 1)
+        self.assertEqual(len(set(sink.shard_paths)), len(sink.shard_paths))
+        self.assertEqual([x['id'] for page in data for x in page],
+                         [x['id'] for x in self.read_all(sink)])
+
+    def test_buffer_bounded(self):
+        sink = JsonlSink(self.directory, max_buffer_bytes=10_000)
+        for page in pages(10, 10):
+            sink.write(page)
+            self.assertLess(sink._buffered_bytes, 10_000)
+        sink.close()
+
+    def test_flushes_on_interval(self):
+        for compression in EXTENSIONS:
+            sink = JsonlSink(self.directory, prefix=compression,
+                             compression=compression, flush_interval=0.)
+            sink.write(pages(1, 3)[0])
+            # readable before close
+            self.assertEqual(3, len(self.read_all(sink)))
+            sink.write(pages(1, 2)[0])
+            self.assertEqual(5, len(self.read_all(sink)))
+            sink.close()
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            JsonlSink(self.directory, compression='lz4')
@@ -0,0 +1,87 @@
+from datetime import datetime
+from multiprocessing import Process
+import os
+import tempfile
+import unittest
+
+from freezegun import freeze_time
+
+from youtube_api.google.api_key_management import ApiKeyManager
+from youtube_api.google.key_state_store import *
+
+
+def add_units(db_path: str, times: int) -> None:
+    store = KeyStateStore(db_path)
+    for _ in range(times):
+        store.add_units('a', 1, '2021-12-11')
+    store.close()
+
+
+class TestKeyStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'key_state.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_units_lapse_on_a_new_quota_day(self):
+        store = KeyStateStore(self.db_path)
+        self.assertEqual((5, False), store.add_units('a', 5, '2021-12-11'))
+        self.assertEqual((7, False), store.add_units('a', 2, '2021-12-11'))
+        self.assertEqual((1, False), store.add_units('a', 1, '2021-12-12'))
+        store.close()
+
+    def test_exceeded_only_for_that_day(self):
+        store = KeyStateStore(self.db_path)
+        store.set_exceeded('a', '2021-12-11', datetime(2021, 12, 11, 17, 9))
+        self.assertEqual({'a': (0, True)}, store.load(['a'], '2021-12-11'))
+        self.assertEqual({'a': (0, False)}, store.load(['a'], '2021-12-12'))
+        store.close()
+
+    def test_keys_are_not_stored(self):
+        store = KeyStateStore(self.db_path)
+        store.add_units('secret-key', 1, '2021-12-11')
+        store.close()
+        with open(self.db_path, 'rb') as f:
+            self.assertNotIn(b'secret-key', f.read())
+
+    def test_concurrent_processes_lose_no_updates(self):
+        processes = [Process(target=add_units, args=(self.db_path, 100))
+                     for _ in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        store = KeyStateStore(self.db_path)
+        self.assertEqual({'a': (300, False)}, store.load(['a'], '2021-12-11'))
+        store.close()
+
+    @freeze_time('2021-12-11 17:09:00')
+    def test_managers_share_key_state(self):
+        first = ApiKeyManager(
+            ['a', 'b'], daily_quota=10, key_state_store=KeyStateStore(
+                self.db_path))
+        second = ApiKeyManager(
+            ['a', 'b'], daily_quota=10, key_state_store=KeyStateStore(
+                self.db_path))
+        first.record_usage('a', 6)
+        second.record_usage('a', 6)
+        self.assertEqual(12, second.api_key_to_units['a'])
+        self.assertEqual('b', second.try_get_key())
+        second.report_quota_exceeded('b')
+        self.assertIsNone(first.try_get_key())
+
+    def test_state_survives_restart(self):
+        with freeze_time('2021-12-11 17:09:00'):
+            manager = ApiKeyManager(
+                ['a'], key_state_store=KeyStateStore(self.db_path))
+            manager.report_quota_exceeded('a')
+            restarted = ApiKeyManager(
+                ['a'], key_state_store=KeyStateStore(self.db_path))
+            self.assertIsNone(restarted.try_get_key())
+        with freeze_time('2021-12-12 17:09:00'):
+            restarted = ApiKeyManager(
+                ['a'], key_state_store=KeyStateStore(self.db_path))
+            self.assertEqual('a', restarted.try_get_key())
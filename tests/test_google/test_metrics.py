@@ -0,0 +1,69 @@
+import math
+import unittest
+
+from youtube_api.google.metrics import *
+
+
+class TestMetricsCollector(unittest.TestCase):
+
+    def test_counts_by_labels(self):
+        metrics = MetricsCollector()
+        metrics.record_request('videos', 'key1', .1)
+        metrics.record_request('videos', 'key2', .2, 'backendError')
+        metrics.record_request('search', 'key1', .3)
+        name = 'youtube_api_requests_total'
+        self.assertEqual(3, metrics.count(name))
+        self.assertEqual(2, metrics.count(name, endpoint='videos'))
+        self.assertEqual(2, metrics.count(name, key=key_label('key1')))
+        self.assertEqual(1, metrics.count(name, reason='backendError'))
+        # latency too, with the same labels
+        self.assertFalse(math.isnan(metrics.quantile(
+            'youtube_api_request_seconds', .5, key=key_label('key2'))))
+        self.assertEqual(key_label('key1'), hash_api_key('key1'))
+
+    def test_keys_hashed(self):
+        metrics = MetricsCollector()
+        metrics.record_quota('search', 'secret-key', 100)
+        text = metrics.to_prometheus()
+        self.assertNotIn('secret-key', text)
+        self.assertIn(
+            'youtube_api_quota_units_total{endpoint="search",'
+            f'key="{key_label("secret-key")}"}} 100', text)
+
+    def test_quantile(self):
+        metrics = MetricsCollector(buckets=[1., 2., 3., 4.])
+        for seconds in [.5] * 90 + [3.5] * 10:
+            metrics.record_request('videos', 'a', seconds)
+        name = 'youtube_api_request_seconds'
+        self.assertAlmostEqual(.5, metrics.quantile(name, .45))
+        self.assertAlmostEqual(3.5, metrics.quantile(name, .95))
+        self.assertTrue(math.isnan(
+            metrics.quantile(name, .5, endpoint='search')))
+
+    def test_prometheus_histogram(self):
+        metrics = MetricsCollector(buckets=[.1, 1.])
+        metrics.record_request('videos', None, .05)
+        metrics.record_request('videos', None, .5)
+        metrics.record_request('videos', None, 5.)
+        lines = metrics.to_prometheus().splitlines()
+        self.assertIn('# TYPE youtube_api_request_seconds histogram', lines)
+        labels = 'endpoint="videos",key="none",reason="ok"'
+        for line in [
+                f'youtube_api_request_seconds_bucket{{{labels},le="0.1"}} 1',
+                f'youtube_api_request_seconds_bucket{{{labels},le="1"}} 2',
+                f'youtube_api_request_seconds_bucket{{{labels},le="+Inf"}} 3',
+                f'youtube_api_request_seconds_sum{{{labels}}} 5.55',
+                f'youtube_api_request_seconds_count{{{labels}}} 3']:
+            self.assertIn(line, lines)
+
+    def test_label_values_escaped(self):
+        metrics = MetricsCollector()
+        metrics.record_retry('videos', 'bad "reason"\n')
+        self.assertIn('reason="bad \\"reason\\"\\n"', metrics.to_prometheus())
+
+    def test_pages(self):
+        metrics = MetricsCollector()
+        metrics.record_page('playlistItems', 50)
+        metrics.record_page('playlistItems', 7)
+        self.assertEqual(2, metrics.count('youtube_api_pages_total'))
+        self.assertEqual(57, metrics.count('youtube_api_items_total'))
@@ -0,0 +1,91 @@
+from math import inf
+import random
+from types import SimpleNamespace
+import unittest
+
+from youtube_api.google.pagination import *
+
+
+def rescan_stop(data, limit, start):
+    """How pagination used to stop, scanning all data so far."""
+    if limit != inf:
+        return len(data) >= limit
+    if start:
+        return start >= min(x['snippet']['publishedAt'] for x in data)
+    return False
+
+
+def rescan_drop_over_limit(data, limit, start):
+    if limit != inf:
+        data = data[:limit]
+    if start:
+        data = [x for x in data if x['snippet']['publishedAt'] >= start]
+    return data
+
+
+def rescan_paginate(pages, limit, start):
+    data = list(pages[0])
+    for page in pages[1:]:
+        if rescan_stop(data, limit, start):
+            break
+        data += page
+    return rescan_drop_over_limit(data, limit, start)
+
+
+def paginate(pages, limit, start):
+    paginator = Paginator(limit, start)
+    data = []
+    for page in pages:
+        data += paginator.trim(page)
+        paginator.update(page)
+        if paginator.stop():
+            break
+    return data
+
+
+def random_pages(rng):
+    # mostly back in time, with some out of order, as the api gives
+    days = sorted((rng.randint(1, 28) for _ in range(rng.randint(1, 40))),
+                  reverse=True)
+    days = [max(1, x - rng.randint(0, 2)) for x in days]
+    items = [
+        {'id': i, 'snippet': {'publishedAt': f'2021-10-{x:02d}T00:00:00Z'}}
+        for i, x in enumerate(days)]
+    page_size = rng.randint(1, 7)
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)]
+
+
+class TestPaginator(unittest.TestCase):
+
+    def test_same_as_rescanning(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            pages = random_pages(rng)
+            limit = rng.choice([inf, rng.randint(1, 30)])
+            start = rng.choice(
+                [None, f'2021-10-{rng.randint(1, 28):02d}T00:00:00Z'])
+            self.assertEqual(
+                rescan_paginate(pages, limit, start),
+                paginate(pages, limit, start),
+                (pages, limit, start))
+
+    def test_size_or_date_limit_same_as_rescanning(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            limit = rng.choice([inf, rng.randint(1, 30)])
+            start = rng.randint(1, 28)
+            stop_fn = StopWhenAtSizeOrDateLimit(limit, start)
+            data = []
+            for page in random_pages(rng):
+                page = [SimpleNamespace(created_at=int(
+                    x['snippet']['publishedAt'][8:10])) for x in page]
+                data += page
+                self.assertEqual(
+                    len(data) > limit
+                    or min(x.created_at for x in data) < start,
+                    stop_fn(page))
+
+    def test_at_limit(self):
+        stop_fn = StopWhenAtLimit(5)
+        self.assertFalse(stop_fn([1, 2, 3]))
+        self.assertTrue(stop_fn([4, 5]))
@@ -0,0 +1,114 @@
+import copy
+import os
+import tempfile
+import unittest
+
+import pyarrow.parquet as pq
+
+from tests import responses
+from youtube_api.google.parquet_sink import *
+
+
+def video(video_id, channel_id, published_at, views=None):
+    item = copy.deepcopy(responses.dw_video)
+    item['id'] = video_id
+    item['snippet']['channelId'] = channel_id
+    item['snippet']['publishedAt'] = published_at
+    if views is None:
+        del item['statistics']['viewCount']
+    else:
+        item['statistics']['viewCount'] = str(views)
+    return item
+
+
+def parquet_files(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root)
+                  for d, _, files in os.walk(root) for f in files)
+
+
+class TestParquetSink(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_partitioned_by_entity_channel_and_date(self):
+        pages = [
+            [video('a', 'UC1', '2021-10-15T08:00:00Z', 1),
+             video('b', 'UC1', '2021-10-14T08:00:00Z', 2)],
+            [video('c', 'UC2', '2021-10-15T09:00:00Z')],
+        ]
+        with ParquetSink(self.root) as sink:
+            self.assertEqual(3, sink.write_pages('videos', pages))
+        files = parquet_files(self.root)
+        self.assertEqual(
+            ['videos/channel=UC1/published_date=2021-10-14',
+             'videos/channel=UC1/published_date=2021-10-15',
+             'videos/channel=UC2/published_date=2021-10-15'],
+            [os.path.dirname(x) for x in files])
+        table = pq.read_table(
+            os.path.join(self.root, 'videos'),
+            columns=['id', 'num_views', 'published_date'],
+            filters=[('channel', '=', 'UC1')])
+        rows = sorted(table.to_pylist(), key=lambda x: x['id'])
+        self.assertEqual(['a', 'b'], [x['id'] for x in rows])
+        self.assertEqual([1, 2], [x['num_views'] for x in rows])
+        # missing stats are null, rather than the columnar placeholder
+        table = pq.read_table(
+            os.path.join(self.root, 'videos'),
+            filters=[('channel', '=', 'UC2')])
+        self.assertEqual([None], table.column('num_views').to_pylist())
+        self.assertEqual(
+            'zstd', pq.ParquetFile(os.path.join(self.root, files[0]))
+            .metadata.row_group(0).column(0).compression.lower())
+
+    def test_row_groups_written_incrementally(self):
+        sink = ParquetSink(self.root, row_group_size=2)
+        for name in 'abcde':
+            sink.write('videos', [video(name, 'UC1', '2021-10-15T08:00:00Z')])
+        # two full row groups are written, one row is still buffered
+        self.assertEqual(1, sum(sink._buffered_rows.values()))
+        sink.close()
+        path, = parquet_files(self.root)
+        metadata = pq.ParquetFile(os.path.join(self.root, path)).metadata
+        self.assertEqual(3, metadata.num_row_groups)
+        self.assertEqual(5, metadata.num_rows)
+
+    def test_buffer_bounded_across_partitions(self):
+        sink = ParquetSink(self.root, max_buffered_rows=100)
+        for i in range(300):
+            published_at = f'2021-{i % 12 + 1:02d}-{i % 28 + 1:02d}T08:00:00Z'
+            sink.write('videos', [video(str(i), f'UC{i % 5}', published_at)])
+            self.assertLessEqual(sink._total_buffered_rows, 100)
+        # written before close, though no partition filled a row group
+        self.assertTrue(parquet_files(self.root))
+        sink.close()
+        table = pq.read_table(os.path.join(self.root, 'videos'))
+        self.assertEqual(300, table.num_rows)
+
+    def test_comments_take_channel_given(self):
+        with ParquetSink(self.root) as sink:
+            sink.write('comments', [responses.dw_comment_thread_with_reply],
+                       channel_id='UCknLrEdhRCp1aegoMqRaCZg')
+            sink.write('comments', [responses.dw_comment_thread_with_reply])
+        table = pq.read_table(os.path.join(self.root, 'comments'))
+        self.assertEqual(4, table.num_rows)
+        # pyarrow reads the hive null partition back as null
+        self.assertEqual(
+            {'UCknLrEdhRCp1aegoMqRaCZg', None},
+            set(table.column('channel').to_pylist()))
+        self.assertIn(None, table.column('replied_to_comment_id').to_pylist())
+
+    def test_closed_writers_start_new_files(self):
+        with ParquetSink(self.root, row_group_size=1, max_open_files=1) \
+                as sink:
+            for channel in ['UC1', 'UC2', 'UC1']:
+                sink.write('playlist_items', [responses.dw_playlist_item])
+                sink.write(
+                    'videos', [video('a', channel, '2021-10-15T08:00:00Z')])
+        table = pq.read_table(os.path.join(self.root, 'videos'))
+        self.assertEqual(3, table.num_rows)
+        self.assertEqual(3 + 3, len(parquet_files(self.root)))
@@ -0,0 +1,501 @@
+import gc
+import socket
+import unittest
+
+import httplib2
+
+from tests import responses
+from tests.fake_resource import *
+from youtube_api.google.metrics import MetricsCollector, key_label
+from youtube_api.google.raw_google_api import *
+
+
+class TestGetVideos(unittest.TestCase):
+
+    def test_batches_and_preserves_order_with_missing_as_none(self):
+        known = {str(x): make_video(str(x)) for x in range(0, 120, 2)}
+        resource = FakeResource({'videos': items_by_id(known)})
+        get_videos = GetVideos(FakeResourceManager(resource))
+        video_ids = [str(x) for x in reversed(range(120))]
+        videos = get_videos(video_ids)
+        self.assertEqual(3, len(resource.calls))
+        self.assertEqual(120, len(videos))
+        for video_id, video in zip(video_ids, videos):
+            if video_id in known:
+                self.assertEqual(video_id, video['id'])
+            else:
+                self.assertIsNone(video)
+
+    def test_duplicate_ids_requested_once(self):
+        resource = FakeResource({'videos': items_by_id({'a': make_video('a')})})
+        get_videos = GetVideos(FakeResourceManager(resource))
+        videos = get_videos(['a', 'a'])
+        self.assertEqual(['a', 'a'], [x['id'] for x in videos])
+        self.assertEqual('a', resource.calls[0][1]['id'])
+
+
+class TestGetChannels(unittest.TestCase):
+
+    def test_keyed_by_id_in_input_order(self):
+        dw = responses.list_channels_dw['items'][0]
+        resource = FakeResource({'channels': items_by_id({dw['id']: dw})})
+        get_channels = GetChannels(FakeResourceManager(resource))
+        channels = get_channels(['missing', dw['id']])
+        self.assertEqual(['missing', dw['id']], list(channels.keys()))
+        self.assertIsNone(channels['missing'])
+        self.assertEqual(dw, channels[dw['id']])
+        self.assertEqual(1, len(resource.calls))
+
+
+class TestGetChannelStreamId(unittest.TestCase):
+
+    def test_second_call_served_from_cache(self):
+        dw = responses.list_channels_dw['items'][0]
+        resource = FakeResource({'channels': items_by_id({dw['id']: dw})})
+        get_channel_stream_id = GetChannelStreamId(
+            FakeResourceManager(resource))
+        self.assertEqual('UUknLrEdhRCp1aegoMqRaCZg',
+                         get_channel_stream_id(dw['id']))
+        self.assertEqual('UUknLrEdhRCp1aegoMqRaCZg',
+                         get_channel_stream_id(dw['id']))
+        self.assertEqual(1, len(resource.calls))
+
+    def test_not_found(self):
+        resource = FakeResource({'channels': items_by_id({})})
+        get_channel_stream_id = GetChannelStreamId(
+            FakeResourceManager(resource))
+        self.assertIsNone(get_channel_stream_id('UCmissing'))
+
+
+class TestGetChannelVideosMany(unittest.TestCase):
+
+    def test_all_channels_returned(self):
+        stream_to_items = {
+            f'UU{x}': [make_playlist_item(f'{x}-{y}', '2021-10-15T08:00:24Z')
+                       for y in range(x * 3)]
+            for x in range(10)}
+        resource = FakeResource(
+            {'playlistItems': playlist_pages(stream_to_items, page_size=2)})
+        get_channel_videos_many = GetChannelVideosMany(
+            FakeResourceManager(resource))
+        results = dict(get_channel_videos_many(
+            stream_to_items.keys(), max_workers=4))
+        self.assertEqual(set(stream_to_items.keys()), set(results.keys()))
+        for stream_id, items in stream_to_items.items():
+            self.assertEqual(
+                [x['snippet']['resourceId']['videoId'] for x in items],
+                [x['snippet']['resourceId']['videoId']
+                 for x in results[stream_id]])
+
+    def test_errors_propagate(self):
+        def handler(**kwargs):
+            raise http_error('badRequest', 400)
+        resource = FakeResource({'playlistItems': handler})
+        get_channel_videos_many = GetChannelVideosMany(
+            FakeResourceManager(resource))
+        with self.assertRaises(HttpError):
+            list(get_channel_videos_many(['UUa', 'UUb']))
+
+
+class TestIterPages(unittest.TestCase):
+
+    def setUp(self):
+        # newest first, one a day back from the end of October
+        self.items = [
+            make_playlist_item(str(x), f'2021-10-{31 - x:02d}T08:00:00Z')
+            for x in range(30)]
+        self.resource = FakeResource(
+            {'playlistItems': playlist_pages({'UUa': self.items}, 4)})
+        self.get_channel_videos = GetChannelVideos(
+            FakeResourceManager(self.resource))
+
+    @staticmethod
+    def video_ids(items):
+        return [x['snippet']['resourceId']['videoId'] for x in items]
+
+    def test_pages_fetched_as_consumed(self):
+        pages = self.get_channel_videos.iter_pages('UUa')
+        self.assertEqual(0, len(self.resource.calls))
+        self.assertEqual(['0', '1', '2', '3'], self.video_ids(next(pages)))
+        self.assertEqual(1, len(self.resource.calls))
+        next(pages)
+        self.assertEqual(2, len(self.resource.calls))
+
+    def test_limit(self):
+        items = list(self.get_channel_videos.iter_items('UUa', limit=6))
+        self.assertEqual(['0', '1', '2', '3', '4', '5'], self.video_ids(items))
+        self.assertEqual(2, len(self.resource.calls))
+
+    def test_start(self):
+        start = datetime(2021, 10, 20)
+        items = list(self.get_channel_videos.iter_items('UUa', start=start))
+        self.assertEqual([str(x) for x in range(12)], self.video_ids(items))
+        self.assertEqual(4, len(self.resource.calls))
+
+    def test_same_as_call(self):
+        start = datetime(2021, 10, 10)
+        self.assertEqual(
+            self.get_channel_videos('UUa', start=start),
+            list(self.get_channel_videos.iter_items('UUa', start=start)))
+
+    def test_many(self):
+        stream_to_items = {'UUa': self.items, 'UUb': self.items[:5]}
+        resource = FakeResource(
+            {'playlistItems': playlist_pages(stream_to_items, 4)})
+        get_channel_videos_many = GetChannelVideosMany(
+            FakeResourceManager(resource))
+        pairs = list(get_channel_videos_many.iter_items(['UUa', 'UUb']))
+        self.assertEqual(35, len(pairs))
+        self.assertEqual(
+            self.video_ids(self.items[:5]),
+            self.video_ids([x for stream_id, x in pairs if stream_id == 'UUb']))
+
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [
+            make_playlist_item(str(x), '2021-10-15T08:00:24Z')
+            for x in range(10)]
+        self.fail_at = '6'
+        list_pages = playlist_pages({'UUa': self.items}, 2)
+
+        def handler(pageToken: str = '0', **kwargs):
+            if pageToken == self.fail_at:
+                raise http_error('badRequest', 400)
+            return list_pages(pageToken=pageToken, **kwargs)
+
+        self.resource = FakeResource({'playlistItems': handler})
+        self.store = CheckpointStore(':memory:')
+        self.get_channel_videos = GetChannelVideos(FakeResourceManager(
+            self.resource, checkpoint_store=self.store))
+
+    def page_tokens(self):
+        return [x[1].get('pageToken', '0') for x in self.resource.calls]
+
+    def test_resume_after_error(self):
+        with self.assertRaises(HttpError):
+            self.get_channel_videos('UUa')
+        self.fail_at = None
+        self.resource.calls.clear()
+        videos = self.get_channel_videos('UUa', resume=True)
+        self.assertEqual(self.items, videos)
+        self.assertEqual(['6', '8'], self.page_tokens())
+
+    def test_without_resume_starts_over(self):
+        with self.assertRaises(HttpError):
+            self.get_channel_videos('UUa')
+        self.fail_at = None
+        self.resource.calls.clear()
+        self.assertEqual(self.items, self.get_channel_videos('UUa'))
+        self.assertEqual(['0', '2', '4', '6', '8'], self.page_tokens())
+
+    def test_checkpoint_deleted_when_finished(self):
+        self.fail_at = None
+        self.get_channel_videos('UUa')
+        key = CheckpointStore.key(
+            'playlistItems', {'part': 'snippet', 'playlistId': 'UUa',
+                              'maxResults': 50})
+        self.assertIsNone(self.store.load(key))
+        self.resource.calls.clear()
+        self.get_channel_videos('UUa', resume=True)
+        self.assertEqual(5, len(self.resource.calls))
+
+
+class TestFullReplies(unittest.TestCase):
+
+    def setUp(self):
+        num_replies = {'a': 2, 'b': 12, 'c': 0, 'd': 250}
+        self.comment_threads = [
+            make_comment_thread(k, v) for k, v in num_replies.items()]
+
+        def list_comment_threads(pageToken: str = '0', **kwargs):
+            if pageToken == '0':
+                return {'items': self.comment_threads[:2],
+                        'nextPageToken': '2'}
+            return {'items': self.comment_threads[2:]}
+
+        self.resource = FakeResource({
+            'commentThreads': list_comment_threads,
+            'comments': reply_pages(num_replies, 100)})
+        self.get_video_comments = GetVideoComments(
+            FakeResourceManager(self.resource))
+
+    def reply_calls(self):
+        return [(x[1]['parentId'], x[1].get('pageToken'))
+                for x in self.resource.calls if x[0] == 'comments']
+
+    def test_inline_replies_by_default(self):
+        comment_threads = self.get_video_comments('v')
+        self.assertEqual(self.comment_threads, comment_threads)
+        self.assertEqual([], self.reply_calls())
+
+    def test_missing_replies_fetched(self):
+        comment_threads = self.get_video_comments('v', full_replies=True)
+        self.assertEqual(['a', 'b', 'c', 'd'],
+                         [x['id'] for x in comment_threads])
+        self.assertEqual(
+            [2, 12, 0, 250],
+            [len(x.get('replies', {'comments': []})['comments'])
+             for x in comment_threads])
+        self.assertEqual([f'd.{i}' for i in range(250)],
+                         [x['id'] for x in comment_threads[3]['replies'][
+                             'comments']])
+        self.assertEqual(
+            [('b', None), ('d', None), ('d', '100'), ('d', '200')],
+            sorted(self.reply_calls(), key=lambda x: (x[0], x[1] or '')))
+        self.assertEqual(self.comment_threads[0], comment_threads[0])
+
+    def test_pages(self):
+        pages = list(self.get_video_comments.iter_pages(
+            'v', full_replies=True, max_workers=1))
+        self.assertEqual([['a', 'b'], ['c', 'd']],
+                         [[x['id'] for x in page] for page in pages])
+
+
+class TestGetVideoCommentsMany(unittest.TestCase):
+
+    def setUp(self):
+        num_comments = {'big': 250, 'small': 3, 'none': 0, 'disabled': None,
+                        'stale': 5}
+        videos = {}
+        for video_id, count in num_comments.items():
+            videos[video_id] = make_video(video_id)
+            if count is None:
+                del videos[video_id]['statistics']['commentCount']
+            else:
+                videos[video_id]['statistics']['commentCount'] = str(count)
+
+        def list_comment_threads(videoId, pageToken='0', maxResults=100,
+                                 **kwargs):
+            if videoId == 'stale':
+                raise http_error('commentsDisabled')
+            offset = int(pageToken)
+            count = min(num_comments[videoId] - offset, maxResults)
+            response = {'items': [
+                make_comment_thread(f'{videoId}{offset + i}', 0)
+                for i in range(count)]}
+            if offset + maxResults < num_comments[videoId]:
+                response['nextPageToken'] = str(offset + maxResults)
+            return response
+
+        self.resource = FakeResource({
+            'videos': items_by_id(videos),
+            'commentThreads': list_comment_threads})
+        self.get_video_comments_many = GetVideoCommentsMany(
+            FakeResourceManager(self.resource))
+        self.video_ids = ['big', 'missing', 'small', 'none', 'disabled',
+                          'stale']
+
+    def crawled(self):
+        return [x[1]['videoId'] for x in self.resource.calls
+                if x[0] == 'commentThreads' and 'pageToken' not in x[1]]
+
+    def test_smallest_first_skipping_empty(self):
+        results = list(self.get_video_comments_many(
+            self.video_ids, max_workers=1))
+        self.assertEqual(['small', 'stale', 'big'], self.crawled())
+        self.assertEqual(
+            {'none': 0, 'disabled': 0, 'small': 3, 'stale': 0, 'big': 250},
+            {k: len(v) for k, v in results})
+        # the video lookup is batched
+        self.assertEqual(1, len([x for x in self.resource.calls
+                                 if x[0] == 'videos']))
+
+    def test_limit(self):
+        results = dict(self.get_video_comments_many(
+            self.video_ids, limit=100))
+        self.assertEqual(100, len(results['big']))
+
+    def test_iter_items(self):
+        items = list(self.get_video_comments_many.iter_items(
+            self.video_ids, max_workers=2))
+        self.assertEqual(253, len(items))
+        self.assertEqual({'big', 'small'}, {x[0] for x in items})
+
+    def test_threads_released_once_dropped(self):
+        def alive(video_id):
+            gc.collect()
+            return any(isinstance(x, list) and x and isinstance(x[0], dict)
+                       and x[0].get('id') == f'{video_id}0'
+                       for x in gc.get_objects())
+
+        results = self.get_video_comments_many(self.video_ids, max_workers=1)
+        video_ids = []
+        for video_id, comment_threads in results:
+            video_ids.append(video_id)
+            if video_id == 'stale':
+                # the video before, written out and dropped by now
+                self.assertFalse(alive('small'))
+        self.assertIn('stale', video_ids)
+
+
+class TestRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.errors = []
+
+        def handler(**kwargs):
+            if self.errors:
+                raise self.errors.pop(0)
+            return {'items': [make_video('a')]}
+
+        self.resource = FakeResource({'videos': handler})
+        resource_manager = FakeResourceManager(self.resource)
+        resource_manager.retry_policy = RetryPolicy(
+            base_delay=0., max_attempts=3)
+        self.get_video = GetVideo(resource_manager)
+
+    def test_transient_errors_retried(self):
+        self.errors = [
+            http_error('backendError', 500),
+            HttpError(httplib2.Response({'status': 502}), b'Bad Gateway')]
+        self.assertEqual(['a'], [x['id'] for x in self.get_video('a')])
+        self.assertEqual(3, len(self.resource.calls))
+
+    def test_timeouts_retried(self):
+        self.errors = [socket.timeout(), ConnectionResetError()]
+        self.assertEqual(1, len(self.get_video('a')))
+
+    def test_gives_up(self):
+        self.errors = [http_error('SERVICE_UNAVAILABLE', 503)] * 3
+        with self.assertRaises(HttpError):
+            self.get_video('a')
+        self.assertEqual(3, len(self.resource.calls))
+
+    def test_other_errors_raised(self):
+        self.errors = [HttpError(httplib2.Response({'status': 404}), b'')]
+        with self.assertRaises(HttpError):
+            self.get_video('a')
+        self.errors = [ValueError()]
+        with self.assertRaises(ValueError):
+            self.get_video('a')
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_requests_pages_retries_and_quota(self):
+        items = [make_playlist_item(str(x), '2021-10-15T08:00:24Z')
+                 for x in range(5)]
+        list_pages = playlist_pages({'UUa': items}, 2)
+        errors = [http_error('backendError', 500)]
+
+        def handler(**kwargs):
+            if errors:
+                raise errors.pop()
+            return list_pages(**kwargs)
+
+        resource_manager = FakeResourceManager(
+            FakeResource({'playlistItems': handler}), api_keys=['k'])
+        resource_manager.retry_policy = RetryPolicy(base_delay=0.)
+        metrics = MetricsCollector()
+        resource_manager.metrics = metrics
+        GetChannelVideos(resource_manager)('UUa')
+        self.assertEqual(4, metrics.count('youtube_api_requests_total'))
+        self.assertEqual(1, metrics.count(
+            'youtube_api_requests_total', reason='backendError'))
+        self.assertEqual(1, metrics.count(
+            'youtube_api_retries_total', endpoint='playlistItems'))
+        self.assertEqual(3, metrics.count('youtube_api_pages_total'))
+        self.assertEqual(5, metrics.count('youtube_api_items_total'))
+        self.assertEqual(4, metrics.count(
+            'youtube_api_quota_units_total', key=key_label('k')))
+
+
+class TestTracing(unittest.TestCase):
+
+    def test_spans_by_function(self):
+        items = [make_playlist_item(str(x), '2021-10-15T08:00:24Z')
+                 for x in range(5)]
+        resource_manager = FakeResourceManager(FakeResource(
+            {'playlistItems': playlist_pages({'UUa': items}, 2)}))
+        tracer = SpanCollector()
+        resource_manager.tracer = tracer
+        GetChannelVideos(resource_manager)('UUa')
+        self.assertEqual(
+            {('GetChannelVideos', x): 3 for x in ['key', 'build', 'http']},
+            {k: v[0] for k, v in tracer.totals().items()})
+
+
+class TestSyncChannelVideos(unittest.TestCase):
+
+    def setUp(self):
+        self.items = []
+        self.resource = FakeResource(
+            {'playlistItems': playlist_pages({'UUa': self.items}, 4)})
+        self.sync_channel_videos = SyncChannelVideos(
+            FakeResourceManager(self.resource))
+        self.uploaded = 0
+
+    def upload(self, n):
+        # newest first, like an uploads playlist
+        new = [make_playlist_item(
+                   str(self.uploaded + i),
+                   f'2021-10-{self.uploaded + i + 1:02d}T08:00:00Z')
+               for i in range(n)]
+        self.items[:0] = reversed(new)
+        self.uploaded += n
+
+    def sync(self, start=None):
+        self.resource.calls.clear()
+        videos = self.sync_channel_videos('UUa', start)
+        return [x['snippet']['resourceId']['videoId'] for x in videos]
+
+    def test_first_sync_gets_everything(self):
+        self.upload(10)
+        self.assertEqual([str(x) for x in reversed(range(10))], self.sync())
+        self.assertEqual((['9'], '2021-10-10T08:00:00Z'),
+                         self.sync_channel_videos.watermark_store.get('UUa'))
+
+    def test_only_new_videos_in_one_page(self):
+        self.upload(10)
+        self.sync()
+        self.upload(2)
+        self.assertEqual(['11', '10'], self.sync())
+        self.assertEqual(1, len(self.resource.calls))
+        self.assertEqual([], self.sync())
+        self.assertEqual(1, len(self.resource.calls))
+
+    def test_more_new_videos_than_a_page(self):
+        self.upload(3)
+        self.sync()
+        self.upload(6)
+        self.assertEqual([str(x) for x in reversed(range(3, 9))], self.sync())
+        self.assertEqual(2, len(self.resource.calls))
+
+    def test_start_after_first_sync(self):
+        self.upload(3)
+        self.sync()
+        self.upload(4)
+        self.assertEqual(['6', '5'], self.sync(start=datetime(2021, 10, 6)))
+        self.assertEqual((['6'], '2021-10-07T08:00:00Z'),
+                         self.sync_channel_videos.watermark_store.get('UUa'))
+
+    def test_tied_timestamps(self):
+        self.items[:0] = [
+            make_playlist_item(x, '2021-10-02T08:00:00Z') for x in 'BA'] \
+            + [make_playlist_item('old', '2021-10-01T08:00:00Z')]
+        self.assertEqual(['B', 'A', 'old'], self.sync())
+        self.assertEqual((['A', 'B'], '2021-10-02T08:00:00Z'),
+                         self.sync_channel_videos.watermark_store.get('UUa'))
+        self.assertEqual([], self.sync())
+        self.assertEqual([], self.sync())
+        # uploaded in the same second, after the last sync
+        self.items.insert(0, make_playlist_item('C', '2021-10-02T08:00:00Z'))
+        self.assertEqual(['C'], self.sync())
+        self.assertEqual((['A', 'B', 'C'], '2021-10-02T08:00:00Z'),
+                         self.sync_channel_videos.watermark_store.get('UUa'))
+        self.assertEqual([], self.sync())
+
+    def test_watermark_kept_on_error(self):
+        self.upload(3)
+        self.sync()
+        self.upload(2)
+
+        def handler(**kwargs):
+            raise http_error('badRequest', 400)
+        self.resource.handlers['playlistItems'] = handler
+        with self.assertRaises(HttpError):
+            self.sync()
+        self.assertEqual((['2'], '2021-10-03T08:00:00Z'),
+                         self.sync_channel_videos.watermark_store.get('UUa'))
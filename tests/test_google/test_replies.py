@@ -0,0 +1,39 @@
+import copy
+import unittest
+
+from tests.fake_resource import make_comment_thread, make_reply
+from youtube_api.google.replies import *
+
+
+class TestCompleteReplies(unittest.TestCase):
+
+    def test_only_missing_fetched_in_order(self):
+        comment_threads = [make_comment_thread(str(x), x, num_inline=2)
+                           for x in range(6)]
+        before = copy.deepcopy(comment_threads)
+        requested = []
+
+        def list_replies(parent_id):
+            requested.append(parent_id)
+            return [make_reply(parent_id, i) for i in range(int(parent_id))]
+
+        completed = complete_replies(comment_threads, list_replies)
+        self.assertEqual(['3', '4', '5'], sorted(requested))
+        self.assertEqual([str(x) for x in range(6)],
+                         [x['id'] for x in completed])
+        self.assertEqual([0, 1, 2, 3, 4, 5],
+                         [num_inline_replies(x) for x in completed])
+        self.assertFalse(any(missing_replies(x) for x in completed))
+        # the threads given are left as they were
+        self.assertEqual(before, comment_threads)
+
+    def test_inline_kept_if_fewer_found(self):
+        comment_thread = make_comment_thread('a', 10, num_inline=5)
+        completed = complete_replies([comment_thread], lambda x: [])
+        self.assertEqual([comment_thread], completed)
+
+    def test_nothing_missing(self):
+        comment_threads = [make_comment_thread('a', 3)]
+        self.assertIs(
+            comment_threads,
+            complete_replies(comment_threads, lambda x: self.fail(x)))
@@ -0,0 +1,76 @@
+import threading
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+
+from youtube_api.google.api_key_management import ApiKeyManager, \
+    ResourceManager
+from tests.fake_resource import items_by_id, make_video
+from tests.fake_server import FakeYouTubeServer
+from youtube_api.google.resource_factory import *
+
+
+class TestResourceFactory(unittest.TestCase):
+
+    def test_builds_once(self):
+        factory = ResourceFactory()
+        self.assertIs(factory.get_service(), factory.get_service())
+        self.assertIs(factory.get_collection('videos'),
+                      factory.get_collection('videos'))
+
+    def test_key_added_per_request(self):
+        factory = ResourceFactory()
+        http = httplib2.Http()
+        request = KeyedResource(factory, 'a', http).videos().list(
+            part='snippet', id='x')
+        params = parse_qs(urlparse(request.uri).query)
+        self.assertEqual(['a'], params['key'])
+        self.assertEqual(['x'], params['id'])
+        self.assertIs(http, request.http)
+        self.assertEqual('youtube.videos.list', request.methodId)
+
+    def test_api_endpoint(self):
+        handlers = {'videos': items_by_id({'x': make_video('x')})}
+        with FakeYouTubeServer(handlers) as server:
+            factory = ResourceFactory(server.base_url[:-len('youtube/v3')])
+            response = KeyedResource(factory, 'a', httplib2.Http()) \
+                .videos().list(part='snippet', id='x').execute()
+        self.assertEqual('x', response['items'][0]['id'])
+        self.assertEqual([('videos', {'part': 'snippet', 'id': 'x',
+                                      'alt': 'json'}, 'a')], server.calls)
+
+    def test_unknown_collection(self):
+        resource = KeyedResource(ResourceFactory(), 'a', httplib2.Http())
+        with self.assertRaises(AttributeError):
+            resource.not_a_collection()
+
+
+class TestResourceManagerFactory(unittest.TestCase):
+
+    def test_key_rotation_reuses_the_built_service(self):
+        factory = ResourceFactory()
+        resource_manager = ResourceManager(
+            ApiKeyManager(['a', 'b']), resource_factory=factory)
+        first = resource_manager.get_resource()
+        service = factory.get_service()
+        resource_manager.report_quota_exceeded()
+        second = resource_manager.get_resource()
+        self.assertNotEqual(first.api_key, second.api_key)
+        self.assertIs(service, factory.get_service())
+        self.assertIs(first.http, second.http)
+
+    def test_threads_get_their_own_http(self):
+        resource_manager = ResourceManager(
+            ApiKeyManager(['a']), resource_factory=ResourceFactory())
+        https = []
+
+        def get():
+            https.append(resource_manager.get_resource().http)
+
+        threads = [threading.Thread(target=get) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIsNot(https[0], https[1])
@@ -0,0 +1,76 @@
+import copy
+import threading
+import unittest
+
+from tests import responses
+from tests.fake_resource import *
+from youtube_api.google.raw_google_api import GetVideo
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('a', {'etag': '1'})
+        cache.put('b', {'etag': '2'})
+        cache.get('a')
+        cache.put('c', {'etag': '3'})
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+    def test_ignores_responses_without_etag(self):
+        cache = ResponseCache()
+        cache.put('a', {'items': []})
+        self.assertEqual(0, len(cache))
+
+    def test_not_modified_served_from_cache(self):
+        video = copy.deepcopy(responses.dw_video)
+        resource = FakeResource(
+            {'videos': items_by_id({video['id']: video})}, etags=True)
+        response_cache = ResponseCache()
+        get_video = GetVideo(FakeResourceManager(
+            resource, response_cache=response_cache))
+        first = get_video(video['id'])
+        first[0]['snippet']['title'] = 'mutated by the caller'
+        second = get_video(video['id'])
+        self.assertEqual(1, resource.not_modified)
+        self.assertEqual(1, response_cache.hits)
+        self.assertEqual(video['snippet']['title'],
+                         second[0]['snippet']['title'])
+
+    def test_changed_response_replaces_entry(self):
+        video = copy.deepcopy(responses.dw_video)
+        resource = FakeResource(
+            {'videos': items_by_id({video['id']: video})}, etags=True)
+        response_cache = ResponseCache()
+        get_video = GetVideo(FakeResourceManager(
+            resource, response_cache=response_cache))
+        get_video(video['id'])
+        video['statistics']['viewCount'] = '9999'
+        result = get_video(video['id'])
+        self.assertEqual(0, resource.not_modified)
+        self.assertEqual('9999', result[0]['statistics']['viewCount'])
+
+    def test_counts_from_threads(self):
+        class Request:
+            methodId = 'youtube.videos.list'
+
+            def __init__(self):
+                self.headers = {}
+
+            def execute(self):
+                return {'items': []}
+
+        cache = ResponseCache()
+
+        def work():
+            for i in range(1000):
+                cache.execute(Request(), {'id': str(i)})
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8000, cache.misses)
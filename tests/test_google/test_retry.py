@@ -0,0 +1,62 @@
+import random
+import socket
+import unittest
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from tests.fake_resource import http_error
+from youtube_api.google.retry import *
+
+
+def status_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({'status': status}), b'<html></html>')
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_full_jitter_under_capped_exponential(self):
+        policy = RetryPolicy(base_delay=2., max_delay=60.,
+                             rng=random.Random(0))
+        for num_retries in range(10):
+            cap = min(60., 2. * 2 ** num_retries)
+            delays = [policy.delay(num_retries) for _ in range(200)]
+            self.assertTrue(all(0 <= x <= cap for x in delays))
+            self.assertGreater(max(delays), cap / 2)
+
+    def test_gives_up_after_max_attempts(self):
+        backoff = RetryPolicy(base_delay=0., max_attempts=3).backoff()
+        error = status_error(503)
+        backoff.next_delay(error)
+        backoff.next_delay(error)
+        with self.assertRaises(HttpError):
+            backoff.next_delay(error)
+
+    def test_gives_up_after_max_elapsed(self):
+        backoff = RetryPolicy(max_elapsed=0.).backoff()
+        with self.assertRaises(socket.timeout):
+            backoff.next_delay(socket.timeout())
+
+    def test_delay_within_time_left(self):
+        backoff = RetryPolicy(base_delay=100., max_elapsed=5.).backoff()
+        self.assertLessEqual(backoff.next_delay(TimeoutError()), 5.)
+
+
+class TestIsTransient(unittest.TestCase):
+
+    def test_reasons(self):
+        self.assertTrue(is_transient(http_error('backendError', 500)))
+        self.assertTrue(is_transient(http_error('SERVICE_UNAVAILABLE', 503)))
+        self.assertFalse(is_transient(http_error('badRequest', 400)))
+        self.assertFalse(is_transient(http_error('commentsDisabled')))
+
+    def test_status_without_details(self):
+        self.assertIsNone(http_error_reason(status_error(502)))
+        self.assertTrue(is_transient(status_error(502)))
+        self.assertTrue(is_transient(status_error(429)))
+        self.assertFalse(is_transient(status_error(404)))
+
+    def test_connection_errors(self):
+        self.assertTrue(is_transient(socket.timeout()))
+        self.assertTrue(is_transient(ConnectionResetError()))
+        self.assertFalse(is_transient(ValueError()))
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from freezegun import freeze_time
+
+from youtube_api.google.stream_id_cache import *
+
+
+def make_channel(channel_id: str) -> Dict:
+    return {
+        'id': channel_id,
+        'contentDetails': {
+            'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}}}
+
+
+class TestStreamIdCache(unittest.TestCase):
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'cache.sqlite')
+            cache = StreamIdCache(db_path)
+            cache.set_many({'UCa': 'UUa'})
+            cache.close()
+            cache = StreamIdCache(db_path)
+            self.assertEqual({'UCa': 'UUa'}, cache.get_many(['UCa', 'UCb']))
+            cache.close()
+
+    def test_expired_entries_are_misses(self):
+        cache = StreamIdCache(':memory:', ttl_days=1)
+        with freeze_time('2021-12-01 00:00:00'):
+            cache.set_many({'UCa': 'UUa'})
+        with freeze_time('2021-12-01 23:00:00'):
+            self.assertEqual({'UCa': 'UUa'}, cache.get_many(['UCa']))
+        with freeze_time('2021-12-02 01:00:00'):
+            self.assertEqual({}, cache.get_many(['UCa']))
+
+
+class TestResolveStreamIds(unittest.TestCase):
+
+    def test_only_misses_are_requested_in_batches(self):
+        requested = []
+
+        def list_channels(channel_ids):
+            requested.append(channel_ids)
+            return [make_channel(x) for x in channel_ids if x != 'UCmissing']
+
+        cache = StreamIdCache(':memory:')
+        cache.set_many({'UCcached': 'UUcached'})
+        channel_ids = ['UCcached', 'UCmissing'] + [f'UC{x}' for x in range(60)]
+        resolved = resolve_stream_ids(channel_ids, cache, list_channels)
+        self.assertEqual(channel_ids, list(resolved.keys()))
+        self.assertEqual('UUcached', resolved['UCcached'])
+        self.assertIsNone(resolved['UCmissing'])
+        self.assertEqual('UU7', resolved['UC7'])
+        self.assertEqual([50, 11], [len(x) for x in requested])
+
+        requested.clear()
+        resolve_stream_ids(channel_ids[2:], cache, list_channels)
+        self.assertEqual([], requested)
+
+    def test_get_uploads_stream_id_missing_parts(self):
+        self.assertIsNone(get_uploads_stream_id({'id': 'UCa'}))
+        self.assertIsNone(get_uploads_stream_id(
+            {'id': 'UCa', 'contentDetails': {'relatedPlaylists': {}}}))
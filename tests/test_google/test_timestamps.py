@@ -0,0 +1,92 @@
+from datetime import datetime
+import random
+import unittest
+
+from tests import responses
+from youtube_api.google.timestamps import *
+
+
+def api_string_to_datetime_before(date_time: str) -> datetime:
+    """How timestamps used to be parsed, for comparison."""
+    date_formats = [
+        '%Y-%m-%dT%H:%M:%SZ',
+        '%Y-%m-%dT%H:%M:%S.%fZ',
+        '%Y-%m-%d %H:%M:%S',
+    ]
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(date_time, date_format)
+        except ValueError:
+            continue
+    raise ValueError(date_time)
+
+
+def find_timestamps(value):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key.endswith('At') and isinstance(item, str):
+                yield item
+            else:
+                yield from find_timestamps(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from find_timestamps(item)
+
+
+def fixture_timestamps():
+    """All `*At` strings in the response fixtures."""
+    return list(find_timestamps(
+        [x for x in vars(responses).values() if isinstance(x, dict)]))
+
+
+def variants(date_time: str, rng: random.Random):
+    yield date_time
+    yield date_time.replace('T', ' ').rstrip('Z')
+    yield date_time.lower()
+    fraction = str(rng.randint(0, 999999))[:rng.randint(1, 6)]
+    yield date_time[:-1] + '.' + fraction + 'Z'
+    yield date_time[:-1] + '.1234567Z'
+    yield date_time.replace('-0', '-', 1)
+    yield date_time.replace(':', '', 1)
+    yield date_time[:5] + '13' + date_time[7:]
+    yield date_time[:-1]
+    yield date_time + ' '
+    yield date_time[:-1] + '.٣Z'
+    yield '٢' + date_time[1:]
+    yield ''
+
+
+class TestApiStringToDatetime(unittest.TestCase):
+
+    def assert_same(self, date_time: str):
+        try:
+            expected = api_string_to_datetime_before(date_time)
+        except ValueError:
+            with self.assertRaises(ValueError, msg=date_time):
+                api_string_to_datetime(date_time)
+        else:
+            self.assertEqual(
+                expected, api_string_to_datetime(date_time), date_time)
+
+    def test_fixtures(self):
+        timestamps = fixture_timestamps()
+        self.assertGreater(len(timestamps), 5)
+        for date_time in timestamps:
+            self.assert_same(date_time)
+
+    def test_variants(self):
+        rng = random.Random(0)
+        for date_time in fixture_timestamps():
+            for variant in variants(date_time, rng):
+                self.assert_same(variant)
+
+    def test_random_times(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            date_time = datetime(
+                rng.randint(1, 9999), rng.randint(1, 12), rng.randint(1, 28),
+                rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59),
+                rng.choice([0, rng.randint(0, 999999)]))
+            self.assert_same(date_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            self.assert_same(date_time.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+            self.assert_same(date_time.strftime('%Y-%m-%d %H:%M:%S'))
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from youtube_api.google.tracing import *
+
+
+class TestSpanCollector(unittest.TestCase):
+
+    def test_nested_self_time(self):
+        tracer = SpanCollector()
+        for _ in range(2):
+            with tracer.span('GetVideos', 'http'):
+                time.sleep(.01)
+                with tracer.span('GetVideos', 'decode'):
+                    time.sleep(.02)
+        totals = tracer.totals()
+        calls, total, self_secs = totals[('GetVideos', 'http')]
+        self.assertEqual(2, calls)
+        self.assertGreaterEqual(total, .06)
+        self.assertLess(self_secs, total - .04 + .001)
+        calls, total, self_secs = totals[('GetVideos', 'http', 'decode')]
+        self.assertEqual(2, calls)
+        self.assertAlmostEqual(total, self_secs)
+
+    def test_threads_kept_apart(self):
+        tracer = SpanCollector()
+
+        def work():
+            for _ in range(100):
+                with tracer.span('GetVideos', 'http'):
+                    with tracer.span('GetVideos', 'decode'):
+                        pass
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            {('GetVideos', 'http'), ('GetVideos', 'http', 'decode')},
+            set(tracer.totals()))
+        self.assertEqual(400, tracer.totals()[('GetVideos', 'http')][0])
+
+    def test_report_and_folded(self):
+        tracer = SpanCollector()
+        with tracer.span('GetVideoComments', 'key'):
+            pass
+        with tracer.span('GetVideoComments', 'map'):
+            pass
+        report = tracer.report()
+        self.assertIn('GetVideoComments', report)
+        self.assertEqual(3, len(report.splitlines()))
+        lines = tracer.folded().splitlines()
+        self.assertEqual(['GetVideoComments;key', 'GetVideoComments;map'],
+                         [x.rsplit(' ', 1)[0] for x in lines])
+        self.assertTrue(all(x.rsplit(' ', 1)[1].isdigit() for x in lines))
+
+    def test_profile(self):
+        tracer = SpanCollector(profile=True)
+
+        def traced_work():
+            return sum(range(1000))
+
+        with tracer.span('GetVideos', 'map'):
+            traced_work()
+        functions = [x[2] for x in tracer.stats().stats]
+        self.assertIn('traced_work', functions)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'calls.prof')
+            tracer.dump_stats(file_path)
+            self.assertTrue(os.path.getsize(file_path))
+
+    def test_stats_needs_profile(self):
+        with self.assertRaises(ValueError):
+            SpanCollector().stats()
+
+
+class TestTraceDecoding(unittest.TestCase):
+
+    def test_postproc_wrapped(self):
+        class Request:
+            def postproc(self, response, content):
+                return content
+
+        tracer = SpanCollector()
+        request = Request()
+        trace_decoding(tracer, 'GetVideos', request)
+        self.assertEqual('x', request.postproc(None, 'x'))
+        self.assertEqual(1, tracer.totals()[('GetVideos', 'decode')][0])
+        request = Request()
+        trace_decoding(Tracer(), 'GetVideos', request)
+        self.assertEqual('postproc', request.postproc.__name__)
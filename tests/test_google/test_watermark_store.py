@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+
+from youtube_api.google.watermark_store import *
+
+
+class TestWatermarkStore(unittest.TestCase):
+
+    def test_get_and_set(self):
+        store = WatermarkStore(':memory:')
+        self.assertIsNone(store.get('UUa'))
+        store.set('UUa', ['v1'], '2021-10-15T08:00:24Z')
+        store.set('UUa', ['v3', 'v2'], '2021-10-16T08:00:24Z')
+        self.assertEqual((['v2', 'v3'], '2021-10-16T08:00:24Z'),
+                         store.get('UUa'))
+        self.assertIsNone(store.get('UUb'))
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'watermarks.sqlite')
+            store = WatermarkStore(db_path)
+            store.set('UUa', ['v1'], '2021-10-15T08:00:24Z')
+            store.close()
+            store = WatermarkStore(db_path)
+            self.assertEqual((['v1'], '2021-10-15T08:00:24Z'),
+                             store.get('UUa'))
+            store.close()
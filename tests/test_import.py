@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+def run_without_config(code: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items()
+           if k not in ('YOUTUBE_API_KEYS_DIR', 'API_KEY')}
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        env=env,
+        capture_output=True,
+        text=True)
+
+
+class TestImport(unittest.TestCase):
+
+    def test_import_needs_no_config(self):
+        result = run_without_config('import youtube_api')
+        self.assertEqual(0, result.returncode, result.stderr)
+
+    def test_import_defers_heavy_modules(self):
+        result = run_without_config(
+            'import sys\n'
+            'import youtube_api.google.raw_google_api\n'
+            'print(sorted(m for m in ("googleapiclient.discovery", '
+            '"httplib2", "data_structures") if m in sys.modules))')
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual('[]', result.stdout.strip())
+
+    def test_interface_defers_data_structures(self):
+        result = run_without_config(
+            'import sys\n'
+            'import youtube_api.interface\n'
+            'print("data_structures" in sys.modules)')
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual('False', result.stdout.strip())
+
+    def test_youtube_api_resolved_on_access(self):
+        result = run_without_config(
+            'from youtube_api import YouTubeApi\n'
+            'print(YouTubeApi.__name__)')
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual('GoogleYouTubeApi', result.stdout.strip())
+
+    def test_keys_dir_read_on_use(self):
+        result = run_without_config(
+            'from youtube_api.google.api_key_management import ApiKeyManager\n'
+            'ApiKeyManager.load_keys()')
+        self.assertNotEqual(0, result.returncode)
+        self.assertIn('YOUTUBE_API_KEYS_DIR', result.stderr)
@@ -1,3 +1,13 @@
 # for consumers, import whatever implementation here as `YouTubeApi`,
-# or put one together here in a child class
-from youtube_api.google.raw_google_api import GoogleYouTubeApi as YouTubeApi
+# or put one together here in a child class.
+# Resolved on first access, so `import youtube_api` stays cheap for code that
+# only uses the lighter modules (e.g. local stores), see
+# `benchmarks/import_time.py`.
+
+
+def __getattr__(name: str):
+    if name == 'YouTubeApi':
+        from youtube_api.google.raw_google_api import GoogleYouTubeApi
+        globals()['YouTubeApi'] = GoogleYouTubeApi
+        return GoogleYouTubeApi
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,30 +1,79 @@
+from collections import OrderedDict
 from datetime import datetime
+import heapq
 import logging
 import os
 import random
+import threading
 import time
-from typing import List
+from typing import List, Optional, TYPE_CHECKING
 
-import googleapiclient.discovery
-import googleapiclient.errors
+from youtube_api.google.checkpoint_store import CheckpointStore
+from youtube_api.google.key_state_store import KeyStateStore
+from youtube_api.google.metrics import Metrics
+from youtube_api.google.quota import DAILY_QUOTA, next_quota_reset, quota_day
+from youtube_api.google.resource_factory import KeyedResource, \
+    ResourceFactory, default_resource_factory
+from youtube_api.google.response_cache import ResponseCache
+from youtube_api.google.retry import RetryPolicy
+from youtube_api.google.tracing import Tracer
+
+if TYPE_CHECKING:
+    import httplib2
+
+
+def default_keys_dir() -> str:
+    return os.environ['YOUTUBE_API_KEYS_DIR']
 
 
 class ApiKeyManager:
+    """Hands out api keys with daily quota left.
+
+    Tracks the quota units spent on each key, so keys are rotated out before
+    the api starts failing their requests. Keys that are exhausted (or
+    reported exceeded) are benched until the next quota reset, midnight
+    Pacific time.
+
+    Ready keys are kept in order, the next one being the key that has been
+    ready longest, and benched keys in a heap by when they come back, on the
+    monotonic clock. So picking a key is O(1) and benching one O(log n), and
+    when no key is ready `get_key` sleeps only until the first one is. It is
+    safe to share between threads.
+
+    To share key state between processes, and keep it across restarts, give
+    a `KeyStateStore`. Units spent are then written through to it, and key
+    state is refreshed from it whenever a new key is picked.
+    """
 
     def __init__(self,
                  api_keys: List[str] = None,
-                 wait_mins: int = 60):
+                 wait_mins: int = 60,
+                 daily_quota: int = DAILY_QUOTA,
+                 key_state_store: Optional[KeyStateStore] = None):
         if api_keys is None:
             api_keys = self.load_keys()
         random.shuffle(api_keys)
         self.api_key_to_exceeded_time = {
             key: datetime(2000, 1, 1) for key in api_keys}
+        self.api_key_to_units = {key: 0 for key in api_keys}
+        self.units_reset_at = next_quota_reset(datetime.now())
+        # the longest to sleep in one go before checking keys again
         self.wait_mins = wait_mins
+        self.daily_quota = daily_quota
+        self._ready = OrderedDict.fromkeys(api_keys)
+        self._benched = []  # heap of (monotonic time available, key)
+        self._benched_keys = set()
+        # shared by worker threads, which all pick keys and report them
+        self._condition = threading.Condition()
+        self.key_state_store = key_state_store
+        if self.key_state_store is not None:
+            self._load_key_states()
 
     @staticmethod
-    def load_keys(
-            keys_dir: str = os.environ['YOUTUBE_API_KEYS_DIR']
-    ) -> List[str]:
+    def load_keys(keys_dir: Optional[str] = None) -> List[str]:
+        # resolved here rather than as a default, so importing needs no config
+        if keys_dir is None:
+            keys_dir = default_keys_dir()
         keys = []
         for file_name in os.listdir(keys_dir):
             if not file_name.endswith('.key'):
@@ -40,69 +89,203 @@ class ApiKeyManager:
         return keys
 
     @staticmethod
-    def _get_mins_diff(exceeded_time: datetime) -> int:
-        diff_secs = (datetime.now() - exceeded_time).total_seconds()
-        return int(round(diff_secs / 60, 0))
-
-    def _get_next_available_key(self) -> str | None:
-        logging.info('Looking for next available api key...')
-        key_diff = [
-            {'key': k, 'diff': self._get_mins_diff(t)}
-            for k, t in self.api_key_to_exceeded_time.items()]
-        for x in key_diff:
-            logging.info('Api key "%s" status: reported exceeded %s mins ago.'
-                         % (x['key'], x['diff']))
-        key_diff = list(reversed(sorted(key_diff, key=lambda x: x['diff'])))
-        next_key, diff = key_diff[0]['key'], key_diff[0]['diff']
-        if diff < self.wait_mins:
-            logging.info(f'No keys expired less than {self.wait_mins} mins '
-                         f'ago.')
-            return None
-        else:
-            logging.info(f'Returning new api key "{next_key}".')
-            return next_key
-
-    def get_key(self) -> str:
-        while True:
-            api_key = self._get_next_available_key()
-            if not api_key:
-                time.sleep(self.wait_mins * 60)
-            else:
+    def _secs_until_reset() -> float:
+        now = datetime.now()
+        return (next_quota_reset(now) - now).total_seconds()
+
+    def _reset_units_if_due(self) -> None:
+        now = datetime.now()
+        if now >= self.units_reset_at:
+            logging.info('Quota reset, zeroing units spent on all api keys.')
+            self.api_key_to_units = {
+                key: 0 for key in self.api_key_to_units}
+            self.units_reset_at = next_quota_reset(now)
+
+    def _bench(self, api_key: str) -> None:
+        if api_key in self._benched_keys:
+            return
+        available_at = time.monotonic() + self._secs_until_reset()
+        heapq.heappush(self._benched, (available_at, api_key))
+        self._benched_keys.add(api_key)
+        self._ready.pop(api_key, None)
+
+    def _unbench_available(self) -> None:
+        now = time.monotonic()
+        while self._benched and self._benched[0][0] <= now:
+            _, api_key = heapq.heappop(self._benched)
+            self._benched_keys.discard(api_key)
+            self._ready[api_key] = None
+
+    def _load_key_states(self) -> None:
+        states = self.key_state_store.load(
+            self.api_key_to_units.keys(), quota_day(datetime.now()))
+        with self._condition:
+            for api_key, (units, exceeded) in states.items():
+                self._update_key_state(api_key, units, exceeded)
+
+    def _update_key_state(self, api_key: str, units: int, exceeded: bool) \
+            -> None:
+        self.api_key_to_units[api_key] = units
+        if exceeded or units >= self.daily_quota:
+            self._bench(api_key)
+
+    def _has_quota(self, api_key: str, cost: int) -> bool:
+        return api_key not in self._benched_keys \
+            and self.api_key_to_units[api_key] + cost <= self.daily_quota
+
+    def _get_next_available_key(self, cost: int = 1) -> str | None:
+        self._reset_units_if_due()
+        self._unbench_available()
+        for api_key in self._ready:
+            if self._has_quota(api_key, cost):
                 return api_key
+        return None
+
+    def _secs_until_available(self) -> float:
+        # either a benched key comes back, or spent units are zeroed
+        secs = self._secs_until_reset()
+        if self._benched:
+            secs = min(secs, self._benched[0][0] - time.monotonic())
+        return max(secs, 0.)
+
+    def has_quota(self, api_key: str, cost: int = 1) -> bool:
+        """Whether `api_key` can spend `cost` more units before the reset."""
+        with self._condition:
+            self._reset_units_if_due()
+            self._unbench_available()
+            return self._has_quota(api_key, cost)
+
+    def record_usage(self, api_key: str, cost: int = 1) -> None:
+        if self.key_state_store is not None:
+            # the store has the units spent by all processes
+            units, exceeded = self.key_state_store.add_units(
+                api_key, cost, quota_day(datetime.now()))
+            with self._condition:
+                self._reset_units_if_due()
+                self._update_key_state(api_key, units, exceeded)
+            return
+        with self._condition:
+            self._reset_units_if_due()
+            self.api_key_to_units[api_key] += cost
+            if self.api_key_to_units[api_key] >= self.daily_quota:
+                logging.info(f'Api key "{api_key}" daily quota spent.')
+                self._bench(api_key)
+
+    def try_get_key(self, cost: int = 1) -> str | None:
+        """Get the next available key, or `None` now, without waiting."""
+        if self.key_state_store is not None:
+            self._load_key_states()
+        with self._condition:
+            return self._get_next_available_key(cost)
+
+    def secs_until_available(self) -> float:
+        """How long until another key might become available."""
+        with self._condition:
+            return min(self._secs_until_available(), self.wait_mins * 60)
+
+    def get_key(self, cost: int = 1) -> str:
+        if self.key_state_store is not None:
+            self._load_key_states()
+        with self._condition:
+            while True:
+                api_key = self._get_next_available_key(cost)
+                if api_key:
+                    return api_key
+                wait_secs = min(self._secs_until_available(),
+                                self.wait_mins * 60)
+                logging.info(f'No api keys available, waiting '
+                             f'{wait_secs / 60:.1f} mins...')
+                self._condition.wait(wait_secs)
 
     def report_quota_exceeded(self, api_key: str) -> None:
         exceeded_time = datetime.now()
         exceeded_time_str = exceeded_time.strftime('%Y-%m-%d %H:%M:%S')
         logging.info(f'Api key "{api_key}" quota reported '
                      f'exceeded at {exceeded_time_str}.')
-        self.api_key_to_exceeded_time[api_key] = exceeded_time
+        with self._condition:
+            self.api_key_to_exceeded_time[api_key] = exceeded_time
+            self._bench(api_key)
+        if self.key_state_store is not None:
+            self.key_state_store.set_exceeded(
+                api_key, quota_day(exceeded_time), exceeded_time)
 
 
 class ResourceManager:
 
-    def __init__(self, api_key_manager: ApiKeyManager):
+    def __init__(self,
+                 api_key_manager: ApiKeyManager,
+                 response_cache: Optional[ResponseCache] = None,
+                 resource_factory: ResourceFactory = default_resource_factory,
+                 checkpoint_store: Optional[CheckpointStore] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 metrics: Optional[Metrics] = None,
+                 tracer: Optional[Tracer] = None):
         self.api_key_manager = api_key_manager
-        # since getting a resource can involve waiting, only try when asked
-        # for a resource
-        self.current_api_key = None
-        self.current_resource = None
+        self.resource_factory = resource_factory
+        # opt-in, shared by all functions using this manager
+        self.response_cache = response_cache
+        self.checkpoint_store = checkpoint_store
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy
+        if metrics is None:
+            metrics = Metrics()
+        self.metrics = metrics
+        if tracer is None:
+            tracer = Tracer()
+        self.tracer = tracer
+        # resources (and their http clients) are not thread safe, so each
+        # thread gets its own, and keeps track of its own current api key.
+        # Since getting a resource can involve waiting, only try when asked
+        # for a resource.
+        self._local = threading.local()
 
-    @staticmethod
-    def _get_resource(api_key: str):
+    @property
+    def current_api_key(self) -> Optional[str]:
+        return getattr(self._local, 'api_key', None)
+
+    @current_api_key.setter
+    def current_api_key(self, api_key: Optional[str]) -> None:
+        self._local.api_key = api_key
+
+    @property
+    def current_resource(self):
+        return getattr(self._local, 'resource', None)
+
+    @current_resource.setter
+    def current_resource(self, resource) -> None:
+        self._local.resource = resource
+
+    def _get_http(self) -> 'httplib2.Http':
+        if not hasattr(self._local, 'http'):
+            import httplib2
+            self._local.http = httplib2.Http()
+        return self._local.http
+
+    def _get_resource(self, api_key: str) -> KeyedResource:
         if not api_key:
             api_key = os.environ['API_KEY']
-        return googleapiclient.discovery.build(
-            'youtube', 'v3', developerKey=api_key)
+        # cheap: the resource is only built once, by the factory
+        return KeyedResource(self.resource_factory, api_key, self._get_http())
 
-    def _set_current_resource(self) -> None:
-        self.current_api_key = self.api_key_manager.get_key()
+    def _set_current_resource(self, cost: int = 1) -> None:
+        self.current_api_key = self.api_key_manager.get_key(cost)
         self.current_resource = self._get_resource(self.current_api_key)
 
-    def get_resource(self) -> googleapiclient.discovery.Resource:
+    def get_resource(self, cost: int = 1) -> KeyedResource:
+        """Get a resource whose api key has quota left for a `cost` call."""
+        if self.current_resource and not self.api_key_manager.has_quota(
+                self.current_api_key, cost):
+            # rotate before the api starts failing requests
+            self.current_api_key = None
+            self.current_resource = None
         if not self.current_resource:
-            self._set_current_resource()
+            self._set_current_resource(cost)
         return self.current_resource
 
+    def record_usage(self, cost: int = 1) -> None:
+        self.api_key_manager.record_usage(self.current_api_key, cost)
+
     def report_quota_exceeded(self) -> None:
         self.api_key_manager.report_quota_exceeded(self.current_api_key)
         self.current_api_key = None
@@ -0,0 +1,460 @@
+"""Asyncio implementation of the raw interface, over aiohttp.
+
+Needs `aiohttp`, from the `async` extra, which the package doesn't import.
+
+Usage:
+    async with AsyncGoogleYouTubeApi() as api:
+        videos = await api.get_channel_videos(stream_id, limit=100)
+"""
+import asyncio
+from datetime import datetime
+import json
+import logging
+from math import inf
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import httplib2
+from googleapiclient.errors import HttpError
+
+from youtube_api.google.api_key_management import ApiKeyManager
+from youtube_api.google.batching import batch_ids
+from youtube_api.google.metrics import Metrics
+from youtube_api.google.raw_google_api import GoogleApiFunction
+from youtube_api.google.retry import TRANSIENT_ERRORS, Backoff, \
+    RetryPolicy, error_reason, http_error_reason, is_transient
+from youtube_api.google.stream_id_cache import StreamIdCache, \
+    get_uploads_stream_id
+from youtube_api import interface_raw as interface
+
+
+YOUTUBE_API_URL = 'https://www.googleapis.com/youtube/v3'
+
+
+class AsyncResourceManager:
+    """Async counterpart of `ResourceManager`.
+
+    Holds one http session for all requests, with the api key sent as a query
+    parameter on each, so rotating keys costs nothing. `base_url` can point at
+    a local fake server for testing.
+    """
+
+    def __init__(
+            self,
+            api_key_manager: ApiKeyManager,
+            base_url: str = YOUTUBE_API_URL,
+            max_connections: int = 100,
+            retry_policy: Optional[RetryPolicy] = None,
+            metrics: Optional[Metrics] = None
+    ):
+        self.api_key_manager = api_key_manager
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy
+        if metrics is None:
+            metrics = Metrics()
+        self.metrics = metrics
+        self.current_api_key = None
+        self._session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        # sessions have to be created inside the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections))
+        return self._session
+
+    async def get_api_key(self, cost: int = 1) -> str:
+        if self.current_api_key is not None \
+                and not self.api_key_manager.has_quota(
+                    self.current_api_key, cost):
+            # rotate before the api starts failing requests
+            self.current_api_key = None
+        while self.current_api_key is None:
+            api_key = self.api_key_manager.try_get_key(cost)
+            if api_key:
+                self.current_api_key = api_key
+            else:
+                await asyncio.sleep(
+                    self.api_key_manager.secs_until_available())
+        return self.current_api_key
+
+    def report_quota_exceeded(self, api_key: str) -> None:
+        # other tasks may have already moved on to a new key
+        if api_key == self.current_api_key:
+            self.api_key_manager.report_quota_exceeded(api_key)
+            self.current_api_key = None
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncGoogleApiFunction(GoogleApiFunction):
+    """Shares the limit and date helpers of the sync raw functions."""
+
+    def __init__(
+            self,
+            resource_manager: AsyncResourceManager,
+            debug: bool = False
+    ):
+        super().__init__(resource_manager, debug)
+
+    async def _execute(self, api_key: str, **fn_args) -> Dict:
+        session = self.resource_manager.get_session()
+        url = f'{self.resource_manager.base_url}/{self.endpoint}'
+        params = {k: str(v) for k, v in fn_args.items()}
+        params['key'] = api_key
+        async with session.get(url, params=params) as response:
+            content = await response.read()
+            if response.status >= 300:
+                # raise the same error as googleapiclient, for the same handling
+                raise HttpError(
+                    httplib2.Response({'status': response.status}),
+                    content,
+                    uri=url)
+            return json.loads(content)
+
+    async def _timed_execute(self, api_key: str, **fn_args) -> Dict:
+        started = time.perf_counter()
+        reason = 'ok'
+        try:
+            return await self._execute(api_key, **fn_args)
+        except Exception as e:
+            reason = error_reason(e)
+            raise
+        finally:
+            self.resource_manager.metrics.record_request(
+                self.endpoint, api_key, time.perf_counter() - started, reason)
+
+    async def _back_off(self, backoff: Backoff, error: Exception) -> None:
+        delay = backoff.next_delay(error)
+        self.resource_manager.metrics.record_retry(
+            self.endpoint, error_reason(error))
+        await asyncio.sleep(delay)
+
+    async def _paginate(
+            self,
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            **fn_args
+    ) -> List[Dict]:
+        data = []
+        paginator = self._paginator(limit, start)
+        while True:
+            response = await self._wait_while_rate_limited(**fn_args)
+            if self._empty(response):
+                return data
+            items = response['items']
+            self.resource_manager.metrics.record_page(self.endpoint, len(items))
+            data += paginator.trim(items)
+            paginator.update(items)
+            next_page_token = self._get_next_page(response)
+            if not next_page_token or paginator.stop():
+                return data
+            fn_args['pageToken'] = next_page_token
+
+    async def _wait_while_rate_limited(self, **fn_args) -> Dict | None:
+        backoff = self.resource_manager.retry_policy.backoff()
+        while True:
+            api_key = await self.resource_manager.get_api_key(self.quota_cost)
+            self.resource_manager.api_key_manager.record_usage(
+                api_key, self.quota_cost)
+            self.resource_manager.metrics.record_quota(
+                self.endpoint, api_key, self.quota_cost)
+            try:
+                response = await self._timed_execute(api_key, **fn_args)
+                if self.debug:
+                    print(response)
+                return response
+            except HttpError as e:
+                reason = http_error_reason(e)
+                if reason == 'commentsDisabled':
+                    logging.warning(f'Comments disabled.')
+                    return None
+                elif reason == 'videoNotFound':
+                    logging.warning('Video not found.')
+                    return None
+                elif reason == 'quotaExceeded':
+                    logging.warning('Rate limited. Rotating api key...')
+                    self.resource_manager.report_quota_exceeded(api_key)
+                elif is_transient(e):
+                    # e.g. backendError, or a 5xx without details
+                    await self._back_off(backoff, e)
+                elif reason == 'badRequest':
+                    # this doesn't appear to be transient, error for now
+                    logging.warning(f'"Bad request," API key was '
+                                    f'"{api_key}".')
+                    raise e
+                elif reason is None:
+                    raise e
+                else:
+                    raise Exception('Unexpected HttpError reason: %s'
+                                    % reason) from e
+            except (aiohttp.ClientConnectionError, *TRANSIENT_ERRORS) as e:
+                # e.g. timeouts, or dropped connections
+                await self._back_off(backoff, e)
+
+
+class GetChannel(AsyncGoogleApiFunction, interface.GetChannel):
+
+    endpoint = 'channels'
+
+    async def __call__(self, channel_id: str) -> List[Dict]:
+        return await self._paginate(
+            id=channel_id,
+            part='contentDetails,snippet,statistics,topicDetails')
+
+
+class GetChannels(AsyncGoogleApiFunction, interface.GetChannels):
+
+    endpoint = 'channels'
+
+    async def __call__(
+            self,
+            channel_ids: Iterable[str]
+    ) -> Dict[str, Dict | None]:
+        channel_ids = list(channel_ids)
+        batches = await asyncio.gather(*[
+            self._paginate(
+                id=','.join(batch),
+                part='contentDetails,snippet,statistics,topicDetails')
+            for batch in batch_ids(channel_ids)])
+        id_to_channel = {x['id']: x for batch in batches for x in batch}
+        missing = [x for x in channel_ids if x not in id_to_channel]
+        if missing:
+            logging.warning(f'{len(missing)} channels not found: {missing}.')
+        return {x: id_to_channel.get(x) for x in channel_ids}
+
+
+class GetChannelStreamIds(AsyncGoogleApiFunction,
+                          interface.GetChannelStreamIds):
+
+    endpoint = 'channels'
+
+    def __init__(
+            self,
+            resource_manager: AsyncResourceManager,
+            stream_id_cache: Optional[StreamIdCache] = None,
+            debug: bool = False
+    ):
+        super().__init__(resource_manager, debug)
+        if stream_id_cache is None:
+            stream_id_cache = StreamIdCache(':memory:')
+        self.stream_id_cache = stream_id_cache
+
+    async def __call__(
+            self,
+            channel_ids: Iterable[str]
+    ) -> Dict[str, str | None]:
+        channel_ids = list(channel_ids)
+        resolved = self.stream_id_cache.get_many(channel_ids)
+        misses = [x for x in channel_ids if x not in resolved]
+        batches = await asyncio.gather(*[
+            self._paginate(part='contentDetails', id=','.join(batch))
+            for batch in batch_ids(misses)])
+        fetched = {}
+        for channel in (x for batch in batches for x in batch):
+            stream_id = get_uploads_stream_id(channel)
+            if stream_id:
+                fetched[channel['id']] = stream_id
+        self.stream_id_cache.set_many(fetched)
+        resolved.update(fetched)
+        return {x: resolved.get(x) for x in channel_ids}
+
+
+class GetChannelStreamId(GetChannelStreamIds, interface.GetChannelStreamId):
+
+    async def __call__(self, channel_id: str) -> str | None:
+        return (await super().__call__([channel_id]))[channel_id]
+
+
+class GetChannelVideos(AsyncGoogleApiFunction, interface.GetChannelVideos):
+
+    endpoint = 'playlistItems'
+
+    async def __call__(
+            self,
+            channel_stream_id: str,
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> List[Dict]:
+        page_size = 50  # 50 is the max - https://developers.google.com/youtube/v3/docs/channels/list
+        return await self._paginate(
+            limit=limit,
+            start=start,
+            part='snippet',
+            playlistId=channel_stream_id,
+            maxResults=page_size)
+
+
+class GetChannelVideosMany(GetChannelVideos, interface.GetChannelVideosMany):
+    """Yields `(channel_stream_id, videos)` as each channel finishes.
+
+    Usage: `async for stream_id, videos in api.get_channel_videos_many(ids)`.
+    `max_workers` bounds how many channels are paginated at once.
+    """
+
+    async def __call__(
+            self,
+            channel_stream_ids: Iterable[str],
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            max_workers: int = 8
+    ) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get_channel_videos(channel_stream_id: str):
+            async with semaphore:
+                videos = await super(GetChannelVideosMany, self).__call__(
+                    channel_stream_id, limit=limit, start=start, end=end)
+            return channel_stream_id, videos
+
+        tasks = [asyncio.ensure_future(get_channel_videos(x))
+                 for x in channel_stream_ids]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class GetVideoComments(AsyncGoogleApiFunction, interface.GetVideoComments):
+
+    endpoint = 'commentThreads'
+
+    async def __call__(
+            self,
+            video_id: str,
+            limit: int = inf
+    ) -> List[Dict]:
+        page_size = 100  # this is the max
+        if page_size > limit:
+            page_size = limit
+        return await self._paginate(
+            limit=limit,
+            part='snippet,replies',
+            maxResults=page_size,
+            videoId=video_id)
+
+
+class GetVideo(AsyncGoogleApiFunction, interface.GetVideo):
+
+    endpoint = 'videos'
+
+    async def __call__(
+            self,
+            video_id: str
+    ) -> List[Dict]:
+        return await self._paginate(
+            part='snippet,contentDetails,statistics',
+            id=video_id)
+
+
+class GetVideos(AsyncGoogleApiFunction, interface.GetVideos):
+
+    endpoint = 'videos'
+
+    async def __call__(
+            self,
+            video_ids: Iterable[str]
+    ) -> List[Dict | None]:
+        video_ids = list(video_ids)
+        batches = await asyncio.gather(*[
+            self._paginate(
+                part='snippet,contentDetails,statistics',
+                id=','.join(batch))
+            for batch in batch_ids(video_ids)])
+        id_to_video = {x['id']: x for batch in batches for x in batch}
+        missing = [x for x in video_ids if x not in id_to_video]
+        if missing:
+            logging.warning(f'{len(missing)} videos not found: {missing}.')
+        return [id_to_video.get(x) for x in video_ids]
+
+
+class Search(AsyncGoogleApiFunction, interface.Search):
+
+    endpoint = 'search'
+
+    async def __call__(
+            self,
+            query: str,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            type: str = 'video',
+            order: str = 'rating',
+            limit: int = inf,
+            channel_id: Optional[str] = None):
+        if order not in self.search_orders:
+            raise ValueError(f'Unexpected `order`: {order}.')
+        if type not in self.search_types:
+            raise ValueError(f'Unexpected `type`: {type}.')
+        if type in ['channel', 'playlist']:
+            raise NotImplementedError('Have not implemented channel or '
+                                      'playlist search yet.')
+        query = self._escape_pipe(query)
+        fn_args = dict(
+            part='snippet',
+            q=query,
+            maxResults=50,
+            order=order,
+            type=type)
+        if channel_id:
+            fn_args['channelId'] = channel_id
+        if start:
+            fn_args['publishedAfter'] = self._datetime_to_string_for_api(start)
+        if end:
+            fn_args['publishedBefore'] = self._datetime_to_string_for_api(end)
+        return await self._paginate(limit=limit, start=start, **fn_args)
+
+
+class AsyncGoogleYouTubeApi(interface.YouTubeApi):
+
+    def __init__(
+            self,
+            api_key_manager: Optional[ApiKeyManager] = None,
+            stream_id_cache: Optional[StreamIdCache] = None,
+            base_url: str = YOUTUBE_API_URL,
+            max_connections: int = 100,
+            retry_policy: Optional[RetryPolicy] = None,
+            metrics: Optional[Metrics] = None
+    ):
+        if api_key_manager is None:
+            api_key_manager = ApiKeyManager()
+        self.api_key_manager = api_key_manager
+        self.resource_manager = AsyncResourceManager(
+            self.api_key_manager, base_url, max_connections, retry_policy,
+            metrics)
+        if stream_id_cache is None:
+            stream_id_cache = StreamIdCache()
+        self.stream_id_cache = stream_id_cache
+        super().__init__(
+            get_channel=GetChannel(self.resource_manager),
+            get_channels=GetChannels(self.resource_manager),
+            get_channel_stream_id=GetChannelStreamId(
+                self.resource_manager, self.stream_id_cache),
+            get_channel_stream_ids=GetChannelStreamIds(
+                self.resource_manager, self.stream_id_cache),
+            get_channel_videos=GetChannelVideos(self.resource_manager),
+            get_channel_videos_many=GetChannelVideosMany(
+                self.resource_manager),
+            get_video_comments=GetVideoComments(self.resource_manager),
+            get_video=GetVideo(self.resource_manager),
+            get_videos=GetVideos(self.resource_manager),
+            search=Search(self.resource_manager))
+
+    async def close(self) -> None:
+        await self.resource_manager.close()
+
+    async def __aenter__(self) -> 'AsyncGoogleYouTubeApi':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
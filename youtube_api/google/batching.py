@@ -0,0 +1,21 @@
+from typing import Iterable, Iterator, List
+
+
+# the `id` parameter of the list endpoints takes at most 50 comma separated ids
+# https://developers.google.com/youtube/v3/docs/videos/list
+MAX_IDS_PER_REQUEST = 50
+
+
+def batch_ids(
+        ids: Iterable[str],
+        batch_size: int = MAX_IDS_PER_REQUEST
+) -> Iterator[List[str]]:
+    """Yield the unique `ids`, in order first seen, in lists of `batch_size`."""
+    batch = []
+    for id_ in dict.fromkeys(ids):
+        batch.append(id_)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
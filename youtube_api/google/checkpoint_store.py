@@ -0,0 +1,80 @@
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from youtube_api.google.local_store import SqliteStore
+
+
+class CheckpointStore(SqliteStore):
+    """Pages fetched so far by paginations, to resume them after a failure.
+
+    Keyed by endpoint and request parameters (see `key`). After each page, its
+    raw items and the next page token are saved. A pagination resumed from its
+    checkpoint replays the saved pages, then carries on from that token, so
+    the quota spent on those pages is not spent again. Checkpoints are deleted
+    once their pagination finishes.
+    """
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            key TEXT PRIMARY KEY,
+            next_page_token TEXT,
+            num_pages INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS checkpoint_pages (
+            key TEXT NOT NULL,
+            page_num INTEGER NOT NULL,
+            items TEXT NOT NULL,
+            PRIMARY KEY (key, page_num)
+        );
+    '''
+    default_file_name = 'checkpoints.sqlite'
+
+    @staticmethod
+    def key(endpoint: str, fn_args: Dict) -> str:
+        fn_args = {k: v for k, v in fn_args.items() if k != 'pageToken'}
+        return endpoint + json.dumps(fn_args, sort_keys=True, default=str)
+
+    def add_page(
+            self,
+            key: str,
+            items: List[Dict],
+            next_page_token: Optional[str]
+    ) -> None:
+        """Save a page, and where to carry on from (`None` if it's the last)."""
+        self._execute_in_transaction([
+            ('INSERT INTO checkpoint_pages (key, page_num, items) '
+             'SELECT ?, COALESCE(MAX(page_num) + 1, 0), ? '
+             'FROM checkpoint_pages WHERE key = ?',
+             (key, json.dumps(items), key)),
+            ('INSERT INTO checkpoints '
+             '(key, next_page_token, num_pages, updated_at) '
+             'VALUES (?, ?, 1, ?) '
+             'ON CONFLICT (key) DO UPDATE SET '
+             'next_page_token = excluded.next_page_token, '
+             'num_pages = num_pages + 1, '
+             'updated_at = excluded.updated_at',
+             (key, next_page_token, time.time())),
+        ])
+
+    def load(self, key: str) -> Optional[Tuple[List[List[Dict]], str | None]]:
+        """Get `(pages, next_page_token)`, or `None` if there's no checkpoint.
+
+        A `next_page_token` of `None` means the last page was fetched.
+        """
+        rows = self._execute(
+            'SELECT next_page_token FROM checkpoints WHERE key = ?', (key,))
+        if not rows:
+            return None
+        pages = self._execute(
+            'SELECT items FROM checkpoint_pages WHERE key = ? '
+            'ORDER BY page_num',
+            (key,))
+        return [json.loads(x) for x, in pages], rows[0][0]
+
+    def delete(self, key: str) -> None:
+        self._execute_in_transaction([
+            ('DELETE FROM checkpoint_pages WHERE key = ?', (key,)),
+            ('DELETE FROM checkpoints WHERE key = ?', (key,)),
+        ])
@@ -0,0 +1,135 @@
+"""Map pages of raw api items to columns, rather than one object per item.
+
+Each function takes a list of raw items (e.g. a page from `iter_pages`) and
+returns a NumPy structured array with a row per item, so aggregates over many
+pages are vectorized (e.g. `array['num_likes'].sum()`), and pages join with
+`numpy.concatenate`. Ids and text are object columns, timestamps are
+`datetime64[us]` (UTC, naive like `api_string_to_datetime`), and stats are
+`int64`, with `MISSING` where the api leaves one out (e.g. hidden likes).
+
+NumPy is only needed by this module, which the package doesn't import.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from youtube_api.google.timestamps import api_string_to_datetime
+
+
+MISSING = -1
+
+PLAYLIST_ITEM_DTYPE = np.dtype([
+    ('video_id', 'O'),
+    ('channel_id', 'O'),
+    ('published_at', 'datetime64[us]'),
+    ('title', 'O'),
+])
+
+VIDEO_DTYPE = np.dtype([
+    ('id', 'O'),
+    ('channel_id', 'O'),
+    ('published_at', 'datetime64[us]'),
+    ('title', 'O'),
+    ('duration', 'O'),
+    ('num_views', 'int64'),
+    ('num_likes', 'int64'),
+    ('num_dislikes', 'int64'),
+    ('num_comments', 'int64'),
+])
+
+COMMENT_DTYPE = np.dtype([
+    ('id', 'O'),
+    ('video_id', 'O'),
+    ('comment_thread_id', 'O'),
+    ('replied_to_comment_id', 'O'),
+    ('author_channel_id', 'O'),
+    ('published_at', 'datetime64[us]'),
+    ('text', 'O'),
+    ('num_likes', 'int64'),
+    ('num_replies', 'int64'),
+])
+
+
+def to_datetime64(date_times: List[str]) -> np.ndarray:
+    """Parse api datetime strings into a `datetime64[us]` array.
+
+    NumPy parses the ISO 8601 formats all at once, without the `Z`. Should any
+    string not be one of those, the lot go through `api_string_to_datetime`.
+    """
+    stripped = [x[:-1] if x[-1:] == 'Z' else x for x in date_times]
+    try:
+        return np.array(stripped, dtype='datetime64[us]')
+    except ValueError:
+        return np.array([api_string_to_datetime(x) for x in date_times],
+                        dtype='datetime64[us]')
+
+
+def to_int64(values: List[Optional[str]]) -> np.ndarray:
+    """Stats come as strings (or ints), and are left out when hidden."""
+    return np.array([MISSING if x is None else int(x) for x in values],
+                    dtype=np.int64)
+
+
+def playlist_items_to_array(playlist_items: List[Dict]) -> np.ndarray:
+    """Columns as `map_playlist_item_to_video`, for `PLAYLIST_ITEM_DTYPE`."""
+    snippets = [x['snippet'] for x in playlist_items]
+    array = np.empty(len(snippets), dtype=PLAYLIST_ITEM_DTYPE)
+    array['video_id'] = [x['resourceId']['videoId'] for x in snippets]
+    array['channel_id'] = [x['channelId'] for x in snippets]
+    array['published_at'] = to_datetime64([x['publishedAt'] for x in snippets])
+    array['title'] = [x['title'] for x in snippets]
+    return array
+
+
+def videos_to_array(videos: List[Dict]) -> np.ndarray:
+    """Columns as `map_video_to_video` and its stats, for `VIDEO_DTYPE`."""
+    snippets = [x['snippet'] for x in videos]
+    statistics = [x.get('statistics', {}) for x in videos]
+    array = np.empty(len(videos), dtype=VIDEO_DTYPE)
+    array['id'] = [x['id'] for x in videos]
+    array['channel_id'] = [x['channelId'] for x in snippets]
+    array['published_at'] = to_datetime64([x['publishedAt'] for x in snippets])
+    array['title'] = [x['title'] for x in snippets]
+    array['duration'] = [x['contentDetails']['duration'] for x in videos]
+    array['num_views'] = to_int64([x.get('viewCount') for x in statistics])
+    array['num_likes'] = to_int64([x.get('likeCount') for x in statistics])
+    array['num_dislikes'] = to_int64(
+        [x.get('dislikeCount') for x in statistics])
+    array['num_comments'] = to_int64(
+        [x.get('commentCount') for x in statistics])
+    return array
+
+
+def comment_threads_to_array(comment_threads: List[Dict]) -> np.ndarray:
+    """Columns as `map_comment_thread_to_comments`, for `COMMENT_DTYPE`.
+
+    A row per comment: each top level comment, followed by its replies.
+    """
+    comments = []
+    thread_ids = []
+    num_replies = []
+    for comment_thread in comment_threads:
+        snippet = comment_thread['snippet']
+        comments.append(snippet['topLevelComment'])
+        thread_ids.append(comment_thread['id'])
+        num_replies.append(snippet['totalReplyCount'])
+        if 'replies' in comment_thread:
+            replies = comment_thread['replies']['comments']
+            comments += replies
+            thread_ids += [comment_thread['id']] * len(replies)
+            # by definition comments other than root have none
+            num_replies += [0] * len(replies)
+    snippets = [x['snippet'] for x in comments]
+    array = np.empty(len(comments), dtype=COMMENT_DTYPE)
+    array['id'] = [x['id'] for x in comments]
+    array['video_id'] = [x['videoId'] for x in snippets]
+    array['comment_thread_id'] = thread_ids
+    array['replied_to_comment_id'] = [x.get('parentId') for x in snippets]
+    array['author_channel_id'] = [
+        x['authorChannelId']['value'] if 'authorChannelId' in x else None
+        for x in snippets]
+    array['published_at'] = to_datetime64([x['publishedAt'] for x in snippets])
+    array['text'] = [x['textOriginal'] for x in snippets]
+    array['num_likes'] = to_int64([x['likeCount'] for x in snippets])
+    array['num_replies'] = np.array(num_replies, dtype=np.int64)
+    return array
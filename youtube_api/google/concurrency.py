@@ -0,0 +1,95 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+
+def fan_out(
+        fn: Callable,
+        args: Iterable[Any],
+        max_workers: int = 8
+) -> Iterator[Tuple[Any, Any]]:
+    """Call `fn(arg)` for each of `args` on a thread pool.
+
+    Yields `(arg, result)` pairs in order of completion. Calls are submitted
+    as results are consumed, at most `2 * max_workers` ahead, and results are
+    let go once yielded, so those not yet consumed don't pile up. If any call
+    raises, the exception is re-raised here and calls not yet started are
+    cancelled.
+    """
+    args = iter(args)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {}
+
+    def submit(num_calls: int) -> None:
+        for arg in islice(args, num_calls):
+            futures[executor.submit(fn, arg)] = arg
+
+    try:
+        submit(2 * max_workers)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            while done:
+                future = done.pop()
+                arg = futures.pop(future)
+                result = future.result()
+                submit(1)
+                yield arg, result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fan_out_iter(
+        fn: Callable[[Any], Iterable],
+        args: Iterable[Any],
+        max_workers: int = 8,
+        max_pending: int = 16
+) -> Iterator[Tuple[Any, Any]]:
+    """Iterate `fn(arg)` for each of `args` on a thread pool.
+
+    Yields `(arg, item)` pairs as the items are produced. At most `max_pending`
+    items wait to be consumed: beyond that, workers block rather than buffer.
+    Exceptions are re-raised here, as by `fan_out`. Closing the iterator early
+    stops the workers after their current item.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+    stopped = threading.Event()
+    finished = object()
+
+    def put(entry: Tuple) -> bool:
+        while not stopped.is_set():
+            try:
+                pending.put(entry, timeout=.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def consume(arg: Any) -> None:
+        try:
+            for item in fn(arg):
+                if not put((arg, item, None)):
+                    return
+        except Exception as e:
+            put((arg, finished, e))
+        else:
+            put((arg, finished, None))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        num_running = 0
+        for arg in args:
+            executor.submit(consume, arg)
+            num_running += 1
+        while num_running:
+            arg, item, error = pending.get()
+            if error is not None:
+                raise error
+            if item is finished:
+                num_running -= 1
+            else:
+                yield arg, item
+    finally:
+        stopped.set()
+        executor.shutdown(wait=False, cancel_futures=True)
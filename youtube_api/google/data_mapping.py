@@ -1,33 +1,9 @@
 from datetime import datetime
 from typing import Any, Dict, List, Union
 
+# the mapped api's whole job is building these, so it loads them on import
 from data_structures.youtube import *
-
-
-def api_string_to_datetime(date_time: str) -> datetime:
-    # seen all of these come from the api
-    date_formats = [
-        '%Y-%m-%dT%H:%M:%SZ',
-        '%Y-%m-%dT%H:%M:%S.%fZ',
-        '%Y-%m-%d %H:%M:%S',
-    ]
-
-    # try all possibilities
-    success = False
-    for date_format in date_formats:
-        try:
-            date_time = datetime.strptime(date_time, date_format)
-            success = True
-            break
-        except ValueError:
-            continue
-
-    # if success, return the datetime
-    if success:
-        return date_time
-    # otherwise throw an exception with the input for feedback
-    else:
-        raise ValueError(date_time)
+from youtube_api.google.timestamps import api_string_to_datetime
 
 
 def attr_or_none(mapping: Dict, keys: List[str], cast_fn=None) \
@@ -1,137 +1,74 @@
+from __future__ import annotations
+
 from datetime import datetime
 from functools import partial
 import logging
 from math import inf
 import os
-import random
 import time
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, \
+    Tuple, TYPE_CHECKING, Union
 
-import googleapiclient.discovery
 import googleapiclient.errors
 from googleapiclient.errors import HttpError
 
-from data_structures.youtube import *
+from youtube_api.google.api_key_management import ApiKeyManager, ResourceManager
+from youtube_api.google.batching import batch_ids
+from youtube_api.google.checkpoint_store import CheckpointStore
+from youtube_api.google.concurrency import fan_out, fan_out_iter
 from youtube_api.google.data_mapping import *
+from youtube_api.google.key_state_store import KeyStateStore
+from youtube_api.google.pagination import StopWhenAtLimit, \
+    StopWhenAtSizeOrDateLimit
+from youtube_api.google.quota import quota_cost
+from youtube_api.google.replies import complete_replies
+from youtube_api.google.resource_factory import KeyedResource, \
+    default_resource_factory
+from youtube_api.google.response_cache import ResponseCache, execute
+from youtube_api.google.metrics import Metrics
+from youtube_api.google.retry import TRANSIENT_ERRORS, Backoff, \
+    RetryPolicy, error_reason, http_error_reason, is_transient
+from youtube_api.google.stream_id_cache import StreamIdCache, resolve_stream_ids
+from youtube_api.google.tracing import SpanCollector, Tracer, trace_decoding
 from youtube_api import interface
 
+if TYPE_CHECKING:
+    from data_structures.youtube import *
+    import googleapiclient.discovery
 
-def get_keys(keys_dir: str = os.environ['YOUTUBE_API_KEYS_DIR']) -> List[str]:
-    keys = []
-    for file_name in os.listdir(keys_dir):
-        if not file_name.endswith('.key'):
-            continue
-        file_path = os.path.join(keys_dir, file_name)
-        with open(file_path) as f:
-            try:
-                key = f.read().strip()
-            except Exception as e:
-                print(file_path)
-                raise e
-            keys.append(key)
-    return keys
+
+def get_keys(keys_dir: Optional[str] = None) -> List[str]:
+    return ApiKeyManager.load_keys(keys_dir)
 
 
-def get_resource(api_key: Optional[str] = None):
+def get_resource(api_key: Optional[str] = None) -> KeyedResource:
     if not api_key:
         api_key = os.environ['API_KEY']
-    return googleapiclient.discovery.build(
-        'youtube', 'v3', developerKey=api_key)
-
-
-def stop_when_at_limit(data: List[Any], limit: int) -> bool:
-    return len(data) >= limit
-
-
-def stop_when_at_size_or_date_limit(data: List[Any],
-                                    limit: int,
-                                    start: datetime) -> bool:
-    # assumes working backwards through time
-    # assumes Any is an object with a `created_at` property
-    return len(data) > limit or min(x.created_at for x in data) < start
-
-
-class ApiKeyManager:
-
-    def __init__(self,
-                 api_keys: List[str] = None,
-                 wait_mins: int = 60):
-        if api_keys is None:
-            api_keys = get_keys()
-        random.shuffle(api_keys)
-        self.api_key_to_exceeded_time = {
-            key: datetime(2000, 1, 1) for key in api_keys}
-        self.wait_mins = wait_mins
-
-    @staticmethod
-    def _get_mins_diff(exceeded_time: datetime) -> int:
-        diff_secs = (datetime.now() - exceeded_time).total_seconds()
-        return int(round(diff_secs / 60, 0))
-
-    def _get_next_available_key(self) -> Union[str, None]:
-        logging.info('Looking for next available api key...')
-        key_diff = [
-            {'key': k, 'diff': self._get_mins_diff(t)}
-            for k, t in self.api_key_to_exceeded_time.items()]
-        for x in key_diff:
-            logging.info('Api key "%s" status: reported exceeded %s mins ago.'
-                         % (x['key'], x['diff']))
-        key_diff = list(reversed(sorted(key_diff, key=lambda x: x['diff'])))
-        next_key, diff = key_diff[0]['key'], key_diff[0]['diff']
-        if diff < self.wait_mins:
-            logging.info(f'No keys expired less than {self.wait_mins} mins '
-                         f'ago.')
-            return None
-        else:
-            logging.info(f'Returning new api key "{next_key}".')
-            return next_key
-
-    def get_key(self) -> str:
-        while True:
-            api_key = self._get_next_available_key()
-            if not api_key:
-                time.sleep(self.wait_mins * 60)
-            else:
-                return api_key
-
-    def report_quota_exceeded(self, api_key: str) -> None:
-        exceeded_time = datetime.now()
-        exceeded_time_str = exceeded_time.strftime('%Y-%m-%d %H:%M:%S')
-        logging.info(f'Api key "{api_key}" quota reported '
-                     f'exceeded at {exceeded_time_str}.')
-        self.api_key_to_exceeded_time[api_key] = exceeded_time
-
-
-class ResourceManager:
-
-    def __init__(self, api_key_manager: ApiKeyManager):
-        self.api_key_manager = api_key_manager
-        # since getting a resource can involve waiting, only try when asked
-        # for a resource
-        self.current_api_key = None
-        self.current_resource = None
-
-    def _set_current_resource(self) -> None:
-        self.current_api_key = self.api_key_manager.get_key()
-        self.current_resource = get_resource(self.current_api_key)
-
-    def get_resource(self) -> googleapiclient.discovery.Resource:
-        if not self.current_resource:
-            self._set_current_resource()
-        return self.current_resource
-
-    def report_quota_exceeded(self) -> None:
-        self.api_key_manager.report_quota_exceeded(self.current_api_key)
-        self.current_api_key = None
-        self.current_resource = None
+    import httplib2
+    return KeyedResource(default_resource_factory, api_key, httplib2.Http())
 
 
 class GoogleApiFunction:
 
+    # e.g. `videos` for `youtube/v3/videos`
+    endpoint: str = ''
+    # long paginations save checkpoints, if there's a checkpoint store
+    checkpointed: bool = False
+
     def __init__(self, resource_manager: ResourceManager, debug: bool = False):
         self.resource_manager = resource_manager
         self.debug = debug
 
+    @property
+    def checkpoint_store(self) -> Optional[CheckpointStore]:
+        if not self.checkpointed:
+            return None
+        return self.resource_manager.checkpoint_store
+
+    @property
+    def quota_cost(self) -> int:
+        return quota_cost(self.endpoint)
+
     @staticmethod
     def _datetime_to_string_for_api(date_time: datetime) -> str:
         return date_time.strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -149,84 +86,183 @@ class GoogleApiFunction:
             if 'nextPageToken' in response \
             else None
 
-    def paginate(self,
-                 stop_fn: Callable = lambda x: False,
-                 **kwargs) -> List[Any]:
-        response = self.wait_while_rate_limited(**kwargs)
-        if not response:
-            return []
-        data = self.extract_data(response)
-        next_page_token = self.get_next_page(response)
-        while next_page_token and not stop_fn(data):
-            kwargs['pageToken'] = next_page_token
+    def iter_items(self, *args, **kwargs) -> Iterator[Any]:
+        """Like calling this function, but yields each item as it arrives."""
+        for page in self.iter_pages(*args, **kwargs):
+            yield from page
+
+    def iter_pages(self, *args, **kwargs) -> Iterator[List[Any]]:
+        """Like calling this function, but yields each page as it arrives."""
+        raise NotImplementedError
+
+    def iter_responses(self, resume: bool = False, **kwargs) \
+            -> Iterator[Dict]:
+        """Yield each non-empty response, following page tokens.
+
+        If checkpointed, each page is saved as it arrives, and with
+        `resume`, the pages saved by an unfinished pagination with the same
+        arguments are replayed before carrying on from where it stopped.
+        """
+        store = self.checkpoint_store
+        if store is not None:
+            key = store.key(self.endpoint, kwargs)
+            checkpoint = store.load(key) if resume else None
+            if checkpoint is None:
+                store.delete(key)
+            else:
+                pages, next_page_token = checkpoint
+                logging.info(f'Resuming {key} after {len(pages)} pages.')
+                for items in pages:
+                    yield {'items': items}
+                if not next_page_token:
+                    return
+                kwargs['pageToken'] = next_page_token
+        while True:
             response = self.wait_while_rate_limited(**kwargs)
             if not response:
-                return []
-            data += self.extract_data(response)
+                return
+            self.resource_manager.metrics.record_page(
+                self.endpoint, len(response.get('items', [])))
             next_page_token = self.get_next_page(response)
+            if store is not None:
+                store.add_page(key, response.get('items', []), next_page_token)
+            yield response
+            if not next_page_token:
+                return
+            kwargs['pageToken'] = next_page_token
+
+    def paginate(self,
+                 stop_fn: Callable = lambda x: False,
+                 resume: bool = False,
+                 **kwargs) -> List[Any]:
+        data = []
+        for page in self.paginate_pages(stop_fn, resume, **kwargs):
+            data += page
         return data
 
+    def paginate_pages(self,
+                       stop_fn: Callable = lambda x: False,
+                       resume: bool = False,
+                       extract_data: Optional[Callable] = None,
+                       **kwargs) -> Iterator[List[Any]]:
+        """Yield the data of each page as it arrives.
+
+        `stop_fn` is called with each page, e.g. a `pagination.Paginator`.
+        See `iter_responses` for `resume`. The data is got from each response
+        by `extract_data`, if given, else `self.extract_data`.
+        """
+        if extract_data is None:
+            extract_data = self.extract_data
+        tracer = self.resource_manager.tracer
+        function = type(self).__name__
+        for response in self.iter_responses(resume, **kwargs):
+            with tracer.span(function, 'map'):
+                page = extract_data(response)
+            yield page
+            if stop_fn(page):
+                break
+        store = self.checkpoint_store
+        if store is not None:
+            store.delete(store.key(self.endpoint, kwargs))
+
+    def record_usage(self) -> None:
+        self.resource_manager.record_usage(self.quota_cost)
+        self.resource_manager.metrics.record_quota(
+            self.endpoint,
+            self.resource_manager.current_api_key,
+            self.quota_cost)
+
+    def execute(self, request, kwargs: Dict) -> Dict:
+        """Execute a request, recording its latency and any error's reason."""
+        api_key = self.resource_manager.current_api_key
+        tracer = self.resource_manager.tracer
+        function = type(self).__name__
+        trace_decoding(tracer, function, request)
+        started = time.perf_counter()
+        reason = 'ok'
+        try:
+            with tracer.span(function, 'http'):
+                return execute(
+                    request, kwargs, self.resource_manager.response_cache)
+        except Exception as e:
+            reason = error_reason(e)
+            raise
+        finally:
+            self.resource_manager.metrics.record_request(
+                self.endpoint, api_key, time.perf_counter() - started, reason)
+
+    def back_off(self, backoff: Backoff, error: Exception) -> None:
+        delay = backoff.next_delay(error)
+        self.resource_manager.metrics.record_retry(
+            self.endpoint, error_reason(error))
+        time.sleep(delay)
+
     def wait_while_rate_limited(self, **kwargs):
+        backoff = self.resource_manager.retry_policy.backoff()
+        tracer = self.resource_manager.tracer
+        function = type(self).__name__
         while True:
             try:
-                resource = self.resource_manager.get_resource()
-                fn = self.get_function(resource)
-                request = fn(**kwargs)
-                response = request.execute()
+                with tracer.span(function, 'key'):
+                    resource = self.resource_manager.get_resource(
+                        self.quota_cost)
+                with tracer.span(function, 'build'):
+                    fn = self.get_function(resource)
+                    request = fn(**kwargs)
+                self.record_usage()
+                response = self.execute(request, kwargs)
                 if self.debug:
                     print(response)
                 return response
             except HttpError as e:
-                if e.error_details[0]['reason'] == 'commentsDisabled':
+                reason = http_error_reason(e)
+                if reason == 'commentsDisabled':
                     logging.warning(f'Comments disabled.')
                     return []
-                elif e.error_details[0]['reason'] == 'videoNotFound':
+                elif reason == 'videoNotFound':
                     logging.warning('Video not found.')
                     return []
-                elif e.error_details[0]['reason'] == 'quotaExceeded':
-                    logging.warning('Rate limited. Waiting one hour...')
+                elif reason == 'quotaExceeded':
+                    logging.warning('Rate limited. Rotating api key...')
+                    # benched until the quota resets, so the retry gets
+                    # another key (and waits only if none have quota)
                     self.resource_manager.report_quota_exceeded()
-                    # NOTE: waiting handled by resource_factory.api_key_manager
-                elif e.error_details[0]['reason'] == 'SERVICE_UNAVAILABLE':
-                    # assuming this is transient
-                    logging.warning('Service unavailable. Waiting 5 mins...')
-                    time.sleep(5 * 60)
-                elif e.error_details[0]['reason'] == 'backendError':
-                    # assuming this is transient
-                    logging.warning('Backend error. Waiting 5 mins...')
-                    time.sleep(5 * 60)
-                elif e.error_details[0]['reason'] == 'badRequest':
+                elif is_transient(e):
+                    # e.g. backendError, or a 5xx without details
+                    self.back_off(backoff, e)
+                elif reason == 'badRequest':
                     # this doesn't appear to be transient, error for now
                     logging.warning(f'"Bad request," API key was '
                                     f'"{self.resource_manager.current_api_key}"'
                                     f'.')
                     raise e
+                elif reason is None:
+                    raise e
                 else:
                     raise Exception('Unexpected HttpError reason: %s'
-                                    % e.error_details[0]['reason'])
-            except Exception as e:
-                print('*' * 8)
-                print(response)
-                print(response.__dict__)
-                print(e)
-                print(type(e))
-                print(str(e))
-                print(e.__dict__)
-                raise e
+                                    % reason) from e
+            except TRANSIENT_ERRORS as e:
+                # e.g. socket timeouts
+                self.back_off(backoff, e)
 
 
 class GetChannel(GoogleApiFunction, interface.GetChannel):
 
+    endpoint = 'channels'
+
     def __call__(self, channel_id: str) -> Union[YouTubeChannel, None]:
-        data = self.paginate(
-            id=channel_id,
-            part='contentDetails,snippet,statistics,topicDetails')
+        data = list(self.iter_items(channel_id))
         # TODO: proper way to know that no data is returned?
         if len(data) == 0:
             return None
         else:
             return data[0]
 
+    def iter_pages(self, channel_id: str) -> Iterator[List[YouTubeChannel]]:
+        return self.paginate_pages(
+            id=channel_id,
+            part='contentDetails,snippet,statistics,topicDetails')
+
     def extract_data(self, response) -> List[YouTubeChannel]:
         channels = []
         if 'items' not in response:
@@ -241,28 +277,129 @@ class GetChannel(GoogleApiFunction, interface.GetChannel):
         return resource.channels().list
 
 
+class GetChannels(GoogleApiFunction, interface.GetChannels):
+
+    endpoint = 'channels'
+
+    def __call__(self, channel_ids: Iterable[str]) \
+            -> Dict[str, Optional[YouTubeChannel]]:
+        channel_ids = list(channel_ids)
+        id_to_channel = {}
+        for channel in self.iter_items(channel_ids):
+            id_to_channel[channel.id] = channel
+        missing = [x for x in channel_ids if x not in id_to_channel]
+        if missing:
+            logging.warning(f'{len(missing)} channels not found: {missing}.')
+        return {x: id_to_channel.get(x) for x in channel_ids}
+
+    def iter_pages(self, channel_ids: Iterable[str]) \
+            -> Iterator[List[YouTubeChannel]]:
+        """Yields the channels found, a page per batch of 50 ids."""
+        for batch in batch_ids(channel_ids):
+            yield from self.paginate_pages(
+                id=','.join(batch),
+                part='contentDetails,snippet,statistics,topicDetails')
+
+    def extract_data(self, response) -> List[YouTubeChannel]:
+        if 'items' not in response:
+            return []
+        return [map_channel_to_channel(x) for x in response['items']]
+
+    def get_function(self, resource: googleapiclient.discovery.Resource) \
+            -> Callable:
+        return resource.channels().list
+
+
+class ListChannelContentDetails(GoogleApiFunction):
+    """Raw `contentDetails` of up to 50 channels, for resolving streams."""
+
+    endpoint = 'channels'
+
+    def __call__(self, channel_ids: List[str]) -> List[Dict]:
+        return self.paginate(
+            part='contentDetails',
+            id=','.join(channel_ids))
+
+    def extract_data(self, response) -> List[Dict]:
+        if 'items' not in response:
+            return []
+        return response['items']
+
+    def get_function(self, resource: googleapiclient.discovery.Resource) \
+            -> Callable:
+        return resource.channels().list
+
+
 class GetChannelVideos(GoogleApiFunction, interface.GetChannelVideos):
 
+    endpoint = 'playlistItems'
+    checkpointed = True
+
+    def __init__(self,
+                 resource_manager: ResourceManager,
+                 stream_id_cache: Optional[StreamIdCache] = None,
+                 debug: bool = False):
+        super().__init__(resource_manager, debug)
+        if stream_id_cache is None:
+            stream_id_cache = StreamIdCache(':memory:')
+        self.stream_id_cache = stream_id_cache
+        self.list_channel_content_details = ListChannelContentDetails(
+            resource_manager, debug)
+
     def __call__(self,
                  channel_id: str,
                  limit: int = inf,
                  start: Optional[datetime] = None,
-                 end: Optional[datetime] = None) -> List[YouTubeVideo]:
-        uploads_stream = self.get_uploads_stream(channel_id)
-        stop_fn = partial(
-            stop_when_at_size_or_date_limit,
-            limit=limit,
-            start=start)
-        data = self.paginate(
-            stop_fn=stop_fn,
-            part='snippet',
-            playlistId=uploads_stream)
-        data = [x for x in data
-                if start <= x.created_at <= end]
+                 end: Optional[datetime] = None,
+                 resume: bool = False) -> List[YouTubeVideo]:
+        """Get a channel's videos.
+
+        With `resume`, carries on from the checkpoint of an earlier call with
+        the same channel that did not finish, if the resource manager has a
+        checkpoint store.
+        """
+        data = []
+        for page in self._iter_channel_pages(
+                channel_id, limit, start, end, resume):
+            data += page
         if len(data) > limit:
             data = data[-limit:]
         return data
 
+    def iter_pages(self,
+                   channel_id: str,
+                   limit: int = inf,
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None,
+                   resume: bool = False) \
+            -> Iterator[List[YouTubeVideo]]:
+        """Yields videos between `start` and `end`, a page at a time.
+
+        Stops after the page that goes over `limit`, so may yield more than
+        `limit` videos; calling this function keeps only `limit` of them.
+        """
+        return self._iter_channel_pages(channel_id, limit, start, end, resume)
+
+    def _iter_channel_pages(self,
+                            channel_id: str,
+                            limit: int = inf,
+                            start: Optional[datetime] = None,
+                            end: Optional[datetime] = None,
+                            resume: bool = False) \
+            -> Iterator[List[YouTubeVideo]]:
+        uploads_stream = self.get_uploads_stream(channel_id)
+        stop_fn = StopWhenAtSizeOrDateLimit(limit, start)
+        for page in self.paginate_pages(
+                stop_fn=stop_fn,
+                resume=resume,
+                part='snippet',
+                playlistId=uploads_stream):
+            page = [x for x in page
+                    if (start is None or start <= x.created_at)
+                    and (end is None or x.created_at <= end)]
+            if page:
+                yield page
+
     def extract_data(self, response) -> List[YouTubeVideo]:
         videos = []
         for playlist_item in response['items']:
@@ -275,28 +412,153 @@ class GetChannelVideos(GoogleApiFunction, interface.GetChannelVideos):
         return resource.playlistItems().list
 
     def get_uploads_stream(self, channel_id: str) -> str:
-        resource = self.resource_manager.get_resource()
-        request = resource.channels().list(
-            part='contentDetails',
-            id=channel_id)
-        response = request.execute()
-        return response['items'][0]['contentDetails']['relatedPlaylists'][
-            'uploads']
+        uploads_stream = self.get_uploads_streams([channel_id])[channel_id]
+        if uploads_stream is None:
+            raise ValueError(f'No uploads stream found for {channel_id}.')
+        return uploads_stream
+
+    def get_uploads_streams(self, channel_ids: Iterable[str]) \
+            -> Dict[str, Optional[str]]:
+        return resolve_stream_ids(
+            channel_ids,
+            cache=self.stream_id_cache,
+            list_channels=self.list_channel_content_details)
+
+
+class GetChannelVideosMany(GetChannelVideos, interface.GetChannelVideosMany):
+
+    def __call__(self,
+                 channel_ids: Iterable[str],
+                 limit: int = inf,
+                 start: Optional[datetime] = None,
+                 end: Optional[datetime] = None,
+                 max_workers: int = 8,
+                 resume: bool = False) \
+            -> Iterator[Tuple[str, List[YouTubeVideo]]]:
+        channel_ids = list(channel_ids)
+        # resolve all uploads streams up front, 50 channels per request
+        self.get_uploads_streams(channel_ids)
+        get_channel_videos = partial(
+            super().__call__,
+            limit=limit,
+            start=start,
+            end=end,
+            resume=resume)
+        return fan_out(get_channel_videos, channel_ids, max_workers)
+
+    def iter_pages(self,
+                   channel_ids: Iterable[str],
+                   limit: int = inf,
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None,
+                   max_workers: int = 8,
+                   resume: bool = False) \
+            -> Iterator[Tuple[str, List[YouTubeVideo]]]:
+        """Yields `(channel_id, page)` pairs as pages arrive.
+
+        Workers wait while pages are not consumed, so few are held at once.
+        """
+        channel_ids = list(channel_ids)
+        self.get_uploads_streams(channel_ids)
+        iter_channel_pages = partial(
+            self._iter_channel_pages,
+            limit=limit,
+            start=start,
+            end=end,
+            resume=resume)
+        return fan_out_iter(iter_channel_pages, channel_ids, max_workers)
+
+    def iter_items(self, *args, **kwargs) \
+            -> Iterator[Tuple[str, YouTubeVideo]]:
+        """Yields `(channel_id, video)` pairs as pages arrive."""
+        for channel_id, page in self.iter_pages(*args, **kwargs):
+            for video in page:
+                yield channel_id, video
+
+
+class GetCommentReplies(GoogleApiFunction):
+    """Get all the replies to a top level comment."""
+
+    endpoint = 'comments'
+
+    def __call__(self, parent_id: str) -> List[YouTubeComment]:
+        return list(self.iter_items(parent_id))
+
+    def iter_pages(self, parent_id: str) -> Iterator[List[YouTubeComment]]:
+        return self.paginate_pages(**self.list_args(parent_id))
+
+    def list_raw(self, parent_id: str) -> List[Dict]:
+        """Get the replies unmapped, e.g. to complete a raw comment thread."""
+        replies = []
+        for response in self.iter_responses(**self.list_args(parent_id)):
+            replies += response.get('items', [])
+        return replies
+
+    @staticmethod
+    def list_args(parent_id: str) -> Dict:
+        return dict(
+            part='snippet',
+            maxResults=100,  # this is the max
+            parentId=parent_id)
+
+    def extract_data(self, response) -> List[YouTubeComment]:
+        # the thread of a reply has the id of its top level comment
+        return [map_comment_to_comment(x, x['snippet']['parentId'])
+                for x in response['items']]
+
+    def get_function(self, resource: googleapiclient.discovery.Resource) \
+            -> Callable:
+        return resource.comments().list
 
 
 class GetVideoComments(GoogleApiFunction, interface.GetVideoComments):
 
-    def __call__(self, video_id: str, limit: int = inf) -> List[YouTubeComment]:
+    endpoint = 'commentThreads'
+    checkpointed = True
+
+    def __init__(self, resource_manager: ResourceManager, debug: bool = False):
+        super().__init__(resource_manager, debug)
+        self.get_comment_replies = GetCommentReplies(resource_manager, debug)
+
+    def __call__(self,
+                 video_id: str,
+                 limit: int = inf,
+                 resume: bool = False,
+                 full_replies: bool = False,
+                 max_workers: int = 8) -> List[YouTubeComment]:
+        """Get a video's comments.
+
+        With `resume`, carries on from the checkpoint of an earlier call for
+        the same video that did not finish, if the resource manager has a
+        checkpoint store.
+
+        Threads only inline a few replies. With `full_replies`, the rest are
+        fetched for each page, on `max_workers` threads, and replace them.
+        """
+        return list(self.iter_items(
+            video_id, limit, resume, full_replies, max_workers))
+
+    def iter_pages(self,
+                   video_id: str,
+                   limit: int = inf,
+                   resume: bool = False,
+                   full_replies: bool = False,
+                   max_workers: int = 8) \
+            -> Iterator[List[YouTubeComment]]:
         page_size = 100  # this is the max
         if page_size > limit:
             page_size = limit
-        stop_fn = partial(stop_when_at_limit, limit=limit)
-        data = self.paginate(
-            stop_fn=stop_fn,
+        extract_data = self.extract_data
+        if full_replies:
+            extract_data = partial(
+                self.extract_data_with_full_replies, max_workers=max_workers)
+        return self.paginate_pages(
+            stop_fn=StopWhenAtLimit(limit),
+            resume=resume,
+            extract_data=extract_data,
             part='snippet,replies',
             maxResults=page_size,
             videoId=video_id)
-        return data
 
     def extract_data(self, response) -> List[YouTubeComment]:
         comments = []
@@ -304,6 +566,12 @@ class GetVideoComments(GoogleApiFunction, interface.GetVideoComments):
             comments += map_comment_thread_to_comments(comment_thread)
         return comments
 
+    def extract_data_with_full_replies(self, response, max_workers: int = 8) \
+            -> List[YouTubeComment]:
+        comment_threads = complete_replies(
+            response['items'], self.get_comment_replies.list_raw, max_workers)
+        return self.extract_data({'items': comment_threads})
+
     def get_function(self, resource: googleapiclient.discovery.Resource) \
             -> Callable:
         return resource.commentThreads().list
@@ -311,14 +579,54 @@ class GetVideoComments(GoogleApiFunction, interface.GetVideoComments):
 
 class GetVideo(GoogleApiFunction, interface.GetVideo):
 
+    endpoint = 'videos'
+
     def __call__(self, video_id: str) -> YouTubeVideo:
-        data = self.paginate(
-            part='snippet,contentDetails,statistics',
-            id=video_id)
+        data = list(self.iter_items(video_id))
         if len(data) == 0:
             raise ValueError(f'No video found for {video_id}.')
         return data[0]
 
+    def iter_pages(self, video_id: str) -> Iterator[List[YouTubeVideo]]:
+        return self.paginate_pages(
+            part='snippet,contentDetails,statistics',
+            id=video_id)
+
+    def extract_data(self, response) -> List[YouTubeVideo]:
+        videos = []
+        for video in response['items']:
+            video = map_video_to_video(video)
+            videos.append(video)
+        return videos
+
+    def get_function(self, resource: googleapiclient.discovery.Resource) \
+            -> Callable:
+        return resource.videos().list
+
+
+class GetVideos(GoogleApiFunction, interface.GetVideos):
+
+    endpoint = 'videos'
+
+    def __call__(self, video_ids: Iterable[str]) \
+            -> List[Optional[YouTubeVideo]]:
+        video_ids = list(video_ids)
+        id_to_video = {}
+        for video in self.iter_items(video_ids):
+            id_to_video[video.id] = video
+        missing = [x for x in video_ids if x not in id_to_video]
+        if missing:
+            logging.warning(f'{len(missing)} videos not found: {missing}.')
+        return [id_to_video.get(x) for x in video_ids]
+
+    def iter_pages(self, video_ids: Iterable[str]) \
+            -> Iterator[List[YouTubeVideo]]:
+        """Yields the videos found, a page per batch of 50 ids."""
+        for batch in batch_ids(video_ids):
+            yield from self.paginate_pages(
+                part='snippet,contentDetails,statistics',
+                id=','.join(batch))
+
     def extract_data(self, response) -> List[YouTubeVideo]:
         videos = []
         for video in response['items']:
@@ -333,6 +641,8 @@ class GetVideo(GoogleApiFunction, interface.GetVideo):
 
 class Search(GoogleApiFunction, interface.Search):
 
+    endpoint = 'search'
+
     def __call__(self,
                  query: str,
                  start: Optional[datetime] = None,
@@ -340,7 +650,19 @@ class Search(GoogleApiFunction, interface.Search):
                  type: str = 'video',
                  order: str = 'rating',
                  limit: int = inf,
-                 channel_id: Optional[str] = None):
+                 channel_id: Optional[str] = None) -> List[YouTubeVideo]:
+        return list(self.iter_items(
+            query, start, end, type, order, limit, channel_id))
+
+    def iter_pages(self,
+                   query: str,
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None,
+                   type: str = 'video',
+                   order: str = 'rating',
+                   limit: int = inf,
+                   channel_id: Optional[str] = None) \
+            -> Iterator[List[YouTubeVideo]]:
         if order not in self.search_orders:
             raise ValueError(f'Unexpected `order`: {order}.')
         if type not in self.search_types:
@@ -349,7 +671,7 @@ class Search(GoogleApiFunction, interface.Search):
             raise NotImplementedError('Have not implemented channel or '
                                       'playlist search yet.')
         query = self._escape_pipe(query)
-        stop_fn = partial(stop_when_at_limit, limit=limit)
+        stop_fn = StopWhenAtLimit(limit)
         kwargs = dict(
             part='snippet',
             q=query,
@@ -364,8 +686,7 @@ class Search(GoogleApiFunction, interface.Search):
             kwargs['publishedAfter'] = self._datetime_to_string_for_api(start)
         if end:
             kwargs['publishedBefore'] = self._datetime_to_string_for_api(end)
-        data = self.paginate(**kwargs)
-        return data
+        return self.paginate_pages(**kwargs)
 
     def extract_data(self, response) -> List[YouTubeVideo]:
         data = []
@@ -388,14 +709,43 @@ class Search(GoogleApiFunction, interface.Search):
 
 class GoogleYouTubeApi(interface.YouTubeApi):
 
-    def __init__(self, api_keys: Optional[List[str]] = None):
+    def __init__(self,
+                 api_keys: Optional[List[str]] = None,
+                 stream_id_cache: Optional[StreamIdCache] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 key_state_store: Optional[KeyStateStore] = None,
+                 checkpoint_store: Optional[CheckpointStore] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 metrics: Optional[Metrics] = None,
+                 tracer: Optional[Tracer] = None,
+                 profile: bool = False):
         if api_keys is None:
             api_keys = get_keys()
-        self.api_key_manager = ApiKeyManager(api_keys)
-        self.resource_manager = ResourceManager(self.api_key_manager)
+        self.api_key_manager = ApiKeyManager(
+            api_keys, key_state_store=key_state_store)
+        if tracer is None and profile:
+            # see `self.tracer` for where time goes in calls
+            tracer = SpanCollector(profile=True)
+        self.resource_manager = ResourceManager(
+            self.api_key_manager,
+            response_cache,
+            checkpoint_store=checkpoint_store,
+            retry_policy=retry_policy,
+            metrics=metrics,
+            tracer=tracer)
+        self.tracer = self.resource_manager.tracer
+        if stream_id_cache is None:
+            stream_id_cache = StreamIdCache()
+        self.stream_id_cache = stream_id_cache
+        self.get_comment_replies = GetCommentReplies(self.resource_manager)
         super().__init__(
             get_channel=GetChannel(self.resource_manager),
-            get_channel_videos=GetChannelVideos(self.resource_manager),
+            get_channels=GetChannels(self.resource_manager),
+            get_channel_videos=GetChannelVideos(
+                self.resource_manager, self.stream_id_cache),
+            get_channel_videos_many=GetChannelVideosMany(
+                self.resource_manager, self.stream_id_cache),
             get_video_comments=GetVideoComments(self.resource_manager),
             get_video=GetVideo(self.resource_manager),
+            get_videos=GetVideos(self.resource_manager),
             search=Search(self.resource_manager))
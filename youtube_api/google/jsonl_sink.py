@@ -0,0 +1,182 @@
+"""Archive raw api items to compressed, rotating JSONL shards.
+
+Shards are written to `directory` as `<prefix>-<run>-<n>.jsonl.gz` (or
+`.jsonl.zst`), one raw item per line. gzip needs nothing more; zstd needs
+`zstandard` (the `zstd` extra), which is only imported when asked for.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+import uuid
+
+
+EXTENSIONS = {
+    'gzip': '.jsonl.gz',
+    'zstd': '.jsonl.zst',
+}
+
+
+def _open_compressed(raw: BinaryIO, compression: str, level: Optional[int]) \
+        -> BinaryIO:
+    if compression == 'gzip':
+        return gzip.GzipFile(
+            fileobj=raw, mode='wb',
+            compresslevel=6 if level is None else level)
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=3 if level is None else level) \
+            .stream_writer(raw, closefd=False)
+    raise ValueError(f'Unknown compression: {compression}')
+
+
+def _flush_compressed(stream: BinaryIO, compression: str) -> None:
+    # ends the current block, so all written so far can be decompressed
+    if compression == 'zstd':
+        import zstandard
+        stream.flush(zstandard.FLUSH_BLOCK)
+    else:
+        stream.flush()
+
+
+def iter_shard_items(path: str) -> Iterator[Dict]:
+    """Read back the items of a shard, by its extension.
+
+    A shard still being written (or cut off) is read up to its last flush.
+    """
+    if path.endswith(EXTENSIONS['zstd']):
+        import zstandard
+        # a decompressobj, unlike a stream_reader, takes an unfinished frame
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        pending = b''
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(2 ** 16), b''):
+                pending += decompressor.decompress(chunk)
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    yield json.loads(line)
+    else:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    yield json.loads(line)
+            except EOFError:
+                # no end of stream marker yet
+                return
+
+
+class JsonlSink:
+    """Appends pages of raw items to compressed JSONL shards.
+
+    Encoded lines are buffered, and compressed into the current shard once
+    `max_buffer_bytes` are buffered, or `flush_interval` seconds have passed
+    since the last flush (checked as pages are written, so call `flush` when
+    pausing a crawl). Once a shard reaches `max_shard_bytes` on disk, the next
+    flush starts a new one. So memory stays flat however much is archived.
+
+    Each flush ends a compressed block, so a shard can be read up to its last
+    flush even if the process dies before `close`.
+
+    Safe to write to from many threads.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            prefix: str = 'raw',
+            compression: str = 'gzip',
+            level: Optional[int] = None,
+            max_shard_bytes: int = 256 * 2 ** 20,
+            max_buffer_bytes: int = 2 ** 20,
+            flush_interval: float = 60.
+    ):
+        if compression not in EXTENSIONS:
+            raise ValueError(f'Unknown compression: {compression}')
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.level = level
+        self.max_shard_bytes = max_shard_bytes
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+        # so shards from different runs into the same directory don't clash
+        self.run_id = uuid.uuid4().hex[:12]
+        self.shard_paths: List[str] = []
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+        self._raw = None
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'JsonlSink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, items: List[Dict]) -> None:
+        """Write a page of raw items."""
+        lines = [json.dumps(x, ensure_ascii=False).encode('utf-8') + b'\n'
+                 for x in items]
+        with self._lock:
+            self._buffer += lines
+            self._buffered_bytes += sum(len(x) for x in lines)
+            if self._buffered_bytes >= self.max_buffer_bytes \
+                    or time.monotonic() - self._last_flush \
+                    >= self.flush_interval:
+                self._flush()
+
+    def write_pages(self, pages: Iterable[List[Dict]]) -> int:
+        """Write each page as it comes, e.g. from a function's `iter_pages`.
+
+        Returns the number of items written.
+        """
+        num_items = 0
+        for page in pages:
+            self.write(page)
+            num_items += len(page)
+        return num_items
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._close_shard()
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._stream is None:
+            self._open_shard()
+        self._stream.write(b''.join(self._buffer))
+        _flush_compressed(self._stream, self.compression)
+        self._buffer = []
+        self._buffered_bytes = 0
+        if self._raw.tell() >= self.max_shard_bytes:
+            self._close_shard()
+
+    def _open_shard(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(
+            self.directory,
+            f'{self.prefix}-{self.run_id}-{len(self.shard_paths):05d}'
+            f'{EXTENSIONS[self.compression]}')
+        self._raw = open(path, 'wb')
+        self._stream = _open_compressed(self._raw, self.compression,
+                                        self.level)
+        self.shard_paths.append(path)
+
+    def _close_shard(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.close()
+        self._raw.close()
+        self._stream = None
+        self._raw = None
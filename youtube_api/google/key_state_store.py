@@ -0,0 +1,87 @@
+from datetime import datetime
+import hashlib
+from typing import Dict, Iterable, Tuple
+
+from youtube_api.google.local_store import SqliteStore
+
+
+def hash_api_key(api_key: str) -> str:
+    """Identify a key without storing or logging the key itself."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class KeyStateStore(SqliteStore):
+    """Quota units spent and exhaustion of api keys, shared via SQLite.
+
+    Lets several processes (on one host, or sharing a volume) coordinate the
+    same pool of keys, and keeps that state across restarts. State is per
+    quota day, so it lapses by itself at the reset.
+    """
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS key_state (
+            key_hash TEXT PRIMARY KEY,
+            quota_day TEXT NOT NULL,
+            units INTEGER NOT NULL DEFAULT 0,
+            exceeded_day TEXT,
+            exceeded_at TEXT
+        );
+    '''
+    default_file_name = 'key_state.sqlite'
+
+    def add_units(
+            self,
+            api_key: str,
+            units: int,
+            quota_day: str
+    ) -> Tuple[int, bool]:
+        """Add units spent today, returning the total and if it's exceeded."""
+        key_hash = hash_api_key(api_key)
+        rows = self._execute_in_transaction([
+            ('INSERT INTO key_state (key_hash, quota_day, units) '
+             'VALUES (?, ?, ?) '
+             'ON CONFLICT (key_hash) DO UPDATE SET '
+             'units = CASE WHEN quota_day = excluded.quota_day '
+             'THEN units + excluded.units ELSE excluded.units END, '
+             'quota_day = excluded.quota_day',
+             (key_hash, quota_day, units)),
+            ('SELECT units, exceeded_day FROM key_state WHERE key_hash = ?',
+             (key_hash,)),
+        ])
+        total, exceeded_day = rows[0]
+        return total, exceeded_day == quota_day
+
+    def set_exceeded(
+            self,
+            api_key: str,
+            quota_day: str,
+            exceeded_at: datetime
+    ) -> None:
+        self._execute(
+            'INSERT INTO key_state '
+            '(key_hash, quota_day, units, exceeded_day, exceeded_at) '
+            'VALUES (?, ?, 0, ?, ?) '
+            'ON CONFLICT (key_hash) DO UPDATE SET '
+            'exceeded_day = excluded.exceeded_day, '
+            'exceeded_at = excluded.exceeded_at',
+            (hash_api_key(api_key), quota_day, quota_day,
+             exceeded_at.isoformat()))
+
+    def load(
+            self,
+            api_keys: Iterable[str],
+            quota_day: str
+    ) -> Dict[str, Tuple[int, bool]]:
+        """Get `(units, exceeded)` for today of the keys with any state."""
+        hash_to_key = {hash_api_key(x): x for x in api_keys}
+        rows = self._execute(
+            'SELECT key_hash, quota_day, units, exceeded_day FROM key_state')
+        states = {}
+        for key_hash, day, units, exceeded_day in rows:
+            api_key = hash_to_key.get(key_hash)
+            if api_key is None:
+                continue
+            states[api_key] = (
+                units if day == quota_day else 0,
+                exceeded_day == quota_day)
+        return states
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+
+def default_cache_dir() -> str:
+    return os.environ.get(
+        'YOUTUBE_API_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'youtube_api'))
+
+
+class SqliteStore:
+    """Base for small persistent stores kept in a local SQLite database.
+
+    Subclasses set `schema` (executed once on connect) and `default_file_name`
+    (used under `default_cache_dir()` when no `db_path` is given). Pass
+    `db_path=':memory:'` for a store that only lives as long as the process.
+
+    The connection is opened on first use, and shared between threads behind a
+    lock. SQLite's own file locking coordinates processes using the same file.
+    """
+
+    schema: str = ''
+    default_file_name: str = 'store.sqlite'
+
+    def __init__(self, db_path: Optional[str] = None, timeout: float = 30.):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db_path is None:
+            cache_dir = default_cache_dir()
+            os.makedirs(cache_dir, exist_ok=True)
+            self.db_path = os.path.join(cache_dir, self.default_file_name)
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False)
+        with connection:
+            connection.executescript(self.schema)
+        return connection
+
+    def _execute(
+            self,
+            sql: str,
+            params: Sequence = ()
+    ) -> List[Tuple]:
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+            with self._connection:
+                return self._connection.execute(sql, params).fetchall()
+
+    def _execute_many(
+            self,
+            sql: str,
+            params: Sequence[Sequence]
+    ) -> None:
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+            with self._connection:
+                self._connection.executemany(sql, params)
+
+    def _execute_in_transaction(
+            self,
+            statements: Sequence[Tuple[str, Sequence]]
+    ) -> List[Tuple]:
+        """Run `(sql, params)` statements atomically, returning the last rows."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+            rows = []
+            with self._connection:
+                for sql, params in statements:
+                    rows = self._connection.execute(sql, params).fetchall()
+            return rows
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,231 @@
+from bisect import bisect_left
+from collections import defaultdict
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from youtube_api.google.key_state_store import hash_api_key
+
+
+def key_label(api_key: Optional[str]) -> str:
+    """Label an api key in metrics as in the key state store, hashed."""
+    if not api_key:
+        return 'none'
+    return hash_api_key(api_key)
+
+
+class Metrics:
+    """Hooks called by the api functions, which do nothing by default.
+
+    Subclass to send metrics elsewhere, or use `MetricsCollector`. Hooks are
+    called from every worker thread, so must be thread safe, and cheap.
+    """
+
+    def record_request(
+            self,
+            endpoint: str,
+            api_key: Optional[str],
+            seconds: float,
+            reason: str = 'ok'
+    ) -> None:
+        """A request was made, taking `seconds`, failing for `reason`."""
+
+    def record_retry(self, endpoint: str, reason: str) -> None:
+        """A request will be retried, after failing for `reason`."""
+
+    def record_page(self, endpoint: str, num_items: int) -> None:
+        """A page of a pagination arrived."""
+
+    def record_quota(
+            self,
+            endpoint: str,
+            api_key: Optional[str],
+            units: int
+    ) -> None:
+        """Units of quota were spent on a key."""
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (.05, .1, .25, .5, 1., 2.5, 5., 10., 30., 60.)
+
+METRIC_HELP = {
+    'youtube_api_requests_total':
+        ('counter', 'Requests made, by endpoint, key and error reason.'),
+    'youtube_api_request_seconds':
+        ('histogram', 'Request latency, by endpoint, key and error reason.'),
+    'youtube_api_retries_total':
+        ('counter', 'Requests retried, by endpoint and error reason.'),
+    'youtube_api_pages_total':
+        ('counter', 'Pages of paginations, by endpoint.'),
+    'youtube_api_items_total':
+        ('counter', 'Items in pages of paginations, by endpoint.'),
+    'youtube_api_quota_units_total':
+        ('counter', 'Quota units spent, by endpoint and key.'),
+}
+
+
+class Histogram:
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # the last count is for values over every bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile, interpolating in its bucket, as Prometheus."""
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        lower, below = 0., 0
+        for upper, total in zip(self.buckets, self.cumulative_counts()):
+            if total >= rank:
+                in_bucket = total - below
+                return lower + (upper - lower) * (rank - below) / in_bucket
+            lower, below = upper, total
+        # over every bucket, so all that can be said is the largest bound
+        return self.buckets[-1]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsCollector(Metrics):
+    """Keeps metrics in memory, for a Prometheus text dump (`to_prometheus`).
+
+    Counters and latency histograms are labelled by endpoint, hashed api key
+    (see `key_label`) and error reason (`ok` for success).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counters: Dict[str, Dict[Labels, float]] = defaultdict(
+            lambda: defaultdict(float))
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(
+            dict)
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: Labels, value: float = 1.) -> None:
+        with self._lock:
+            self.counters[name][labels] += value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            histograms = self.histograms[name]
+            if labels not in histograms:
+                histograms[labels] = Histogram(self.buckets)
+            histograms[labels].observe(value)
+
+    def record_request(
+            self,
+            endpoint: str,
+            api_key: Optional[str],
+            seconds: float,
+            reason: str = 'ok'
+    ) -> None:
+        self.inc('youtube_api_requests_total', (
+            ('endpoint', endpoint),
+            ('key', key_label(api_key)),
+            ('reason', reason)))
+        self.observe('youtube_api_request_seconds', (
+            ('endpoint', endpoint),
+            ('key', key_label(api_key)),
+            ('reason', reason)), seconds)
+
+    def record_retry(self, endpoint: str, reason: str) -> None:
+        self.inc('youtube_api_retries_total', (
+            ('endpoint', endpoint),
+            ('reason', reason)))
+
+    def record_page(self, endpoint: str, num_items: int) -> None:
+        labels = (('endpoint', endpoint),)
+        self.inc('youtube_api_pages_total', labels)
+        self.inc('youtube_api_items_total', labels, num_items)
+
+    def record_quota(
+            self,
+            endpoint: str,
+            api_key: Optional[str],
+            units: int
+    ) -> None:
+        self.inc('youtube_api_quota_units_total', (
+            ('endpoint', endpoint),
+            ('key', key_label(api_key))), units)
+
+    def count(self, name: str, **labels: str) -> float:
+        """Sum a counter over all series with these labels."""
+        with self._lock:
+            return sum(
+                value for series, value in self.counters.get(name, {}).items()
+                if labels.items() <= dict(series).items())
+
+    def quantile(self, name: str, q: float, **labels: str) -> float:
+        """Estimate a quantile of a histogram's series with these labels."""
+        merged = Histogram(self.buckets)
+        with self._lock:
+            for series, histogram in self.histograms.get(name, {}).items():
+                if labels.items() <= dict(series).items():
+                    merged.counts = [
+                        x + y for x, y in zip(merged.counts, histogram.counts)]
+                    merged.count += histogram.count
+        return merged.quantile(q)
+
+    def to_prometheus(self) -> str:
+        """Dump all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            names = sorted(set(self.counters) | set(self.histograms))
+            for name in names:
+                kind, help_text = METRIC_HELP.get(
+                    name,
+                    ('histogram' if name in self.histograms else 'counter',
+                     ''))
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in sorted(self.counters.get(name, {})
+                                            .items()):
+                    lines.append(f'{name}{_format_labels(labels)} '
+                                 f'{_format_value(value)}')
+                for labels, histogram in sorted(
+                        self.histograms.get(name, {}).items()):
+                    bounds = self.buckets + (float('inf'),)
+                    for bound, total in zip(
+                            bounds, histogram.cumulative_counts()):
+                        bucket_labels = labels + (('le', _format_value(
+                            bound)),)
+                        lines.append(f'{name}_bucket'
+                                     f'{_format_labels(bucket_labels)} '
+                                     f'{total}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} '
+                                 f'{_format_value(histogram.sum)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} '
+                                 f'{histogram.count}')
+        return '\n'.join(lines) + '\n'
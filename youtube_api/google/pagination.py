@@ -0,0 +1,130 @@
+from math import inf
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Optional
+
+
+def published_at(item: dict) -> str:
+    return item['snippet']['publishedAt']
+
+
+class Paginator:
+    """Running state of a pagination, for deciding when to stop.
+
+    Give each page to `update` as it arrives. The item count and earliest
+    timestamp are kept as it goes, so each page costs time in its own size,
+    rather than in the size of all data so far, and long backfills stay
+    linear.
+
+    Stops at `limit` items or, without a limit, once a page reaches back to
+    `start` (pagination is assumed to work back in time). `timestamp` gets a
+    value from an item that compares with `start`.
+
+    Can be called with a page as the `stop_fn` of a pagination.
+    """
+
+    def __init__(
+            self,
+            limit: int = inf,
+            start: Optional[Any] = None,
+            timestamp: Callable[[Any], Any] = published_at
+    ):
+        self.limit = limit
+        self.start = start
+        self.timestamp = timestamp
+        self.num_items = 0
+        self.min_timestamp = None
+
+    def __call__(self, page: List[Any]) -> bool:
+        self.update(page)
+        return self.stop()
+
+    def stop(self) -> bool:
+        if self.limit != inf:
+            return self.num_items >= self.limit
+        if self.start is not None and self.min_timestamp is not None:
+            return self.start >= self.min_timestamp
+        return False
+
+    def trim(self, page: List[Any]) -> List[Any]:
+        """Drop items of the next page over the limit, or from before start."""
+        if self.limit != inf:
+            page = page[:max(self.limit - self.num_items, 0)]
+        if self.start is not None:
+            page = [x for x in page if self.timestamp(x) >= self.start]
+        return page
+
+    def update(self, page: List[Any]) -> None:
+        self.num_items += len(page)
+        if self.start is not None and page:
+            page_min = min(map(self.timestamp, page))
+            if self.min_timestamp is None or page_min < self.min_timestamp:
+                self.min_timestamp = page_min
+
+
+class StopWhenAtLimit(Paginator):
+    """Stop once `limit` items are seen."""
+
+    def __init__(self, limit: int):
+        super().__init__(limit)
+
+
+class StopWhenAtSizeOrDateLimit(Paginator):
+    """Stop once over `limit` items are seen, or any from before `start`.
+
+    Items are objects with a `created_at` property.
+    """
+
+    def __init__(self, limit: int, start: Optional[Any]):
+        super().__init__(limit, start, timestamp=attrgetter('created_at'))
+
+    def stop(self) -> bool:
+        return self.num_items > self.limit \
+            or (self.min_timestamp is not None
+                and self.min_timestamp < self.start)
+
+
+def playlist_item_video_id(item: dict) -> str:
+    return item['snippet']['resourceId']['videoId']
+
+
+class StopAtWatermark(Paginator):
+    """Stop after the first page reaching items already seen.
+
+    The watermark is the timestamp of the newest items seen before, and the
+    ids of all items seen with it, as uploads can share a second. Those
+    items, and any older ones, count as seen and are trimmed, so only new
+    items are kept, and when polling, one page is usually enough. Items from
+    before `start`, if given, are trimmed too, and reaching back to it stops
+    as well.
+    """
+
+    def __init__(
+            self,
+            item_ids: Iterable[str],
+            watermark: Any,
+            start: Optional[Any] = None,
+            get_id: Callable[[Any], str] = playlist_item_video_id,
+            timestamp: Callable[[Any], Any] = published_at
+    ):
+        super().__init__(start=start, timestamp=timestamp)
+        self.item_ids = set(item_ids)
+        self.watermark = watermark
+        self.get_id = get_id
+        self.reached = False
+
+    def seen(self, item: Any) -> bool:
+        timestamp = self.timestamp(item)
+        return timestamp < self.watermark \
+            or (timestamp == self.watermark
+                and self.get_id(item) in self.item_ids)
+
+    def stop(self) -> bool:
+        return self.reached or super().stop()
+
+    def trim(self, page: List[Any]) -> List[Any]:
+        return [x for x in super().trim(page) if not self.seen(x)]
+
+    def update(self, page: List[Any]) -> None:
+        super().update(page)
+        if any(self.seen(x) for x in page):
+            self.reached = True
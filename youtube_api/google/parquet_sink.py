@@ -0,0 +1,210 @@
+"""Write crawl results to Parquet, partitioned for selective loading.
+
+Files go under `root` as
+
+    <entity>/channel=<channel id>/published_date=<yyyy-mm-dd>/<run>-<n>.parquet
+
+so a job can load only the channels, dates and columns it needs, e.g.
+
+    pyarrow.parquet.read_table(
+        'crawl/videos',
+        columns=['id', 'num_views'],
+        filters=[('channel', '=', channel_id)])
+
+Needs `pyarrow` (and `numpy`, for `columnar`), which the package doesn't
+import, from the `parquet` extra.
+"""
+from collections import OrderedDict
+from datetime import datetime
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import uuid
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from youtube_api.google.columnar import MISSING, comment_threads_to_array, \
+    playlist_items_to_array, videos_to_array
+
+
+# entity name: function mapping a page of raw items to a structured array
+ENTITIES: Dict[str, Callable[[List[Dict]], np.ndarray]] = {
+    'comments': comment_threads_to_array,
+    'playlist_items': playlist_items_to_array,
+    'videos': videos_to_array,
+}
+
+# as hive does, for rows without a value to partition on
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def array_to_table(array: np.ndarray, collected_at: datetime) -> pa.Table:
+    """A structured array from `columnar` as a table, with `MISSING` as null.
+
+    Adds a `collected_at` column, so rows with stats are snapshots in time.
+    """
+    columns = {}
+    for name in array.dtype.names:
+        column = array[name]
+        if column.dtype == np.int64:
+            columns[name] = pa.array(column, mask=column == MISSING)
+        elif column.dtype == object:
+            columns[name] = pa.array(column, type=pa.string())
+        else:
+            columns[name] = pa.array(column)
+    columns['collected_at'] = pa.array(
+        np.full(len(array), np.datetime64(collected_at, 'us')))
+    return pa.table(columns)
+
+
+class ParquetSink:
+    """Streams pages of raw items into partitioned Parquet files.
+
+    Rows are buffered per partition, and written as a row group once there
+    are `row_group_size` of them. A crawl spreads rows over many channel and
+    date partitions, most of which never get that many, so once more than
+    `max_buffered_rows` are buffered in all, the largest partitions are
+    written as smaller row groups, until half that are left. So memory stays
+    bounded however long the crawl.
+
+    Writers are kept open per partition, up to `max_open_files`, after which
+    the least recently used is closed, and later rows for it go in a new
+    file. Call `close` (or use as a context manager) to write what's left;
+    files are only readable once closed.
+
+    Comments don't carry their channel, so pass `channel_id` for them, or
+    they're put under `NULL_PARTITION`.
+
+    Safe to write to from many threads (e.g. with `fan_out_iter`).
+    """
+
+    def __init__(
+            self,
+            root: str,
+            row_group_size: int = 10_000,
+            compression: str = 'zstd',
+            max_open_files: int = 64,
+            max_buffered_rows: int = 50_000
+    ):
+        self.root = root
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self.compression = compression
+        self.max_open_files = max_open_files
+        # so files from different runs into the same root don't clash
+        self.run_id = uuid.uuid4().hex[:12]
+        self._buffers: Dict[Tuple[str, str, str], List[pa.Table]] = {}
+        self._buffered_rows: Dict[Tuple[str, str, str], int] = {}
+        self._total_buffered_rows = 0
+        self._writers: OrderedDict[Tuple[str, str, str], pq.ParquetWriter] \
+            = OrderedDict()
+        self._num_files: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'ParquetSink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(
+            self,
+            entity: str,
+            items: List[Dict],
+            channel_id: Optional[str] = None
+    ) -> None:
+        """Write a page of raw items of an entity in `ENTITIES`."""
+        array = ENTITIES[entity](items)
+        if not len(array):
+            return
+        table = array_to_table(array, datetime.utcnow())
+        if 'channel_id' in array.dtype.names:
+            channels = array['channel_id']
+        else:
+            channels = np.full(len(array), channel_id, dtype=object)
+        dates = array['published_at'].astype('datetime64[D]').astype(str)
+        rows = {}
+        for i, partition in enumerate(zip(channels, dates)):
+            rows.setdefault(partition, []).append(i)
+        with self._lock:
+            for (channel, date), indices in rows.items():
+                key = (entity, channel or NULL_PARTITION, date)
+                self._buffer(key, table.take(indices))
+            if self._total_buffered_rows > self.max_buffered_rows:
+                self._write_largest(self.max_buffered_rows // 2)
+
+    def write_pages(
+            self,
+            entity: str,
+            pages: Iterable[List[Dict]],
+            channel_id: Optional[str] = None
+    ) -> int:
+        """Write each page as it comes, e.g. from a function's `iter_pages`.
+
+        Returns the number of items written.
+        """
+        num_items = 0
+        for page in pages:
+            self.write(entity, page, channel_id)
+            num_items += len(page)
+        return num_items
+
+    def flush(self) -> None:
+        """Write all buffered rows, as (possibly small) row groups."""
+        with self._lock:
+            for key in list(self._buffers):
+                self._write_row_group(key)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            while self._writers:
+                _, writer = self._writers.popitem(last=False)
+                writer.close()
+
+    def _buffer(self, key: Tuple[str, str, str], table: pa.Table) -> None:
+        self._buffers.setdefault(key, []).append(table)
+        self._buffered_rows[key] = \
+            self._buffered_rows.get(key, 0) + table.num_rows
+        self._total_buffered_rows += table.num_rows
+        if self._buffered_rows[key] >= self.row_group_size:
+            self._write_row_group(key)
+
+    def _write_row_group(self, key: Tuple[str, str, str]) -> None:
+        table = pa.concat_tables(self._buffers.pop(key))
+        self._total_buffered_rows -= self._buffered_rows.pop(key)
+        self._writer(key, table.schema).write_table(
+            table, row_group_size=self.row_group_size)
+
+    def _write_largest(self, max_rows_left: int) -> None:
+        by_size = sorted(
+            self._buffered_rows, key=self._buffered_rows.get, reverse=True)
+        for key in by_size:
+            if self._total_buffered_rows <= max_rows_left:
+                break
+            self._write_row_group(key)
+
+    def _writer(
+            self,
+            key: Tuple[str, str, str],
+            schema: pa.Schema
+    ) -> pq.ParquetWriter:
+        if key in self._writers:
+            self._writers.move_to_end(key)
+            return self._writers[key]
+        while len(self._writers) >= self.max_open_files:
+            _, writer = self._writers.popitem(last=False)
+            writer.close()
+        entity, channel, date = key
+        directory = os.path.join(
+            self.root, entity, f'channel={channel}', f'published_date={date}')
+        os.makedirs(directory, exist_ok=True)
+        num_files = self._num_files.get(key, 0)
+        self._num_files[key] = num_files + 1
+        path = os.path.join(
+            directory, f'{self.run_id}-{num_files:05d}.parquet')
+        writer = pq.ParquetWriter(path, schema, compression=self.compression)
+        self._writers[key] = writer
+        return writer
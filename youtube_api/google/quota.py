@@ -0,0 +1,32 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+
+# https://developers.google.com/youtube/v3/determine_quota_cost
+DAILY_QUOTA = 10_000
+# every list call costs 1 unit, except search
+LIST_QUOTA_COSTS = {
+    'search': 100,
+}
+# daily quotas reset at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+
+def quota_cost(endpoint: str) -> int:
+    return LIST_QUOTA_COSTS.get(endpoint, 1)
+
+
+def next_quota_reset(after: datetime) -> datetime:
+    """Get the first quota reset after `after`.
+
+    Takes and returns naive local times, like `datetime.now()`.
+    """
+    pacific_date = after.astimezone(QUOTA_TIMEZONE).date()
+    reset = datetime.combine(
+        pacific_date + timedelta(days=1), time(0), tzinfo=QUOTA_TIMEZONE)
+    return reset.astimezone().replace(tzinfo=None)
+
+
+def quota_day(now: datetime) -> str:
+    """Identify the quota period `now` falls in, by its Pacific date."""
+    return now.astimezone(QUOTA_TIMEZONE).date().isoformat()
@@ -1,19 +1,45 @@
+from __future__ import annotations
+
 from datetime import datetime
+from functools import partial
 import logging
 from math import inf
 import time
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, \
+    Tuple, TYPE_CHECKING
 
-import googleapiclient.discovery
 import googleapiclient.errors
 from googleapiclient.errors import HttpError
 
 from youtube_api.google.api_key_management import ApiKeyManager, ResourceManager
+from youtube_api.google.batching import batch_ids
+from youtube_api.google.checkpoint_store import CheckpointStore
+from youtube_api.google.concurrency import fan_out, fan_out_iter
+from youtube_api.google.key_state_store import KeyStateStore
+from youtube_api.google.pagination import Paginator, StopAtWatermark, \
+    playlist_item_video_id, published_at
+from youtube_api.google.quota import quota_cost
+from youtube_api.google.replies import complete_replies
+from youtube_api.google.response_cache import ResponseCache, execute
+from youtube_api.google.metrics import Metrics
+from youtube_api.google.retry import TRANSIENT_ERRORS, Backoff, \
+    RetryPolicy, error_reason, http_error_reason, is_transient
+from youtube_api.google.stream_id_cache import StreamIdCache, resolve_stream_ids
+from youtube_api.google.tracing import SpanCollector, Tracer, trace_decoding
+from youtube_api.google.watermark_store import WatermarkStore
 from youtube_api import interface_raw as interface
 
+if TYPE_CHECKING:
+    import googleapiclient.discovery
+
 
 class GoogleApiFunction:
 
+    # e.g. `videos` for `youtube/v3/videos`
+    endpoint: str = ''
+    # long paginations save checkpoints, if there's a checkpoint store
+    checkpointed: bool = False
+
     def __init__(
             self,
             resource_manager: ResourceManager,
@@ -22,24 +48,20 @@ class GoogleApiFunction:
         self.resource_manager = resource_manager
         self.debug = debug
 
+    @property
+    def quota_cost(self) -> int:
+        return quota_cost(self.endpoint)
+
+    @property
+    def _checkpoint_store(self) -> Optional[CheckpointStore]:
+        if not self.checkpointed:
+            return None
+        return self.resource_manager.checkpoint_store
+
     @staticmethod
     def _datetime_to_string_for_api(date_time: datetime) -> str:
         return date_time.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-    def _drop_over_limit(
-            self,
-            data: List[Dict],
-            limit: int = inf,
-            start: Optional[datetime] = None
-    ) -> List[Dict]:
-        if limit != inf:
-            data = data[:limit]
-        # assumes pagination works back in time
-        if start:
-            start_str = self._datetime_to_string_for_api(start)
-            data = [x for x in data if x['snippet']['publishedAt'] >= start_str]
-        return data
-
     @staticmethod
     def _empty(response: Dict) -> bool:
         return not response or 'items' not in response
@@ -56,96 +78,192 @@ class GoogleApiFunction:
             if 'nextPageToken' in response \
             else None
 
-    def _stop(
+    def _paginator(
             self,
-            data: List[Dict],
             limit: int = inf,
             start: Optional[datetime] = None
-    ) -> bool:
-        if limit != inf:
-            return len(data) >= limit
-        # assumes pagination works back in time
-        if start:
-            start_str = self._datetime_to_string_for_api(start)
-            min_publish_date = min(x['snippet']['publishedAt'] for x in data)
-            return start_str >= min_publish_date
-        return False
+    ) -> Paginator:
+        if start is not None:
+            start = self._datetime_to_string_for_api(start)
+        return Paginator(limit, start)
 
-    def _paginate(
+    def _iter_pages(
             self,
             limit: int = inf,
             start: Optional[datetime] = None,
+            resume: bool = False,
+            paginator: Optional[Paginator] = None,
             **fn_args
-    ) -> List[Dict]:
-        data = []
-        response = self._wait_while_rate_limited(**fn_args)
-        if self._empty(response):
-            return data
-        data = response['items']
-        next_page_token = self._get_next_page(response)
-        while next_page_token and not self._stop(data, limit, start):
-            fn_args['pageToken'] = next_page_token
+    ) -> Iterator[List[Dict]]:
+        """Yield the items of each page as it arrives.
+
+        Only one page is held at a time. Items over `limit`, or published
+        before `start`, are dropped, unless another `paginator` is given to
+        decide. See `_iter_responses` for `resume`.
+        """
+        if paginator is None:
+            paginator = self._paginator(limit, start)
+        for response in self._iter_responses(resume, **fn_args):
+            items = response['items']
+            page = paginator.trim(items)
+            paginator.update(items)
+            if page:
+                yield page
+            if paginator.stop():
+                break
+        if self._checkpoint_store is not None:
+            self._checkpoint_store.delete(
+                self._checkpoint_store.key(self.endpoint, fn_args))
+
+    def _iter_responses(self, resume: bool = False, **fn_args) \
+            -> Iterator[Dict]:
+        """Yield each non-empty response, following page tokens.
+
+        If checkpointed, each page is saved as it arrives, and with
+        `resume`, the pages saved by an unfinished pagination with the same
+        arguments are replayed before carrying on from where it stopped.
+        """
+        store = self._checkpoint_store
+        if store is not None:
+            key = store.key(self.endpoint, fn_args)
+            checkpoint = store.load(key) if resume else None
+            if checkpoint is None:
+                store.delete(key)
+            else:
+                pages, next_page_token = checkpoint
+                logging.info(f'Resuming {key} after {len(pages)} pages.')
+                for items in pages:
+                    yield {'items': items}
+                if not next_page_token:
+                    return
+                fn_args['pageToken'] = next_page_token
+        while True:
             response = self._wait_while_rate_limited(**fn_args)
             if self._empty(response):
-                return data
-            data += response['items']
+                return
+            self.resource_manager.metrics.record_page(
+                self.endpoint, len(response['items']))
             next_page_token = self._get_next_page(response)
-        data = self._drop_over_limit(data, limit, start)
+            if store is not None:
+                store.add_page(key, response['items'], next_page_token)
+            yield response
+            if not next_page_token:
+                return
+            fn_args['pageToken'] = next_page_token
+
+    def _paginate(
+            self,
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            resume: bool = False,
+            paginator: Optional[Paginator] = None,
+            **fn_args
+    ) -> List[Dict]:
+        data = []
+        for page in self._iter_pages(
+                limit, start, resume, paginator, **fn_args):
+            data += page
         return data
 
+    def iter_pages(self, *args, **kwargs) -> Iterator[List]:
+        """Like calling this function, but yields each page as it arrives."""
+        raise NotImplementedError
+
+    def iter_items(self, *args, **kwargs) -> Iterator:
+        """Like calling this function, but yields each item as it arrives."""
+        for page in self.iter_pages(*args, **kwargs):
+            yield from page
+
+    def _record_usage(self) -> None:
+        self.resource_manager.record_usage(self.quota_cost)
+        self.resource_manager.metrics.record_quota(
+            self.endpoint,
+            self.resource_manager.current_api_key,
+            self.quota_cost)
+
+    def _execute(self, request, fn_args: Dict) -> Dict:
+        """Execute a request, recording its latency and any error's reason."""
+        api_key = self.resource_manager.current_api_key
+        tracer = self.resource_manager.tracer
+        function = type(self).__name__
+        trace_decoding(tracer, function, request)
+        started = time.perf_counter()
+        reason = 'ok'
+        try:
+            with tracer.span(function, 'http'):
+                return execute(
+                    request, fn_args, self.resource_manager.response_cache)
+        except Exception as e:
+            reason = error_reason(e)
+            raise
+        finally:
+            self.resource_manager.metrics.record_request(
+                self.endpoint, api_key, time.perf_counter() - started, reason)
+
+    def _back_off(self, backoff: Backoff, error: Exception) -> None:
+        delay = backoff.next_delay(error)
+        self.resource_manager.metrics.record_retry(
+            self.endpoint, error_reason(error))
+        time.sleep(delay)
+
     def _wait_while_rate_limited(self, **fn_args) -> Dict | None:
+        backoff = self.resource_manager.retry_policy.backoff()
+        tracer = self.resource_manager.tracer
+        function = type(self).__name__
         while True:
             try:
-                resource = self.resource_manager.get_resource()
-                fn = self._get_function(resource)
-                request = fn(**fn_args)
-                response = request.execute()
+                with tracer.span(function, 'key'):
+                    resource = self.resource_manager.get_resource(
+                        self.quota_cost)
+                with tracer.span(function, 'build'):
+                    fn = self._get_function(resource)
+                    request = fn(**fn_args)
+                self._record_usage()
+                response = self._execute(request, fn_args)
                 if self.debug:
                     print(response)
                 return response
             except HttpError as e:
-                if e.error_details[0]['reason'] == 'commentsDisabled':
+                reason = http_error_reason(e)
+                if reason == 'commentsDisabled':
                     logging.warning(f'Comments disabled.')
                     return None
-                elif e.error_details[0]['reason'] == 'videoNotFound':
+                elif reason == 'videoNotFound':
                     logging.warning('Video not found.')
                     return None
-                elif e.error_details[0]['reason'] == 'quotaExceeded':
-                    logging.warning('Rate limited. Waiting one hour...')
+                elif reason == 'quotaExceeded':
+                    logging.warning('Rate limited. Rotating api key...')
+                    # benched until the quota resets, so the retry gets
+                    # another key (and waits only if none have quota)
                     self.resource_manager.report_quota_exceeded()
-                    # NOTE: waiting handled by resource_factory.api_key_manager
-                elif e.error_details[0]['reason'] == 'SERVICE_UNAVAILABLE':
-                    # assuming this is transient
-                    logging.warning('Service unavailable. Waiting 5 mins...')
-                    time.sleep(5 * 60)
-                elif e.error_details[0]['reason'] == 'backendError':
-                    # assuming this is transient
-                    logging.warning('Backend error. Waiting 5 mins...')
-                    time.sleep(5 * 60)
-                elif e.error_details[0]['reason'] == 'badRequest':
+                elif is_transient(e):
+                    # e.g. backendError, or a 5xx without details
+                    self._back_off(backoff, e)
+                elif reason == 'badRequest':
                     # this doesn't appear to be transient, error for now
                     logging.warning(f'"Bad request," API key was '
                                     f'"{self.resource_manager.current_api_key}"'
                                     f'.')
                     raise e
+                elif reason is None:
+                    raise e
                 else:
                     raise Exception('Unexpected HttpError reason: %s'
-                                    % e.error_details[0]['reason'])
-            except Exception as e:
-                print('*' * 8)
-                print(response)
-                print(response.__dict__)
-                print(e)
-                print(type(e))
-                print(str(e))
-                print(e.__dict__)
-                raise e
+                                    % reason) from e
+            except TRANSIENT_ERRORS as e:
+                # e.g. socket timeouts
+                self._back_off(backoff, e)
 
 
 class GetChannel(GoogleApiFunction, interface.GetChannel):
 
+    endpoint = 'channels'
+
     def __call__(self, channel_id: str) -> List[Dict]:
-        return self._paginate(
+        return list(self.iter_items(channel_id))
+
+    def iter_pages(self, channel_id: str) -> Iterator[List[Dict]]:
+        return self._iter_pages(
             id=channel_id,
             part='contentDetails,snippet,statistics,topicDetails')
 
@@ -156,24 +274,66 @@ class GetChannel(GoogleApiFunction, interface.GetChannel):
         return resource.channels().list
 
 
-class GetChannelStreamId(GoogleApiFunction, interface.GetChannelStreamId):
+class GetChannels(GoogleApiFunction, interface.GetChannels):
 
-    def __call__(self, channel_id: str) -> str | None:
-        response = self._paginate(
+    endpoint = 'channels'
+
+    def __call__(
+            self,
+            channel_ids: Iterable[str]
+    ) -> Dict[str, Dict | None]:
+        channel_ids = list(channel_ids)
+        id_to_channel = {}
+        for channel in self.iter_items(channel_ids):
+            id_to_channel[channel['id']] = channel
+        missing = [x for x in channel_ids if x not in id_to_channel]
+        if missing:
+            logging.warning(f'{len(missing)} channels not found: {missing}.')
+        return {x: id_to_channel.get(x) for x in channel_ids}
+
+    def iter_pages(self, channel_ids: Iterable[str]) -> Iterator[List[Dict]]:
+        """Yields the channels found, a page per batch of 50 ids."""
+        for batch in batch_ids(channel_ids):
+            yield from self._iter_pages(
+                id=','.join(batch),
+                part='contentDetails,snippet,statistics,topicDetails')
+
+    def _get_function(
+            self,
+            resource: googleapiclient.discovery.Resource
+    ) -> Callable:
+        return resource.channels().list
+
+
+class GetChannelStreamIds(GoogleApiFunction, interface.GetChannelStreamIds):
+    """Resolves stream ids via a persistent cache, fetching misses in bulk."""
+
+    endpoint = 'channels'
+
+    def __init__(
+            self,
+            resource_manager: ResourceManager,
+            stream_id_cache: Optional[StreamIdCache] = None,
+            debug: bool = False
+    ):
+        super().__init__(resource_manager, debug)
+        if stream_id_cache is None:
+            stream_id_cache = StreamIdCache(':memory:')
+        self.stream_id_cache = stream_id_cache
+
+    def __call__(
+            self,
+            channel_ids: Iterable[str]
+    ) -> Dict[str, str | None]:
+        return resolve_stream_ids(
+            channel_ids,
+            cache=self.stream_id_cache,
+            list_channels=self._list_channels)
+
+    def _list_channels(self, channel_ids: List[str]) -> List[Dict]:
+        return self._paginate(
             part='contentDetails',
-            id=channel_id)
-        if len(response) == 0:
-            return None
-        data = response[0]
-        if 'contentDetails' not in data:
-            return None
-        content_details = data['contentDetails']
-        if 'relatedPlaylists' not in content_details:
-            return None
-        related_playlists = content_details['relatedPlaylists']
-        if 'uploads' not in related_playlists:
-            return None
-        return related_playlists['uploads']
+            id=','.join(channel_ids))
 
     def _get_function(
             self,
@@ -182,19 +342,58 @@ class GetChannelStreamId(GoogleApiFunction, interface.GetChannelStreamId):
         return resource.channels().list
 
 
+class GetChannelStreamId(GetChannelStreamIds, interface.GetChannelStreamId):
+
+    def __call__(self, channel_id: str) -> str | None:
+        return super().__call__([channel_id])[channel_id]
+
+
 class GetChannelVideos(GoogleApiFunction, interface.GetChannelVideos):
 
+    endpoint = 'playlistItems'
+    checkpointed = True
+
     def __call__(
             self,
             channel_stream_id: str,
             limit: int = inf,
             start: Optional[datetime] = None,
-            end: Optional[datetime] = None
+            end: Optional[datetime] = None,
+            resume: bool = False
     ) -> List[Dict]:
+        """Get a channel's videos, newest first.
+
+        With `resume`, carries on from the checkpoint of an earlier call with
+        the same stream that did not finish, if the resource manager has a
+        checkpoint store.
+        """
+        return self._paginate(**self._list_args(
+            channel_stream_id, limit, start, end, resume))
+
+    def iter_pages(
+            self,
+            channel_stream_id: str,
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            resume: bool = False
+    ) -> Iterator[List[Dict]]:
+        return self._iter_pages(**self._list_args(
+            channel_stream_id, limit, start, end, resume))
+
+    @staticmethod
+    def _list_args(
+            channel_stream_id: str,
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            resume: bool = False
+    ) -> Dict:
         page_size = 50  # 50 is the max - https://developers.google.com/youtube/v3/docs/channels/list
-        return self._paginate(
+        return dict(
             limit=limit,
             start=start,
+            resume=resume,
             part='snippet',
             playlistId=channel_stream_id,
             maxResults=page_size)
@@ -204,34 +403,316 @@ class GetChannelVideos(GoogleApiFunction, interface.GetChannelVideos):
         return resource.playlistItems().list
 
 
+class GetChannelVideosMany(GetChannelVideos, interface.GetChannelVideosMany):
+
+    def __call__(
+            self,
+            channel_stream_ids: Iterable[str],
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            max_workers: int = 8,
+            resume: bool = False
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        get_channel_videos = partial(
+            super().__call__,
+            limit=limit,
+            start=start,
+            end=end,
+            resume=resume)
+        return fan_out(get_channel_videos, channel_stream_ids, max_workers)
+
+    def iter_pages(
+            self,
+            channel_stream_ids: Iterable[str],
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            max_workers: int = 8,
+            resume: bool = False
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yields `(channel_stream_id, page)` pairs as pages arrive.
+
+        Workers wait while pages are not consumed, so few are held at once.
+        """
+        def iter_channel_pages(channel_stream_id: str) -> Iterator[List[Dict]]:
+            return self._iter_pages(**self._list_args(
+                channel_stream_id, limit, start, end, resume))
+
+        return fan_out_iter(
+            iter_channel_pages, channel_stream_ids, max_workers)
+
+    def iter_items(self, *args, **kwargs) -> Iterator[Tuple[str, Dict]]:
+        """Yields `(channel_stream_id, video)` pairs as pages arrive."""
+        for channel_stream_id, page in self.iter_pages(*args, **kwargs):
+            for video in page:
+                yield channel_stream_id, video
+
+
+class SyncChannelVideos(GetChannelVideos):
+    """Get the videos uploaded to a stream since it was last synced.
+
+    Keeps the newest videos seen per stream in a `WatermarkStore`, and stops
+    paginating at the first page reaching it, so polling a stream usually
+    takes one page. The first sync of a stream gets everything back to
+    `start`, and later ones keep to `start` too. The watermark moves only
+    once a sync finishes, so a failed sync is repeated in full by the next.
+    """
+
+    # a sync is usually one page, and not resumable from a crawl's checkpoint
+    checkpointed = False
+
+    def __init__(
+            self,
+            resource_manager: ResourceManager,
+            watermark_store: Optional[WatermarkStore] = None,
+            debug: bool = False
+    ):
+        super().__init__(resource_manager, debug)
+        if watermark_store is None:
+            watermark_store = WatermarkStore(':memory:')
+        self.watermark_store = watermark_store
+
+    def __call__(
+            self,
+            channel_stream_id: str,
+            start: Optional[datetime] = None
+    ) -> List[Dict]:
+        """Get the new videos, newest first."""
+        return list(self.iter_items(channel_stream_id, start))
+
+    def iter_pages(
+            self,
+            channel_stream_id: str,
+            start: Optional[datetime] = None
+    ) -> Iterator[List[Dict]]:
+        """Yields the new videos a page at a time.
+
+        The watermark moves once the last page has been consumed.
+        """
+        paginator = None
+        newest, newest_ids, any_new = None, set(), False
+        watermark = self.watermark_store.get(channel_stream_id)
+        if watermark is not None:
+            # `start` still applies, though the watermark usually comes first
+            paginator = StopAtWatermark(
+                *watermark, start=self._paginator(start=start).start)
+            # new videos in the watermark's second join those seen in it
+            newest_ids, newest = set(watermark[0]), watermark[1]
+        for page in self._iter_pages(
+                paginator=paginator,
+                **self._list_args(channel_stream_id, start=start)):
+            for item in page:
+                any_new = True
+                if newest is None or published_at(item) > newest:
+                    newest, newest_ids = published_at(item), set()
+                if published_at(item) == newest:
+                    newest_ids.add(playlist_item_video_id(item))
+            yield page
+        if any_new:
+            self.watermark_store.set(channel_stream_id, newest_ids, newest)
+
+
+class GetCommentReplies(GoogleApiFunction):
+    """Get all the replies to a top level comment."""
+
+    endpoint = 'comments'
+
+    def __call__(self, parent_id: str) -> List[Dict]:
+        return list(self.iter_items(parent_id))
+
+    def iter_pages(self, parent_id: str) -> Iterator[List[Dict]]:
+        return self._iter_pages(
+            part='snippet',
+            maxResults=100,  # this is the max
+            parentId=parent_id)
+
+    def _get_function(self, resource: googleapiclient.discovery.Resource) \
+            -> Callable:
+        return resource.comments().list
+
+
 class GetVideoComments(GoogleApiFunction, interface.GetVideoComments):
 
+    endpoint = 'commentThreads'
+    checkpointed = True
+
+    def __init__(
+            self,
+            resource_manager: ResourceManager,
+            debug: bool = False
+    ):
+        super().__init__(resource_manager, debug)
+        self.get_comment_replies = GetCommentReplies(resource_manager, debug)
+
     def __call__(
             self,
             video_id: str,
-            limit: int = inf
+            limit: int = inf,
+            resume: bool = False,
+            full_replies: bool = False,
+            max_workers: int = 8
     ) -> List[Dict]:
+        """Get a video's comment threads.
+
+        With `resume`, carries on from the checkpoint of an earlier call for
+        the same video that did not finish, if the resource manager has a
+        checkpoint store.
+
+        Threads only inline a few replies. With `full_replies`, the rest are
+        fetched for each page, on `max_workers` threads, and replace them.
+        """
+        return [x for page in self._iter_video_pages(
+                    video_id, limit, resume, full_replies, max_workers)
+                for x in page]
+
+    def iter_pages(
+            self,
+            video_id: str,
+            limit: int = inf,
+            resume: bool = False,
+            full_replies: bool = False,
+            max_workers: int = 8
+    ) -> Iterator[List[Dict]]:
+        return self._iter_video_pages(
+            video_id, limit, resume, full_replies, max_workers)
+
+    def _iter_video_pages(
+            self,
+            video_id: str,
+            limit: int = inf,
+            resume: bool = False,
+            full_replies: bool = False,
+            max_workers: int = 8
+    ) -> Iterator[List[Dict]]:
         page_size = 100  # this is the max
         if page_size > limit:
             page_size = limit
-        return self._paginate(
+        pages = self._iter_pages(
             limit=limit,
+            resume=resume,
             part='snippet,replies',
             maxResults=page_size,
             videoId=video_id)
+        if not full_replies:
+            return pages
+        return (complete_replies(x, self.get_comment_replies, max_workers)
+                for x in pages)
 
     def _get_function(self, resource: googleapiclient.discovery.Resource) \
             -> Callable:
         return resource.commentThreads().list
 
 
+class GetVideoCommentsMany(GetVideoComments):
+    """Get the comment threads of many videos, on a thread pool.
+
+    Workers share the resource manager, so each has its own http client, and
+    all draw on the same api keys. Videos are first looked up in bulk (a unit
+    per 50), to crawl the ones with fewest comments first, so many finish
+    early. Videos not found are skipped, and those with no comments (or with
+    comments disabled, so not counted) are given empty, without crawling.
+    """
+
+    def __init__(
+            self,
+            resource_manager: ResourceManager,
+            debug: bool = False
+    ):
+        super().__init__(resource_manager, debug)
+        self.get_videos = GetVideos(resource_manager, debug)
+
+    def __call__(
+            self,
+            video_ids: Iterable[str],
+            limit: int = inf,
+            max_workers: int = 8,
+            resume: bool = False,
+            full_replies: bool = False
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yields `(video_id, comment_threads)` pairs as videos finish.
+
+        So each video can be written out (e.g. to a sink) as it's done, and
+        its threads let go, as none are kept here once yielded. With
+        `full_replies`, each worker fetches its video's replies in turn.
+        """
+        video_ids, empty = self._plan(video_ids, limit)
+        for video_id in empty:
+            yield video_id, []
+        get_video_comments = partial(
+            super().__call__,
+            limit=limit,
+            resume=resume,
+            full_replies=full_replies,
+            max_workers=1)
+        yield from fan_out(get_video_comments, video_ids, max_workers)
+
+    def iter_pages(
+            self,
+            video_ids: Iterable[str],
+            limit: int = inf,
+            max_workers: int = 8,
+            resume: bool = False,
+            full_replies: bool = False
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yields `(video_id, page)` pairs as pages arrive.
+
+        Videos given empty by `__call__` yield no pages.
+        """
+        video_ids, _ = self._plan(video_ids, limit)
+
+        def iter_video_pages(video_id: str) -> Iterator[List[Dict]]:
+            return self._iter_video_pages(
+                video_id, limit, resume, full_replies, max_workers=1)
+
+        return fan_out_iter(iter_video_pages, video_ids, max_workers)
+
+    def iter_items(self, *args, **kwargs) -> Iterator[Tuple[str, Dict]]:
+        """Yields `(video_id, comment_thread)` pairs as pages arrive."""
+        for video_id, page in self.iter_pages(*args, **kwargs):
+            for comment_thread in page:
+                yield video_id, comment_thread
+
+    def _plan(
+            self,
+            video_ids: Iterable[str],
+            limit: int = inf
+    ) -> Tuple[List[str], List[str]]:
+        """Get the videos to crawl, fewest comments first, and those not to.
+
+        Logs the most quota the crawl should take, at a unit per page.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        num_comments = {}
+        empty = []
+        for video_id, video in zip(video_ids, self.get_videos(video_ids)):
+            if video is None:
+                continue
+            count = int(video.get('statistics', {}).get('commentCount', 0))
+            if count:
+                num_comments[video_id] = min(count, limit)
+            else:
+                empty.append(video_id)
+        to_crawl = sorted(num_comments, key=num_comments.get)
+        num_pages = sum(-(-x // 100) for x in num_comments.values())
+        logging.info(f'Crawling comments of {len(to_crawl)} videos, '
+                     f'up to {num_pages} pages, skipping '
+                     f'{len(video_ids) - len(to_crawl)}.')
+        return to_crawl, empty
+
+
 class GetVideo(GoogleApiFunction, interface.GetVideo):
 
+    endpoint = 'videos'
+
     def __call__(
             self,
             video_id: str
     ) -> List[Dict]:
-        return self._paginate(
+        return list(self.iter_items(video_id))
+
+    def iter_pages(self, video_id: str) -> Iterator[List[Dict]]:
+        return self._iter_pages(
             part='snippet,contentDetails,statistics',
             id=video_id)
 
@@ -240,8 +721,39 @@ class GetVideo(GoogleApiFunction, interface.GetVideo):
         return resource.videos().list
 
 
+class GetVideos(GoogleApiFunction, interface.GetVideos):
+
+    endpoint = 'videos'
+
+    def __call__(
+            self,
+            video_ids: Iterable[str]
+    ) -> List[Dict | None]:
+        video_ids = list(video_ids)
+        id_to_video = {}
+        for video in self.iter_items(video_ids):
+            id_to_video[video['id']] = video
+        missing = [x for x in video_ids if x not in id_to_video]
+        if missing:
+            logging.warning(f'{len(missing)} videos not found: {missing}.')
+        return [id_to_video.get(x) for x in video_ids]
+
+    def iter_pages(self, video_ids: Iterable[str]) -> Iterator[List[Dict]]:
+        """Yields the videos found, a page per batch of 50 ids."""
+        for batch in batch_ids(video_ids):
+            yield from self._iter_pages(
+                part='snippet,contentDetails,statistics',
+                id=','.join(batch))
+
+    def _get_function(self, resource: googleapiclient.discovery.Resource) \
+            -> Callable:
+        return resource.videos().list
+
+
 class Search(GoogleApiFunction, interface.Search):
 
+    endpoint = 'search'
+
     def __call__(
             self,
             query: str,
@@ -250,7 +762,21 @@ class Search(GoogleApiFunction, interface.Search):
             type: str = 'video',
             order: str = 'rating',
             limit: int = inf,
-            channel_id: Optional[str] = None):
+            channel_id: Optional[str] = None
+    ) -> List[Dict]:
+        return list(self.iter_items(
+            query, start, end, type, order, limit, channel_id))
+
+    def iter_pages(
+            self,
+            query: str,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            type: str = 'video',
+            order: str = 'rating',
+            limit: int = inf,
+            channel_id: Optional[str] = None
+    ) -> Iterator[List[Dict]]:
         if order not in self.search_orders:
             raise ValueError(f'Unexpected `order`: {order}.')
         if type not in self.search_types:
@@ -272,8 +798,7 @@ class Search(GoogleApiFunction, interface.Search):
             fn_args['publishedAfter'] = self._datetime_to_string_for_api(start)
         if end:
             fn_args['publishedBefore'] = self._datetime_to_string_for_api(end)
-        data = self._paginate(limit=limit, start=start, **fn_args)
-        return data
+        return self._iter_pages(limit=limit, start=start, **fn_args)
 
     def _get_function(
         self,
@@ -284,13 +809,52 @@ class Search(GoogleApiFunction, interface.Search):
 
 class GoogleYouTubeApi(interface.YouTubeApi):
 
-    def __init__(self):
-        self.api_key_manager = ApiKeyManager()
-        self.resource_manager = ResourceManager(self.api_key_manager)
+    def __init__(
+            self,
+            stream_id_cache: Optional[StreamIdCache] = None,
+            response_cache: Optional[ResponseCache] = None,
+            key_state_store: Optional[KeyStateStore] = None,
+            checkpoint_store: Optional[CheckpointStore] = None,
+            watermark_store: Optional[WatermarkStore] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            metrics: Optional[Metrics] = None,
+            tracer: Optional[Tracer] = None,
+            profile: bool = False
+    ):
+        self.api_key_manager = ApiKeyManager(key_state_store=key_state_store)
+        if tracer is None and profile:
+            # see `self.tracer` for where time goes in calls
+            tracer = SpanCollector(profile=True)
+        self.resource_manager = ResourceManager(
+            self.api_key_manager,
+            response_cache,
+            checkpoint_store=checkpoint_store,
+            retry_policy=retry_policy,
+            metrics=metrics,
+            tracer=tracer)
+        self.tracer = self.resource_manager.tracer
+        if stream_id_cache is None:
+            stream_id_cache = StreamIdCache()
+        self.stream_id_cache = stream_id_cache
+        if watermark_store is None:
+            watermark_store = WatermarkStore()
+        self.watermark_store = watermark_store
+        self.sync_channel_videos = SyncChannelVideos(
+            self.resource_manager, self.watermark_store)
+        self.get_comment_replies = GetCommentReplies(self.resource_manager)
+        self.get_video_comments_many = GetVideoCommentsMany(
+            self.resource_manager)
         super().__init__(
             get_channel=GetChannel(self.resource_manager),
-            get_channel_stream_id=GetChannelStreamId(self.resource_manager),
+            get_channels=GetChannels(self.resource_manager),
+            get_channel_stream_id=GetChannelStreamId(
+                self.resource_manager, self.stream_id_cache),
+            get_channel_stream_ids=GetChannelStreamIds(
+                self.resource_manager, self.stream_id_cache),
             get_channel_videos=GetChannelVideos(self.resource_manager),
+            get_channel_videos_many=GetChannelVideosMany(
+                self.resource_manager),
             get_video_comments=GetVideoComments(self.resource_manager),
             get_video=GetVideo(self.resource_manager),
+            get_videos=GetVideos(self.resource_manager),
             search=Search(self.resource_manager))
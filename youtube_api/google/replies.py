@@ -0,0 +1,44 @@
+from typing import Callable, Dict, List
+
+from youtube_api.google.concurrency import fan_out
+
+
+def num_inline_replies(comment_thread: Dict) -> int:
+    if 'replies' not in comment_thread:
+        return 0
+    return len(comment_thread['replies']['comments'])
+
+
+def missing_replies(comment_thread: Dict) -> bool:
+    """Whether the api left out some replies, as it inlines only a few."""
+    return num_inline_replies(comment_thread) \
+        < comment_thread['snippet']['totalReplyCount']
+
+
+def complete_replies(
+        comment_threads: List[Dict],
+        list_replies: Callable[[str], List[Dict]],
+        max_workers: int = 8
+) -> List[Dict]:
+    """Fill in the replies of raw comment threads missing some.
+
+    `list_replies` gets all the replies to a top level comment id (i.e. with
+    `comments.list(parentId=...)`), and is called on a thread pool, for the
+    threads missing replies only. Returns the threads in the same order, with
+    those copied and their replies replaced, where more were found.
+    """
+    parent_ids = [x['snippet']['topLevelComment']['id']
+                  for x in comment_threads if missing_replies(x)]
+    if not parent_ids:
+        return comment_threads
+    id_to_replies = dict(fan_out(list_replies, parent_ids, max_workers))
+    completed = []
+    for comment_thread in comment_threads:
+        replies = id_to_replies.get(
+            comment_thread['snippet']['topLevelComment']['id'], [])
+        if len(replies) > num_inline_replies(comment_thread):
+            comment_thread = {
+                **comment_thread,
+                'replies': {'comments': replies}}
+        completed.append(comment_thread)
+    return completed
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Optional, TYPE_CHECKING
+from urllib.parse import urlencode
+
+if TYPE_CHECKING:
+    import googleapiclient.discovery
+    from googleapiclient.http import HttpRequest
+    import httplib2
+
+
+class ResourceFactory:
+    """Builds the youtube v3 resource once, and shares it.
+
+    Built without an api key, from the discovery document bundled with
+    googleapiclient, so no network fetch is needed. googleapiclient itself is
+    only imported then, as it takes most of the package's import time.
+    Collections (e.g. `videos()`) are also built once, as each takes longer
+    than a request takes to prepare. Keys and http clients are given per
+    request by `KeyedResource`, so rotating keys or adding threads builds
+    nothing.
+
+    `api_endpoint` sends requests to another root url than Google's, e.g. a
+    local stand-in (`http://127.0.0.1:8080/`), for benchmarks.
+    """
+
+    def __init__(self, api_endpoint: Optional[str] = None):
+        self.api_endpoint = api_endpoint
+        self._service = None
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def get_service(self) -> googleapiclient.discovery.Resource:
+        with self._lock:
+            if self._service is None:
+                import googleapiclient.discovery
+                import httplib2
+                client_options = None
+                if self.api_endpoint:
+                    client_options = {'api_endpoint': self.api_endpoint}
+                # giving an http client skips looking for default credentials
+                self._service = googleapiclient.discovery.build(
+                    'youtube', 'v3',
+                    http=httplib2.Http(),
+                    static_discovery=True,
+                    client_options=client_options)
+            return self._service
+
+    def get_collection(self, name: str) -> googleapiclient.discovery.Resource:
+        if name not in self._collections:
+            collection = getattr(self.get_service(), name)()
+            with self._lock:
+                self._collections.setdefault(name, collection)
+        return self._collections[name]
+
+
+# shared by every resource manager in the process
+default_resource_factory = ResourceFactory()
+
+
+def add_api_key(uri: str, api_key: str) -> str:
+    separator = '&' if '?' in uri else '?'
+    return uri + separator + urlencode({'key': api_key})
+
+
+class KeyedCollection:
+
+    def __init__(self, collection, api_key: str, http: httplib2.Http):
+        self._collection = collection
+        self.api_key = api_key
+        self.http = http
+
+    def __getattr__(self, name: str) -> Callable:
+        method = getattr(self._collection, name)
+
+        def keyed_method(**kwargs) -> HttpRequest:
+            request = method(**kwargs)
+            request.uri = add_api_key(request.uri, self.api_key)
+            request.http = self.http
+            return request
+
+        return keyed_method
+
+
+class KeyedResource:
+    """A shared built resource, making requests with this key and client.
+
+    Used like the resource itself, e.g. `resource.videos().list(...)`.
+    """
+
+    def __init__(
+            self,
+            factory: ResourceFactory,
+            api_key: str,
+            http: httplib2.Http
+    ):
+        self.factory = factory
+        self.api_key = api_key
+        self.http = http
+
+    def __getattr__(self, name: str) -> Callable[[], Any]:
+        collection = self.factory.get_collection(name)
+        return lambda: KeyedCollection(collection, self.api_key, self.http)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+import copy
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+
+class ResponseCache:
+    """Bounded LRU cache of response bodies and their etags.
+
+    Keyed by endpoint and request parameters. When a request is repeated, the
+    cached etag is sent as `If-None-Match`, and a `304 Not Modified` is served
+    from here instead of transferring and parsing the body again.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(method_id: str, fn_args: Dict) -> str:
+        return method_id + json.dumps(fn_args, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict]]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, response: Dict) -> None:
+        if not response or 'etag' not in response:
+            return
+        with self._lock:
+            self._entries[key] = (response['etag'], copy.deepcopy(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def execute(self, request, fn_args: Dict) -> Dict:
+        """Execute `request`, conditionally if there is a cached response."""
+        key = self.key(request.methodId, fn_args)
+        cached = self.get(key)
+        if cached:
+            request.headers['If-None-Match'] = cached[0]
+        try:
+            response = request.execute()
+        except HttpError as e:
+            if cached and e.resp.status == 304:
+                with self._lock:
+                    self.hits += 1
+                # callers extend and mutate pages, so never hand out the entry
+                return copy.deepcopy(cached[1])
+            raise e
+        with self._lock:
+            self.misses += 1
+        self.put(key, response)
+        return response
+
+
+def execute(request,
+            fn_args: Dict,
+            response_cache: Optional[ResponseCache] = None) -> Dict:
+    if response_cache is None:
+        return request.execute()
+    return response_cache.execute(request, fn_args)
@@ -0,0 +1,115 @@
+import logging
+import random
+import socket
+import time
+from typing import Optional
+
+from googleapiclient.errors import HttpError
+
+
+# reasons the api gives for errors that pass if retried
+TRANSIENT_REASONS = {
+    'SERVICE_UNAVAILABLE',
+    'backendError',
+    'internalError',
+    'rateLimitExceeded',
+}
+
+# errors from the connection, rather than the api
+TRANSIENT_ERRORS = (socket.timeout, TimeoutError, ConnectionError)
+
+
+def http_error_reason(error: HttpError) -> Optional[str]:
+    """The api's reason for an error, if it gave one.
+
+    `error_details` is a list of errors only when the body was the api's json,
+    and otherwise a string (e.g. the html of a 502 from a proxy).
+    """
+    details = error.error_details
+    if isinstance(details, list) and details \
+            and isinstance(details[0], dict):
+        return details[0].get('reason')
+    return None
+
+
+def error_reason(error: Exception) -> str:
+    """Name the reason for an error, e.g. to label metrics by."""
+    if isinstance(error, HttpError):
+        return http_error_reason(error) or f'http_{error.resp.status}'
+    return type(error).__name__
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        if http_error_reason(error) in TRANSIENT_REASONS:
+            return True
+        return error.resp.status >= 500 or error.resp.status == 429
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def describe(error: Exception) -> str:
+    if isinstance(error, HttpError):
+        reason = http_error_reason(error)
+        return f'HTTP {error.resp.status}' + (f' ({reason})' if reason else '')
+    return type(error).__name__
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, for transient errors.
+
+    Before the nth retry, waits a random time up to `base_delay * 2 ** n`
+    seconds (but no more than `max_delay`), so retries from many workers
+    spread out, and a one-off blip costs about a second. A call gives up,
+    re-raising the error, after `max_attempts` attempts, or once
+    `max_elapsed` seconds have passed since its first.
+
+    Shared by all functions of a resource manager, as each call keeps its own
+    state in a `Backoff`.
+    """
+
+    def __init__(
+            self,
+            base_delay: float = 1.,
+            max_delay: float = 5 * 60.,
+            max_attempts: int = 10,
+            max_elapsed: float = 30 * 60.,
+            rng: Optional[random.Random] = None
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.max_elapsed = max_elapsed
+        self.rng = rng or random.Random()
+
+    def delay(self, num_retries: int) -> float:
+        """The wait before retry `num_retries`, counting from zero."""
+        cap = min(self.max_delay, self.base_delay * 2 ** num_retries)
+        return self.rng.uniform(0., cap)
+
+    def backoff(self) -> 'Backoff':
+        return Backoff(self)
+
+
+class Backoff:
+    """The retries of one call, under a `RetryPolicy`."""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.num_failures = 0
+        self.started = time.monotonic()
+
+    def next_delay(self, error: Exception) -> float:
+        """How long to wait before retrying after `error`.
+
+        Re-raises `error` if the attempts or time budget are spent.
+        """
+        self.num_failures += 1
+        elapsed = time.monotonic() - self.started
+        remaining = self.policy.max_elapsed - elapsed
+        if self.num_failures >= self.policy.max_attempts or remaining <= 0:
+            logging.warning(f'{describe(error)}. Giving up after '
+                            f'{self.num_failures} attempts.')
+            raise error
+        delay = min(self.policy.delay(self.num_failures - 1), remaining)
+        logging.warning(f'{describe(error)}. Retrying in {delay:.1f} secs...')
+        return delay
@@ -0,0 +1,95 @@
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from youtube_api.google.batching import batch_ids
+from youtube_api.google.local_store import SqliteStore
+
+
+class StreamIdCache(SqliteStore):
+    """Persistent mapping of channel id to uploads playlist (stream) id.
+
+    Entries older than `ttl_days` are treated as missing and re-resolved.
+    """
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS channel_stream_ids (
+            channel_id TEXT PRIMARY KEY,
+            stream_id TEXT NOT NULL,
+            resolved_at REAL NOT NULL
+        );
+    '''
+    default_file_name = 'stream_ids.sqlite'
+
+    def __init__(
+            self,
+            db_path: Optional[str] = None,
+            ttl_days: float = 30.
+    ):
+        super().__init__(db_path)
+        self.ttl_days = ttl_days
+
+    def get_many(self, channel_ids: Iterable[str]) -> Dict[str, str]:
+        """Get the fresh cached stream ids, omitting any misses."""
+        channel_ids = list(channel_ids)
+        oldest = time.time() - self.ttl_days * 24 * 60 * 60
+        found = {}
+        # keep well under SQLite's limit on bound parameters
+        for batch in batch_ids(channel_ids, batch_size=500):
+            placeholders = ','.join('?' * len(batch))
+            rows = self._execute(
+                f'SELECT channel_id, stream_id FROM channel_stream_ids '
+                f'WHERE resolved_at >= ? AND channel_id IN ({placeholders})',
+                [oldest] + batch)
+            found.update(rows)
+        return found
+
+    def set_many(self, channel_id_to_stream_id: Dict[str, str]) -> None:
+        now = time.time()
+        self._execute_many(
+            'INSERT OR REPLACE INTO channel_stream_ids '
+            '(channel_id, stream_id, resolved_at) VALUES (?, ?, ?)',
+            [(channel_id, stream_id, now)
+             for channel_id, stream_id in channel_id_to_stream_id.items()])
+
+
+def get_uploads_stream_id(channel: Dict) -> str | None:
+    """Get the uploads playlist id out of a raw channel resource."""
+    if 'contentDetails' not in channel:
+        return None
+    content_details = channel['contentDetails']
+    if 'relatedPlaylists' not in content_details:
+        return None
+    related_playlists = content_details['relatedPlaylists']
+    if 'uploads' not in related_playlists:
+        return None
+    return related_playlists['uploads']
+
+
+def resolve_stream_ids(
+        channel_ids: Iterable[str],
+        cache: StreamIdCache,
+        list_channels: Callable[[List[str]], List[Dict]]
+) -> Dict[str, str | None]:
+    """Resolve channel ids to stream ids, only requesting cache misses.
+
+    `list_channels` is given up to 50 channel ids and returns the raw channel
+    resources (with `contentDetails`) for those that were found. Results are
+    keyed by channel id in input order, with `None` where not resolvable.
+    """
+    channel_ids = list(channel_ids)
+    resolved = cache.get_many(channel_ids)
+    misses = [x for x in channel_ids if x not in resolved]
+    for batch in batch_ids(misses):
+        fetched = {}
+        for channel in list_channels(batch):
+            stream_id = get_uploads_stream_id(channel)
+            if stream_id:
+                fetched[channel['id']] = stream_id
+        cache.set_many(fetched)
+        resolved.update(fetched)
+    missing = [x for x in channel_ids if x not in resolved]
+    if missing:
+        logging.warning(f'Could not resolve stream ids for {len(missing)} '
+                        f'channels: {missing}.')
+    return {x: resolved.get(x) for x in channel_ids}
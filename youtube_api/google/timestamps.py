@@ -0,0 +1,62 @@
+from datetime import datetime
+from functools import lru_cache
+
+
+# seen all of these come from the api
+API_DATETIME_FORMATS = [
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%d %H:%M:%S',
+]
+
+
+def strptime_api_string(date_time: str) -> datetime:
+    """Parse by trying each of `API_DATETIME_FORMATS` in turn."""
+    for date_format in API_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(date_time, date_format)
+        except ValueError:
+            continue
+    # throw an exception with the input for feedback
+    raise ValueError(date_time)
+
+
+def _has_separators(date_time: str, between: str) -> bool:
+    return date_time[4] == '-' and date_time[7] == '-' \
+        and date_time[10] == between \
+        and date_time[13] == ':' and date_time[16] == ':'
+
+
+@lru_cache(maxsize=2 ** 14)
+def api_string_to_datetime(date_time: str) -> datetime:
+    """Parse a datetime string from the api, as `strptime_api_string` would.
+
+    Tells the format from the string's shape, and parses with
+    `datetime.fromisoformat`, rather than trying formats until one doesn't
+    raise. Strings of any other shape (e.g. with single digit fields, which
+    `strptime` allows) go to `strptime_api_string`. Results are memoized, as
+    the same times come up repeatedly (e.g. `publishedAt` and `updatedAt`).
+    """
+    size = len(date_time)
+    fraction = date_time[20:-1]
+    if size == 20:
+        shaped = date_time[19] == 'Z' and _has_separators(date_time, 'T')
+    elif size == 19:
+        shaped = _has_separators(date_time, ' ')
+    else:
+        # strptime's %f takes 1 to 6 ascii digits
+        shaped = 22 <= size <= 27 \
+            and date_time[19] == '.' and date_time[-1] == 'Z' \
+            and fraction.isascii() and fraction.isdecimal() \
+            and _has_separators(date_time, 'T')
+    if not shaped:
+        return strptime_api_string(date_time)
+    try:
+        # with the separators checked, only takes ascii digits between them
+        parsed = datetime.fromisoformat(date_time[:19])
+    except ValueError:
+        # e.g. out of range, or digits strptime takes but this doesn't
+        return strptime_api_string(date_time)
+    if fraction:
+        parsed = parsed.replace(microsecond=int(fraction.ljust(6, '0')))
+    return parsed
@@ -0,0 +1,160 @@
+"""Timing of the steps of api calls, to tell network from CPU bound work.
+
+The api functions wrap each step of a request in a span of their tracer:
+
+    key     getting a resource whose api key has quota (may wait for one)
+    build   building the request
+    http    executing it, including decoding the response
+    decode  decoding the response json, within `http`
+    map     mapping the response to objects (mapped api only)
+
+The default `Tracer` does nothing. A `SpanCollector` adds up the time in each
+span by function, for a `report`, or a `folded` flamegraph input, and with
+`profile=True` also runs cProfile inside spans, for `dump_stats`.
+"""
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import cProfile
+import pstats
+import threading
+import time
+from typing import ContextManager, Dict, List, Tuple
+
+
+_NO_SPAN = nullcontext()
+
+
+class Tracer:
+    """Hooks around the steps of api calls, which do nothing by default."""
+
+    # whether spans are worth the trouble of adding, where that costs
+    enabled = False
+
+    def span(self, function: str, name: str) -> ContextManager:
+        """Time the step `name` of a call to `function` (its class name)."""
+        return _NO_SPAN
+
+
+def trace_decoding(tracer: Tracer, function: str, request) -> None:
+    """Time the decoding of a googleapiclient request's response.
+
+    googleapiclient decodes in `execute`, with the request's `postproc`, so
+    that is wrapped in a `decode` span.
+    """
+    postproc = getattr(request, 'postproc', None)
+    if not tracer.enabled or postproc is None:
+        return
+
+    def traced_postproc(*args, **kwargs):
+        with tracer.span(function, 'decode'):
+            return postproc(*args, **kwargs)
+
+    request.postproc = traced_postproc
+
+
+Path = Tuple[str, ...]
+
+
+class SpanCollector(Tracer):
+    """Adds up the time spent in spans, per function and span.
+
+    Spans nest (e.g. `decode` in `http`), and each keeps its total time, and
+    its self time, without the spans in it. Thread safe; spans of different
+    threads are kept apart, so nesting holds with workers.
+
+    With `profile`, outermost spans also run under cProfile. cProfile can
+    only profile one thread at a time, so with many workers, the spans of
+    whichever thread got there first are profiled, and others skipped.
+    """
+
+    enabled = True
+
+    def __init__(self, profile: bool = False):
+        self.profile = profile
+        self.profiler = cProfile.Profile() if profile else None
+        # path (function, span, nested span, ...): [calls, total, self secs]
+        self.spans: Dict[Path, List[float]] = defaultdict(
+            lambda: [0, 0., 0.])
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[List]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, function: str, name: str):
+        stack = self._stack()
+        path = (stack[-1][0] if stack else (function,)) + (name,)
+        frame = [path, 0.]  # and the secs in the spans in it
+        stack.append(frame)
+        profiling = self.profile and len(stack) == 1 \
+            and self._profiling.acquire(blocking=False)
+        if profiling:
+            self.profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            if profiling:
+                self.profiler.disable()
+                self._profiling.release()
+            stack.pop()
+            if stack:
+                stack[-1][1] += seconds
+            with self._lock:
+                totals = self.spans[path]
+                totals[0] += 1
+                totals[1] += seconds
+                totals[2] += seconds - frame[1]
+
+    def totals(self) -> Dict[Path, Tuple[int, float, float]]:
+        """Get `(calls, total secs, self secs)` by span path."""
+        with self._lock:
+            return {k: tuple(v) for k, v in self.spans.items()}
+
+    def report(self) -> str:
+        """A table of the time in each span, by function.
+
+        `share` is the span's part of the function's traced time (self time,
+        so the shares of a function add up to 100%).
+        """
+        totals = self.totals()
+        function_secs = defaultdict(float)
+        for path, (_, _, self_secs) in totals.items():
+            function_secs[path[0]] += self_secs
+        lines = [f'{"function":<24} {"span":<16} {"calls":>8} '
+                 f'{"total s":>10} {"self s":>10} {"mean ms":>9} '
+                 f'{"share":>6}']
+        for path, (calls, total, self_secs) in sorted(totals.items()):
+            share = self_secs / function_secs[path[0]] \
+                if function_secs[path[0]] else 0.
+            lines.append(
+                f'{path[0]:<24} {"/".join(path[1:]):<16} {calls:>8} '
+                f'{total:>10.3f} {self_secs:>10.3f} '
+                f'{total / calls * 1000:>9.3f} {share:>6.1%}')
+        return '\n'.join(lines) + '\n'
+
+    def folded(self) -> str:
+        """The spans as folded stacks of self microseconds.
+
+        One `function;span;... count` line per span, the input format of
+        flamegraph.pl, and of speedscope and other flamegraph viewers.
+        """
+        return ''.join(
+            f'{";".join(path)} {round(self_secs * 1e6)}\n'
+            for path, (_, _, self_secs) in sorted(self.totals().items()))
+
+    def stats(self) -> pstats.Stats:
+        """The cProfile stats, e.g. to `sort_stats('cumulative')`."""
+        if not self.profile:
+            raise ValueError('Not profiling, set `profile=True`.')
+        with self._profiling:
+            return pstats.Stats(self.profiler)
+
+    def dump_stats(self, file_path: str) -> None:
+        """Write the cProfile stats, e.g. for snakeviz or flameprof."""
+        self.stats().dump_stats(file_path)
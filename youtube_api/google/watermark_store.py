@@ -0,0 +1,47 @@
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from youtube_api.google.local_store import SqliteStore
+
+
+class WatermarkStore(SqliteStore):
+    """Newest videos seen in each channel's uploads stream, as of last sync.
+
+    Kept as the `publishedAt` string, as given by the api, and the ids of all
+    videos published then, as uploads can share a second, joined by commas
+    (which video ids never contain).
+    """
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS stream_watermarks (
+            stream_id TEXT PRIMARY KEY,
+            video_ids TEXT NOT NULL,
+            published_at TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        );
+    '''
+    default_file_name = 'watermarks.sqlite'
+
+    def get(self, stream_id: str) -> Optional[Tuple[List[str], str]]:
+        """Get `(video_ids, published_at)`, or `None` if never synced."""
+        rows = self._execute(
+            'SELECT video_ids, published_at FROM stream_watermarks '
+            'WHERE stream_id = ?',
+            (stream_id,))
+        if not rows:
+            return None
+        video_ids, published_at = rows[0]
+        return video_ids.split(','), published_at
+
+    def set(
+            self,
+            stream_id: str,
+            video_ids: Iterable[str],
+            published_at: str
+    ) -> None:
+        self._execute(
+            'INSERT OR REPLACE INTO stream_watermarks '
+            '(stream_id, video_ids, published_at, synced_at) '
+            'VALUES (?, ?, ?, ?)',
+            (stream_id, ','.join(sorted(video_ids)), published_at,
+             time.time()))
@@ -1,9 +1,13 @@
 """Interface definition."""
+from __future__ import annotations
+
 from datetime import datetime
 from math import inf
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, \
+    TYPE_CHECKING
 
-from data_structures.youtube import *
+if TYPE_CHECKING:
+    from data_structures.youtube import *
 
 
 class GetChannel:
@@ -12,6 +16,18 @@ class GetChannel:
         raise NotImplementedError
 
 
+class GetChannels:
+    """Get many channels, packing up to 50 ids into each request.
+
+    Returns a dict keyed by channel id, in the order of `channel_ids`, with
+    `None` for any channel that was not found.
+    """
+
+    def __call__(self, channel_ids: Iterable[str]) \
+            -> Dict[str, Optional[YouTubeChannel]]:
+        raise NotImplementedError
+
+
 class GetChannelVideos:
 
     def __call__(self,
@@ -22,6 +38,23 @@ class GetChannelVideos:
         raise NotImplementedError
 
 
+class GetChannelVideosMany:
+    """Get the videos of many channels concurrently.
+
+    Each channel is paginated on its own worker thread. Yields
+    `(channel_id, videos)` pairs as each channel finishes.
+    """
+
+    def __call__(self,
+                 channel_ids: Iterable[str],
+                 limit: int = inf,
+                 start: Optional[datetime] = None,
+                 end: Optional[datetime] = None,
+                 max_workers: int = 8) \
+            -> Iterator[Tuple[str, List[YouTubeVideo]]]:
+        raise NotImplementedError
+
+
 class GetVideoComments:
 
     def __call__(self, video_id: str, limit: int = inf) -> List[YouTubeComment]:
@@ -34,6 +67,17 @@ class GetVideo:
         raise NotImplementedError
 
 
+class GetVideos:
+    """Get many videos, packing up to 50 ids into each request.
+
+    Returns a list aligned with `video_ids`, with `None` in place of any video
+    that was not found.
+    """
+
+    def __call__(self, video_ids: Iterable[str]) -> List[Optional[YouTubeVideo]]:
+        raise NotImplementedError
+
+
 class Search:
     """Search resources.
 
@@ -86,12 +130,18 @@ class YouTubeApi:
 
     def __init__(self,
                  get_channel: GetChannel,
+                 get_channels: GetChannels,
                  get_channel_videos: GetChannelVideos,
+                 get_channel_videos_many: GetChannelVideosMany,
                  get_video_comments: GetVideoComments,
                  get_video: GetVideo,
+                 get_videos: GetVideos,
                  search: Search):
         self.get_channel = get_channel
+        self.get_channels = get_channels
         self.get_channel_videos = get_channel_videos
+        self.get_channel_videos_many = get_channel_videos_many
         self.get_video_comments = get_video_comments
         self.get_video = get_video
+        self.get_videos = get_videos
         self.search = search
@@ -1,7 +1,7 @@
 """Interface definition."""
 from datetime import datetime
 from math import inf
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 class GetChannel:
@@ -13,6 +13,20 @@ class GetChannel:
         raise NotImplementedError
 
 
+class GetChannels:
+    """Get many channels, packing up to 50 ids into each request.
+
+    Returns a dict keyed by channel id, in the order of `channel_ids`, with
+    `None` for any channel that was not found.
+    """
+
+    def __call__(
+            self,
+            channel_ids: Iterable[str]
+    ) -> Dict[str, Dict | None]:
+        raise NotImplementedError
+
+
 class GetChannelStreamId:
 
     def __call__(
@@ -22,6 +36,20 @@ class GetChannelStreamId:
         raise NotImplementedError
 
 
+class GetChannelStreamIds:
+    """Resolve many channels to their uploads playlist (stream) ids.
+
+    Returns a dict keyed by channel id, in the order of `channel_ids`, with
+    `None` for any channel that could not be resolved.
+    """
+
+    def __call__(
+            self,
+            channel_ids: Iterable[str]
+    ) -> Dict[str, str | None]:
+        raise NotImplementedError
+
+
 class GetChannelVideos:
 
     def __call__(
@@ -34,6 +62,24 @@ class GetChannelVideos:
         raise NotImplementedError
 
 
+class GetChannelVideosMany:
+    """Get the videos of many channels concurrently.
+
+    Each channel is paginated on its own worker thread. Yields
+    `(channel_stream_id, videos)` pairs as each channel finishes.
+    """
+
+    def __call__(
+            self,
+            channel_stream_ids: Iterable[str],
+            limit: int = inf,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            max_workers: int = 8
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        raise NotImplementedError
+
+
 class GetVideoComments:
 
     def __call__(
@@ -53,6 +99,20 @@ class GetVideo:
         raise NotImplementedError
 
 
+class GetVideos:
+    """Get many videos, packing up to 50 ids into each request.
+
+    Returns a list aligned with `video_ids`, with `None` in place of any video
+    that was not found.
+    """
+
+    def __call__(
+            self,
+            video_ids: Iterable[str]
+    ) -> List[Dict | None]:
+        raise NotImplementedError
+
+
 class Search:
     """Search resources.
 
@@ -99,15 +159,23 @@ class YouTubeApi:
     def __init__(
             self,
             get_channel: GetChannel,
+            get_channels: GetChannels,
             get_channel_stream_id: GetChannelStreamId,
+            get_channel_stream_ids: GetChannelStreamIds,
             get_channel_videos: GetChannelVideos,
+            get_channel_videos_many: GetChannelVideosMany,
             get_video_comments: GetVideoComments,
             get_video: GetVideo,
+            get_videos: GetVideos,
             search: Search
     ):
         self.get_channel = get_channel
+        self.get_channels = get_channels
         self.get_channel_stream_id = get_channel_stream_id
+        self.get_channel_stream_ids = get_channel_stream_ids
         self.get_channel_videos = get_channel_videos
+        self.get_channel_videos_many = get_channel_videos_many
         self.get_video_comments = get_video_comments
         self.get_video = get_video
+        self.get_videos = get_videos
         self.search = search